@@ -1,5 +1,6 @@
 """Bindings for external services"""
 
 from .rust_client import RustSublinearClient
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 
-__all__ = ['RustSublinearClient']
+__all__ = ['RustSublinearClient', 'CircuitBreaker', 'CircuitOpenError']
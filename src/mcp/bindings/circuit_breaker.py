@@ -0,0 +1,149 @@
+"""
+Circuit breaker for calls to external engines
+Stops sending work to a failing or slow service and probes it for recovery
+"""
+
+from typing import Dict, Any, Callable, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the circuit is open"""
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a slow-call threshold
+
+    closed     - calls pass through; ``failure_threshold`` consecutive
+                 failures (errors or calls slower than ``slow_call_ms``)
+                 open the circuit
+    open       - calls are refused until ``reset_timeout`` seconds pass
+    half_open  - up to ``half_open_max_calls`` probe calls are let through;
+                 a success closes the circuit, a failure re-opens it
+
+    Successes of calls that were admitted before the circuit opened are
+    counted but do not close it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        slow_call_ms: float = 1000.0,
+        reset_timeout: float = 10.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_ms = slow_call_ms
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._half_open_calls = 0
+
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_latency_ms: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing")
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._consecutive_failures = 0
+        self.times_opened += 1
+        logger.warning(f"Circuit '{self.name}' opened for {self.reset_timeout}s")
+
+    def allow_request(self) -> bool:
+        """Reserve a call slot; False means the caller should fall back"""
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == CLOSED:
+                return True
+
+            if self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency_ms: float):
+        """Record a completed call; calls over ``slow_call_ms`` count as failures"""
+        with self._lock:
+            self.last_latency_ms = latency_ms
+            if latency_ms > self.slow_call_ms:
+                self.slow_calls += 1
+                self._fail()
+                return
+
+            self.successes += 1
+            if self._state == OPEN:
+                # A call admitted before the circuit opened; only probes close it
+                return
+
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                logger.info(f"Circuit '{self.name}' closed")
+
+    def record_failure(self):
+        """Record a failed call"""
+        with self._lock:
+            self._fail()
+
+    def _fail(self):
+        self.failures += 1
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+
+        self._consecutive_failures += 1
+        if self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Give back a reserved call slot that ended without a verdict"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of breaker state and counters"""
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "consecutive_failures": self._consecutive_failures,
+            "last_latency_ms": self.last_latency_ms
+        }
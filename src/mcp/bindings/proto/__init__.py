@@ -0,0 +1 @@
+"""Generated gRPC stubs for the Rust sublinear engine (run `make proto` to refresh)"""
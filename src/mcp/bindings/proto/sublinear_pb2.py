@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: sublinear.proto
+# Protobuf Python Version: 4.25.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fsublinear.proto\x12\x11ruvscan.sublinear\"\x18\n\x06Vector\x12\x0e\n\x06values\x18\x01 \x03(\x01\"\xa2\x01\n\rPackedVectors\x12;\n\x08\x65ncoding\x18\x01 \x01(\x0e\x32).ruvscan.sublinear.PackedVectors.Encoding\x12\x11\n\tdimension\x18\x02 \x01(\x05\x12\r\n\x05\x63ount\x18\x03 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\"$\n\x08\x45ncoding\x12\x0b\n\x07\x46LOAT32\x10\x00\x12\x0b\n\x07\x46LOAT16\x10\x01\"d\n\x0cSparseMatrix\x12\x0e\n\x06values\x18\x01 \x03(\x01\x12\x13\n\x0brow_indices\x18\x02 \x03(\x05\x12\x13\n\x0b\x63ol_indices\x18\x03 \x03(\x05\x12\x0c\n\x04rows\x18\x04 \x01(\x05\x12\x0c\n\x04\x63ols\x18\x05 \x01(\x05\"\x82\x02\n\x11SimilarityRequest\x12(\n\x05query\x18\x01 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12)\n\x06\x63orpus\x18\x02 \x03(\x0b\x32\x19.ruvscan.sublinear.Vector\x12\x12\n\ndistortion\x18\x03 \x01(\x01\x12\x13\n\x0bmax_results\x18\x04 \x01(\x05\x12\x36\n\x0cpacked_query\x18\x05 \x01(\x0b\x32 .ruvscan.sublinear.PackedVectors\x12\x37\n\rpacked_corpus\x18\x06 \x01(\x0b\x32 .ruvscan.sublinear.PackedVectors\";\n\x0fSimilarityMatch\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05score\x18\x02 \x01(\x01\x12\n\n\x02id\x18\x03 \x01(\x03\"\x9d\x01\n\x12SimilarityResponse\x12\x33\n\x07matches\x18\x01 \x03(\x0b\x32\".ruvscan.sublinear.SimilarityMatch\x12\x12\n\ncomplexity\x18\x02 \x01(\t\x12\x1b\n\x13\x63omputation_time_ms\x18\x03 \x01(\x01\x12!\n\x19\x64imension_reduction_ratio\x18\x04 \x01(\x05\"\xaa\x01\n\x0e\x43ompareRequest\x12(\n\x05vec_a\x18\x01 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12(\n\x05vec_b\x18\x02 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12\x12\n\ndistortion\x18\x03 \x01(\x01\x12\x30\n\x06packed\x18\x04 \x01(\x0b\x32 .ruvscan.sublinear.PackedVectors\"k\n\x0f\x43ompareResponse\x12\x12\n\nsimilarity\x18\x01 \x01(\x01\x12\x12\n\ncomplexity\x18\x02 \x01(\t\x12\x13\n\x0bmethod_used\x18\x03 \x01(\t\x12\x1b\n\x13\x63omputation_time_ms\x18\x04 \x01(\x01\"@\n\rMatrixRequest\x12/\n\x06matrix\x18\x01 \x01(\x0b\x32\x1f.ruvscan.sublinear.SparseMatrix\"\xb5\x01\n\x0eMatrixAnalysis\x12\x11\n\tis_sparse\x18\x01 \x01(\x08\x12\x14\n\x0cis_symmetric\x18\x02 \x01(\x08\x12\x1e\n\x16is_diagonally_dominant\x18\x03 \x01(\x08\x12\x1a\n\x12recommended_method\x18\x04 \x01(\t\x12\x1b\n\x13\x63omplexity_estimate\x18\x05 \x01(\t\x12!\n\x19\x63ondition_number_estimate\x18\x06 \x01(\x01\"\x98\x01\n\x0cSolveRequest\x12/\n\x06matrix\x18\x01 \x01(\x0b\x32\x1f.ruvscan.sublinear.SparseMatrix\x12)\n\x06vector\x18\x02 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12\x18\n\x10target_dimension\x18\x03 \x01(\x05\x12\x12\n\ndistortion\x18\x04 \x01(\x01\"\xaa\x01\n\rSolveResponse\x12+\n\x08solution\x18\x01 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12\x13\n\x0bmethod_used\x18\x02 \x01(\t\x12\x19\n\x11\x61\x63tual_complexity\x18\x03 \x01(\t\x12\x15\n\rresidual_norm\x18\x04 \x01(\x01\x12\x12\n\niterations\x18\x05 \x01(\x05\x12\x11\n\tconverged\x18\x06 \x01(\x08\"E\n\x0c\x43orpusVector\x12\n\n\x02id\x18\x01 \x01(\x03\x12)\n\x06vector\x18\x02 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\"\xa0\x01\n\x0b\x43orpusChunk\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x30\n\x07vectors\x18\x02 \x03(\x0b\x32\x1f.ruvscan.sublinear.CorpusVector\x12\x12\n\ndistortion\x18\x03 \x01(\x01\x12\x0b\n\x03ids\x18\x04 \x03(\x03\x12\x30\n\x06packed\x18\x05 \x01(\x0b\x32 .ruvscan.sublinear.PackedVectors\"\x19\n\tCorpusRef\x12\x0c\n\x04name\x18\x01 \x01(\t\"2\n\x13\x43orpusRemoveRequest\x12\x0e\n\x06\x63orpus\x18\x01 \x01(\t\x12\x0b\n\x03ids\x18\x02 \x03(\x03\";\n\nCorpusInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x05\x12\x11\n\tdimension\x18\x03 \x01(\x05\"\xaf\x01\n\x12\x43orpusQueryRequest\x12\x0e\n\x06\x63orpus\x18\x01 \x01(\t\x12(\n\x05query\x18\x02 \x01(\x0b\x32\x19.ruvscan.sublinear.Vector\x12\x12\n\ndistortion\x18\x03 \x01(\x01\x12\x13\n\x0bmax_results\x18\x04 \x01(\x05\x12\x36\n\x0cpacked_query\x18\x05 \x01(\x0b\x32 .ruvscan.sublinear.PackedVectors2\x9f\x06\n\x10SublinearService\x12`\n\x11\x43omputeSimilarity\x12$.ruvscan.sublinear.SimilarityRequest\x1a%.ruvscan.sublinear.SimilarityResponse\x12W\n\x0e\x43ompareVectors\x12!.ruvscan.sublinear.CompareRequest\x1a\".ruvscan.sublinear.CompareResponse\x12T\n\rAnalyzeMatrix\x12 .ruvscan.sublinear.MatrixRequest\x1a!.ruvscan.sublinear.MatrixAnalysis\x12W\n\x12SolveTrueSublinear\x12\x1f.ruvscan.sublinear.SolveRequest\x1a .ruvscan.sublinear.SolveResponse\x12M\n\nLoadCorpus\x12\x1e.ruvscan.sublinear.CorpusChunk\x1a\x1d.ruvscan.sublinear.CorpusInfo(\x01\x12O\n\x0cUpsertCorpus\x12\x1e.ruvscan.sublinear.CorpusChunk\x1a\x1d.ruvscan.sublinear.CorpusInfo(\x01\x12[\n\x0bQueryCorpus\x12%.ruvscan.sublinear.CorpusQueryRequest\x1a%.ruvscan.sublinear.SimilarityResponse\x12I\n\nDropCorpus\x12\x1c.ruvscan.sublinear.CorpusRef\x1a\x1d.ruvscan.sublinear.CorpusInfo\x12Y\n\x10RemoveFromCorpus\x12&.ruvscan.sublinear.CorpusRemoveRequest\x1a\x1d.ruvscan.sublinear.CorpusInfob\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'sublinear_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_VECTOR']._serialized_start=38
+  _globals['_VECTOR']._serialized_end=62
+  _globals['_PACKEDVECTORS']._serialized_start=65
+  _globals['_PACKEDVECTORS']._serialized_end=227
+  _globals['_PACKEDVECTORS_ENCODING']._serialized_start=191
+  _globals['_PACKEDVECTORS_ENCODING']._serialized_end=227
+  _globals['_SPARSEMATRIX']._serialized_start=229
+  _globals['_SPARSEMATRIX']._serialized_end=329
+  _globals['_SIMILARITYREQUEST']._serialized_start=332
+  _globals['_SIMILARITYREQUEST']._serialized_end=590
+  _globals['_SIMILARITYMATCH']._serialized_start=592
+  _globals['_SIMILARITYMATCH']._serialized_end=651
+  _globals['_SIMILARITYRESPONSE']._serialized_start=654
+  _globals['_SIMILARITYRESPONSE']._serialized_end=811
+  _globals['_COMPAREREQUEST']._serialized_start=814
+  _globals['_COMPAREREQUEST']._serialized_end=984
+  _globals['_COMPARERESPONSE']._serialized_start=986
+  _globals['_COMPARERESPONSE']._serialized_end=1093
+  _globals['_MATRIXREQUEST']._serialized_start=1095
+  _globals['_MATRIXREQUEST']._serialized_end=1159
+  _globals['_MATRIXANALYSIS']._serialized_start=1162
+  _globals['_MATRIXANALYSIS']._serialized_end=1343
+  _globals['_SOLVEREQUEST']._serialized_start=1346
+  _globals['_SOLVEREQUEST']._serialized_end=1498
+  _globals['_SOLVERESPONSE']._serialized_start=1501
+  _globals['_SOLVERESPONSE']._serialized_end=1671
+  _globals['_CORPUSVECTOR']._serialized_start=1673
+  _globals['_CORPUSVECTOR']._serialized_end=1742
+  _globals['_CORPUSCHUNK']._serialized_start=1745
+  _globals['_CORPUSCHUNK']._serialized_end=1905
+  _globals['_CORPUSREF']._serialized_start=1907
+  _globals['_CORPUSREF']._serialized_end=1932
+  _globals['_CORPUSREMOVEREQUEST']._serialized_start=1934
+  _globals['_CORPUSREMOVEREQUEST']._serialized_end=1984
+  _globals['_CORPUSINFO']._serialized_start=1986
+  _globals['_CORPUSINFO']._serialized_end=2045
+  _globals['_CORPUSQUERYREQUEST']._serialized_start=2048
+  _globals['_CORPUSQUERYREQUEST']._serialized_end=2223
+  _globals['_SUBLINEARSERVICE']._serialized_start=2226
+  _globals['_SUBLINEARSERVICE']._serialized_end=3025
+# @@protoc_insertion_point(module_scope)
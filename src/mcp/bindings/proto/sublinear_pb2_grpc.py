@@ -0,0 +1,342 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import sublinear_pb2 as sublinear__pb2
+
+
+class SublinearServiceStub(object):
+    """Sublinear computation service
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ComputeSimilarity = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/ComputeSimilarity',
+                request_serializer=sublinear__pb2.SimilarityRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.SimilarityResponse.FromString,
+                )
+        self.CompareVectors = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/CompareVectors',
+                request_serializer=sublinear__pb2.CompareRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.CompareResponse.FromString,
+                )
+        self.AnalyzeMatrix = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/AnalyzeMatrix',
+                request_serializer=sublinear__pb2.MatrixRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.MatrixAnalysis.FromString,
+                )
+        self.SolveTrueSublinear = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/SolveTrueSublinear',
+                request_serializer=sublinear__pb2.SolveRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.SolveResponse.FromString,
+                )
+        self.LoadCorpus = channel.stream_unary(
+                '/ruvscan.sublinear.SublinearService/LoadCorpus',
+                request_serializer=sublinear__pb2.CorpusChunk.SerializeToString,
+                response_deserializer=sublinear__pb2.CorpusInfo.FromString,
+                )
+        self.UpsertCorpus = channel.stream_unary(
+                '/ruvscan.sublinear.SublinearService/UpsertCorpus',
+                request_serializer=sublinear__pb2.CorpusChunk.SerializeToString,
+                response_deserializer=sublinear__pb2.CorpusInfo.FromString,
+                )
+        self.QueryCorpus = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/QueryCorpus',
+                request_serializer=sublinear__pb2.CorpusQueryRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.SimilarityResponse.FromString,
+                )
+        self.DropCorpus = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/DropCorpus',
+                request_serializer=sublinear__pb2.CorpusRef.SerializeToString,
+                response_deserializer=sublinear__pb2.CorpusInfo.FromString,
+                )
+        self.RemoveFromCorpus = channel.unary_unary(
+                '/ruvscan.sublinear.SublinearService/RemoveFromCorpus',
+                request_serializer=sublinear__pb2.CorpusRemoveRequest.SerializeToString,
+                response_deserializer=sublinear__pb2.CorpusInfo.FromString,
+                )
+
+
+class SublinearServiceServicer(object):
+    """Sublinear computation service
+    """
+
+    def ComputeSimilarity(self, request, context):
+        """Compute similarity between query and corpus vectors
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CompareVectors(self, request, context):
+        """Compare two vectors
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AnalyzeMatrix(self, request, context):
+        """Analyze matrix properties
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SolveTrueSublinear(self, request, context):
+        """Solve using TRUE O(log n) algorithm
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def LoadCorpus(self, request_iterator, context):
+        """Replace a named corpus held in engine memory (streamed in chunks)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpsertCorpus(self, request_iterator, context):
+        """Insert or overwrite vectors in a named corpus (streamed in chunks)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def QueryCorpus(self, request, context):
+        """Query a resident corpus with only the query vector on the wire
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DropCorpus(self, request, context):
+        """Drop a resident corpus
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveFromCorpus(self, request, context):
+        """Remove vectors from a resident corpus by id
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_SublinearServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'ComputeSimilarity': grpc.unary_unary_rpc_method_handler(
+                    servicer.ComputeSimilarity,
+                    request_deserializer=sublinear__pb2.SimilarityRequest.FromString,
+                    response_serializer=sublinear__pb2.SimilarityResponse.SerializeToString,
+            ),
+            'CompareVectors': grpc.unary_unary_rpc_method_handler(
+                    servicer.CompareVectors,
+                    request_deserializer=sublinear__pb2.CompareRequest.FromString,
+                    response_serializer=sublinear__pb2.CompareResponse.SerializeToString,
+            ),
+            'AnalyzeMatrix': grpc.unary_unary_rpc_method_handler(
+                    servicer.AnalyzeMatrix,
+                    request_deserializer=sublinear__pb2.MatrixRequest.FromString,
+                    response_serializer=sublinear__pb2.MatrixAnalysis.SerializeToString,
+            ),
+            'SolveTrueSublinear': grpc.unary_unary_rpc_method_handler(
+                    servicer.SolveTrueSublinear,
+                    request_deserializer=sublinear__pb2.SolveRequest.FromString,
+                    response_serializer=sublinear__pb2.SolveResponse.SerializeToString,
+            ),
+            'LoadCorpus': grpc.stream_unary_rpc_method_handler(
+                    servicer.LoadCorpus,
+                    request_deserializer=sublinear__pb2.CorpusChunk.FromString,
+                    response_serializer=sublinear__pb2.CorpusInfo.SerializeToString,
+            ),
+            'UpsertCorpus': grpc.stream_unary_rpc_method_handler(
+                    servicer.UpsertCorpus,
+                    request_deserializer=sublinear__pb2.CorpusChunk.FromString,
+                    response_serializer=sublinear__pb2.CorpusInfo.SerializeToString,
+            ),
+            'QueryCorpus': grpc.unary_unary_rpc_method_handler(
+                    servicer.QueryCorpus,
+                    request_deserializer=sublinear__pb2.CorpusQueryRequest.FromString,
+                    response_serializer=sublinear__pb2.SimilarityResponse.SerializeToString,
+            ),
+            'DropCorpus': grpc.unary_unary_rpc_method_handler(
+                    servicer.DropCorpus,
+                    request_deserializer=sublinear__pb2.CorpusRef.FromString,
+                    response_serializer=sublinear__pb2.CorpusInfo.SerializeToString,
+            ),
+            'RemoveFromCorpus': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveFromCorpus,
+                    request_deserializer=sublinear__pb2.CorpusRemoveRequest.FromString,
+                    response_serializer=sublinear__pb2.CorpusInfo.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'ruvscan.sublinear.SublinearService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class SublinearService(object):
+    """Sublinear computation service
+    """
+
+    @staticmethod
+    def ComputeSimilarity(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/ComputeSimilarity',
+            sublinear__pb2.SimilarityRequest.SerializeToString,
+            sublinear__pb2.SimilarityResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def CompareVectors(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/CompareVectors',
+            sublinear__pb2.CompareRequest.SerializeToString,
+            sublinear__pb2.CompareResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def AnalyzeMatrix(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/AnalyzeMatrix',
+            sublinear__pb2.MatrixRequest.SerializeToString,
+            sublinear__pb2.MatrixAnalysis.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SolveTrueSublinear(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/SolveTrueSublinear',
+            sublinear__pb2.SolveRequest.SerializeToString,
+            sublinear__pb2.SolveResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def LoadCorpus(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/ruvscan.sublinear.SublinearService/LoadCorpus',
+            sublinear__pb2.CorpusChunk.SerializeToString,
+            sublinear__pb2.CorpusInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def UpsertCorpus(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/ruvscan.sublinear.SublinearService/UpsertCorpus',
+            sublinear__pb2.CorpusChunk.SerializeToString,
+            sublinear__pb2.CorpusInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def QueryCorpus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/QueryCorpus',
+            sublinear__pb2.CorpusQueryRequest.SerializeToString,
+            sublinear__pb2.SimilarityResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def DropCorpus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/DropCorpus',
+            sublinear__pb2.CorpusRef.SerializeToString,
+            sublinear__pb2.CorpusInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RemoveFromCorpus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ruvscan.sublinear.SublinearService/RemoveFromCorpus',
+            sublinear__pb2.CorpusRemoveRequest.SerializeToString,
+            sublinear__pb2.CorpusInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -2,48 +2,216 @@
 gRPC client for Rust sublinear engine
 """
 
+import asyncio
 import grpc
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Union, Iterator, Sequence, Hashable, Callable, Awaitable
 import logging
+import time
 import numpy as np
 
+from ..index.hnsw import HNSWIndex
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .proto import sublinear_pb2, sublinear_pb2_grpc
+
 logger = logging.getLogger(__name__)
 
+# Corpus-carrying requests exceed gRPC's 4 MB default
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# Wire encodings for PackedVectors; "float64" sends legacy repeated doubles
+PACKED_ENCODINGS = {
+    "float32": (sublinear_pb2.PackedVectors.FLOAT32, np.dtype('<f4')),
+    "float16": (sublinear_pb2.PackedVectors.FLOAT16, np.dtype('<f2')),
+}
+
+# Status codes that mean the engine itself is unhealthy; other errors
+# (NOT_FOUND, INVALID_ARGUMENT, ...) are answers and do not trip the breaker
+BREAKER_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+})
+
+# Rows to upsert and rows to remove since a resident key, or None to reload
+CorpusDelta = Optional[Tuple[Sequence[int], Sequence[int]]]
+
+# Errors after which numeric work is answered locally
+FALLBACK_ERRORS = (grpc.aio.AioRpcError, CircuitOpenError)
+
 class RustSublinearClient:
     """
     gRPC client for communicating with Rust sublinear engine
+
+    Calls are spread round-robin over a pool of channels so concurrent
+    requests do not queue behind one HTTP/2 connection. Every call carries
+    a deadline and passes through a circuit breaker; when the engine is
+    unreachable, slow, or the circuit is open, the numeric work falls back
+    to the local NumPy (or ANN index) path.
     """
 
-    def __init__(self, host: str = "localhost", port: int = 50051):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 50051,
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        keepalive_ms: int = 30000,
+        vector_encoding: str = "float32",
+        fallback_timeout: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        if vector_encoding != "float64" and vector_encoding not in PACKED_ENCODINGS:
+            raise ValueError(f"Unsupported vector encoding: {vector_encoding}")
+
         self.host = host
         self.port = port
-        self.channel = None
-        self.stub = None
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        # Deadline for calls that have a local fallback
+        self.fallback_timeout = min(fallback_timeout, timeout)
+        self.breaker = breaker or CircuitBreaker("rust_engine")
+        self.keepalive_ms = keepalive_ms
+        self.vector_encoding = vector_encoding
+        self.channels: List[grpc.aio.Channel] = []
+        self.stubs: List[sublinear_pb2_grpc.SublinearServiceStub] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next = 0
+        # Corpus name -> key of the contents currently resident on the engine
+        self._resident: Dict[str, Hashable] = {}
+        # Corpus name -> background upload bringing it to a newer key
+        self._syncs: Dict[str, asyncio.Task] = {}
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.stubs)
+
+    @property
+    def packed(self) -> bool:
+        return self.vector_encoding in PACKED_ENCODINGS
+
+    def _channel_options(self) -> List[Tuple[str, Any]]:
+        return [
+            ("grpc.keepalive_time_ms", self.keepalive_ms),
+            ("grpc.keepalive_timeout_ms", 10000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            # Without this, channels with identical args share one subchannel
+            ("grpc.use_local_subchannel_pool", 1),
+            ("grpc.max_send_message_length", MAX_MESSAGE_BYTES),
+            ("grpc.max_receive_message_length", MAX_MESSAGE_BYTES),
+        ]
 
     async def connect(self):
-        """Establish gRPC connection"""
+        """Open the channel pool (again, if it was opened on another event loop)"""
+        loop = asyncio.get_running_loop()
+        if self.connected and self._loop is loop:
+            return
+
+        # aio channels are bound to the loop that created them
+        self.channels, self.stubs = [], []
+        self._loop = loop
+        self._resident = {}
+        self._syncs = {}
+
         try:
             address = f"{self.host}:{self.port}"
-            self.channel = grpc.aio.insecure_channel(address)
-            # TODO: Initialize stub when proto definitions are added
-            logger.info(f"Connected to Rust engine at {address}")
+            options = self._channel_options()
+            self.channels = [
+                grpc.aio.insecure_channel(address, options=options)
+                for _ in range(self.pool_size)
+            ]
+            self.stubs = [
+                sublinear_pb2_grpc.SublinearServiceStub(channel)
+                for channel in self.channels
+            ]
+            logger.info(f"Connected to Rust engine at {address} ({self.pool_size} channels)")
         except Exception as e:
             logger.error(f"Failed to connect to Rust engine: {e}")
             raise
 
+    def _stub(self) -> sublinear_pb2_grpc.SublinearServiceStub:
+        """Next stub from the pool"""
+        stub = self.stubs[self._next % len(self.stubs)]
+        self._next += 1
+        return stub
+
+    async def _call(self, method: str, request, timeout: Optional[float] = None):
+        """
+        Invoke an RPC on the next pooled channel with a deadline
+
+        Args:
+            method: Stub method name
+            request: Request message, or an iterator of messages for
+                client-streaming RPCs
+            timeout: Deadline in seconds (client timeout when None)
+
+        Raises:
+            CircuitOpenError: The breaker is open and refused the call
+            grpc.aio.AioRpcError: The call failed
+        """
+        rpc = getattr(self._require_stub(), method)
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open")
+
+        start = time.perf_counter()
+        try:
+            response = await rpc(request, timeout=timeout or self.timeout)
+        except grpc.aio.AioRpcError as e:
+            if e.code() in BREAKER_CODES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success((time.perf_counter() - start) * 1000)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success((time.perf_counter() - start) * 1000)
+        return response
+
+    @staticmethod
+    def _fallback_reason(error: Exception) -> str:
+        if isinstance(error, grpc.aio.AioRpcError):
+            return error.code().name
+        return "circuit open"
+
     async def compute_similarity(
         self,
         query_embedding: np.ndarray,
-        corpus_embeddings: List[np.ndarray],
-        distortion: float = 0.5
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        distortion: float = 0.5,
+        max_results: Optional[int] = None,
+        normalized: bool = False,
+        index: Optional[HNSWIndex] = None,
+        ef: Optional[int] = None,
+        corpus_key: Optional[Hashable] = None,
+        corpus_name: str = "default",
+        corpus_delta: Optional[Callable[[Hashable], Awaitable[CorpusDelta]]] = None
     ) -> List[Tuple[int, float]]:
         """
         Compute sublinear similarity between query and corpus
 
         Args:
             query_embedding: Query vector
-            corpus_embeddings: List of corpus vectors
+            corpus_embeddings: List of corpus vectors or 2-D corpus matrix
             distortion: JL distortion parameter
+            max_results: Only return the top-k matches (all when None)
+            normalized: Corpus rows are already unit length
+            index: ANN index over the corpus, labelled by row position;
+                replaces the full scan when given
+            ef: HNSW search candidate size (index default when None)
+            corpus_key: Identity of the corpus contents (e.g. a matrix
+                revision); when given, the engine keeps the corpus resident
+                as ``corpus_name`` instead of it being shipped with every
+                call. A new key is uploaded in the background; see
+                ``_resident_similarity``
+            corpus_name: Resident corpus name used with ``corpus_key``
+            corpus_delta: ``corpus_delta(resident_key)`` returning the rows
+                to upsert and to remove since ``resident_key``, or None
+                when the resident corpus cannot be patched
 
         Returns:
             List of (index, similarity_score) tuples
@@ -51,17 +219,35 @@ class RustSublinearClient:
         logger.info(f"Computing sublinear similarity for {len(corpus_embeddings)} vectors")
 
         try:
-            # TODO: Implement gRPC call when proto is defined
-            # For now, use placeholder local computation
-
-            # Placeholder: Use simple cosine similarity
-            similarities = []
-            for idx, corpus_vec in enumerate(corpus_embeddings):
-                sim = self._cosine_similarity(query_embedding, corpus_vec)
-                similarities.append((idx, sim))
-
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x[1], reverse=True)
+            if index is not None:
+                k = max_results if max_results is not None else len(index)
+                similarities = index.search(query_embedding, k, ef=ef)
+                logger.info(f"Computed {len(similarities)} similarities via HNSW index")
+                return similarities
+
+            if self.connected:
+                try:
+                    if corpus_key is not None:
+                        similarities = await self._resident_similarity(
+                            corpus_name, corpus_key, query_embedding, corpus_embeddings,
+                            distortion, max_results, corpus_delta
+                        )
+                    else:
+                        similarities = await self._remote_similarity(
+                            query_embedding, corpus_embeddings, distortion, max_results
+                        )
+                    if similarities is not None:
+                        logger.info(f"Computed {len(similarities)} similarities on Rust engine")
+                        return similarities
+                except FALLBACK_ERRORS as e:
+                    logger.warning(f"Rust engine unavailable ({self._fallback_reason(e)}), computing locally")
+
+            similarities = self.top_k_similarity(
+                query_embedding,
+                corpus_embeddings,
+                max_results=max_results,
+                normalized=normalized
+            )
 
             logger.info(f"Computed {len(similarities)} similarities")
             return similarities
@@ -70,6 +256,400 @@ class RustSublinearClient:
             logger.error(f"Similarity computation error: {e}")
             raise
 
+    async def _remote_similarity(
+        self,
+        query_embedding: np.ndarray,
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        distortion: float,
+        max_results: Optional[int]
+    ) -> List[Tuple[int, float]]:
+        corpus = np.asarray(corpus_embeddings)
+        request = sublinear_pb2.SimilarityRequest(
+            distortion=distortion,
+            max_results=max_results if max_results is not None else len(corpus)
+        )
+
+        if self.packed:
+            request.packed_query.CopyFrom(self._packed(query_embedding))
+            request.packed_corpus.CopyFrom(self._packed(corpus))
+        else:
+            request.query.CopyFrom(self._vector(query_embedding))
+            request.corpus.extend(self._vector(row) for row in corpus)
+
+        response = await self._call("ComputeSimilarity", request, timeout=self.fallback_timeout)
+        return [(match.index, match.score) for match in response.matches]
+
+    async def _resident_similarity(
+        self,
+        name: str,
+        key: Hashable,
+        query_embedding: np.ndarray,
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        distortion: float,
+        max_results: Optional[int],
+        corpus_delta: Optional[Callable[[Hashable], Awaitable[CorpusDelta]]] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Query a resident corpus, syncing it to ``key`` in the background
+
+        Rows are loaded with their positions as ids, so matches are labelled
+        the same way as on the shipped-corpus path. When ``key`` is not the
+        resident one, ``corpus_delta`` decides the sync: changed rows are
+        upserted and removed while the previous snapshot keeps answering;
+        without a delta the corpus is reloaded and None is returned (the
+        caller scans locally) until the upload finishes.
+        """
+        resident = self._resident.get(name)
+        sync = self._syncs.get(name)
+        if resident != key and (sync is None or sync.done()):
+            delta = None
+            if resident is not None and corpus_delta is not None:
+                delta = await corpus_delta(resident)
+            if delta is None:
+                # The resident rows may not line up with this corpus any more
+                self._resident.pop(name, None)
+                resident = None
+            self._syncs[name] = asyncio.create_task(
+                self._sync_corpus(name, key, corpus_embeddings, delta, distortion)
+            )
+
+        if resident is None:
+            return None
+
+        request = sublinear_pb2.CorpusQueryRequest(
+            corpus=name,
+            distortion=distortion,
+            max_results=max_results or 0
+        )
+        if self.packed:
+            request.packed_query.CopyFrom(self._packed(query_embedding))
+        else:
+            request.query.CopyFrom(self._vector(query_embedding))
+
+        try:
+            response = await self._call("QueryCorpus", request, timeout=self.fallback_timeout)
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                # Engine restarted without the corpus; upload it again next call
+                self._resident.pop(name, None)
+            raise
+
+        return [(match.id, match.score) for match in response.matches]
+
+    async def _sync_corpus(
+        self,
+        name: str,
+        key: Hashable,
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        delta: CorpusDelta,
+        distortion: float
+    ):
+        """Bring resident corpus ``name`` to ``key``: apply ``delta``, or reload it when None"""
+        try:
+            if delta is None:
+                await self.load_corpus(name, corpus_embeddings, distortion=distortion)
+            else:
+                upserted, removed = delta
+                if len(upserted):
+                    rows = [int(row) for row in upserted]
+                    await self.upsert_corpus(name, np.asarray(corpus_embeddings)[rows], ids=rows)
+                if len(removed):
+                    await self.remove_from_corpus(name, removed)
+                logger.info(f"Synced corpus '{name}': {len(upserted)} rows upserted, {len(removed)} removed")
+        except (*FALLBACK_ERRORS, ValueError) as e:
+            logger.warning(f"Could not sync corpus '{name}' to the Rust engine: {e}")
+            # A half-applied delta leaves unknown contents; reload next time
+            self._resident.pop(name, None)
+            return
+
+        self._resident[name] = key
+
+    @staticmethod
+    def _vector(values: np.ndarray) -> sublinear_pb2.Vector:
+        return sublinear_pb2.Vector(values=np.asarray(values, dtype=np.float64).ravel().tolist())
+
+    def _packed(self, vectors: np.ndarray) -> sublinear_pb2.PackedVectors:
+        """Pack vectors as one little-endian buffer (a single memcpy, no per-element work)"""
+        encoding, dtype = PACKED_ENCODINGS[self.vector_encoding]
+        matrix = np.ascontiguousarray(np.atleast_2d(vectors), dtype=dtype)
+
+        return sublinear_pb2.PackedVectors(
+            encoding=encoding,
+            dimension=matrix.shape[1],
+            count=matrix.shape[0],
+            data=matrix.tobytes()
+        )
+
+    async def compute_similarity_batch(
+        self,
+        query_embeddings: np.ndarray,
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        distortion: float = 0.5,
+        max_results: Optional[int] = None,
+        normalized: bool = False
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Compute similarity for several queries against the same corpus
+
+        Args:
+            query_embeddings: 2-D matrix with one query per row
+            corpus_embeddings: List of corpus vectors or 2-D corpus matrix
+            distortion: JL distortion parameter
+            max_results: Top-k matches per query (all when None)
+            normalized: Corpus rows are already unit length
+
+        Returns:
+            One list of (index, similarity_score) tuples per query
+        """
+        queries = np.atleast_2d(query_embeddings)
+        logger.info(f"Computing similarity for {len(queries)} queries")
+
+        try:
+            return self.top_k_similarity(
+                queries,
+                corpus_embeddings,
+                max_results=max_results,
+                normalized=normalized
+            )
+
+        except Exception as e:
+            logger.error(f"Batch similarity computation error: {e}")
+            raise
+
+    def top_k_similarity(
+        self,
+        queries: np.ndarray,
+        corpus_embeddings: Union[List[np.ndarray], np.ndarray],
+        max_results: Optional[int] = None,
+        normalized: bool = False
+    ) -> Union[List[Tuple[int, float]], List[List[Tuple[int, float]]]]:
+        """
+        Cosine top-k with one BLAS product and an O(N) selection
+
+        Args:
+            queries: Query vector, or 2-D matrix with one query per row
+            corpus_embeddings: List of corpus vectors or 2-D corpus matrix
+            max_results: Top-k matches per query (all when None)
+            normalized: Corpus rows are already unit length
+
+        Returns:
+            (index, score) tuples for a single query, or one list per query row
+        """
+        corpus = np.asarray(corpus_embeddings, dtype=np.float32)
+        if corpus.ndim != 2 or len(corpus) == 0:
+            return [] if np.ndim(queries) == 1 else [[] for _ in range(len(queries))]
+
+        if not normalized:
+            corpus = self.normalize_rows(corpus)
+
+        single = np.ndim(queries) == 1
+        query_matrix = self.normalize_rows(np.atleast_2d(queries))
+
+        # (q, d) @ (d, n) -> (q, n)
+        scores = query_matrix @ corpus.T
+
+        n = scores.shape[1]
+        k = n if max_results is None else max(0, min(max_results, n))
+        if k == 0:
+            return [] if single else [[] for _ in range(len(scores))]
+
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n), scores.shape)
+
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = [
+            list(zip(row_idx.tolist(), row_scores.tolist()))
+            for row_idx, row_scores in zip(top, top_scores)
+        ]
+
+        return results[0] if single else results
+
+    @staticmethod
+    def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length as float32; zero rows stay zero"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    async def load_corpus(
+        self,
+        name: str,
+        embeddings: Union[List[np.ndarray], np.ndarray],
+        ids: Optional[Sequence[int]] = None,
+        chunk_size: int = 1000,
+        distortion: float = 0.5
+    ) -> Dict[str, Any]:
+        """
+        Upload a corpus to the Rust engine once, replacing any corpus of that name
+
+        Args:
+            name: Corpus name used by query_corpus
+            embeddings: List of corpus vectors or 2-D corpus matrix
+            ids: Id for each vector (defaults to row position)
+            chunk_size: Vectors per streamed message
+            distortion: JL distortion the engine pre-projects the corpus with;
+                queries at this distortion skip the corpus projection
+
+        Returns:
+            Corpus info with name, size and dimension
+        """
+        return await self._stream_corpus("LoadCorpus", name, embeddings, ids, chunk_size, distortion)
+
+    async def upsert_corpus(
+        self,
+        name: str,
+        embeddings: Union[List[np.ndarray], np.ndarray],
+        ids: Sequence[int],
+        chunk_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Insert or overwrite vectors in a resident corpus
+
+        Args:
+            name: Corpus name
+            embeddings: Vectors to upsert
+            ids: Id for each vector
+            chunk_size: Vectors per streamed message
+
+        Returns:
+            Corpus info with name, size and dimension
+        """
+        return await self._stream_corpus("UpsertCorpus", name, embeddings, ids, chunk_size)
+
+    async def query_corpus(
+        self,
+        name: str,
+        query_embedding: np.ndarray,
+        max_results: int = 10,
+        distortion: float = 0.5
+    ) -> List[Tuple[int, float]]:
+        """
+        Query a resident corpus; only the query vector is sent
+
+        Args:
+            name: Corpus name
+            query_embedding: Query vector
+            max_results: Number of matches (0 for all)
+            distortion: JL distortion parameter
+
+        Returns:
+            List of (id, similarity_score) tuples
+        """
+        request = sublinear_pb2.CorpusQueryRequest(
+            corpus=name,
+            distortion=distortion,
+            max_results=max_results
+        )
+        if self.packed:
+            request.packed_query.CopyFrom(self._packed(query_embedding))
+        else:
+            request.query.CopyFrom(self._vector(query_embedding))
+
+        try:
+            response = await self._call("QueryCorpus", request)
+            return [(match.id, match.score) for match in response.matches]
+
+        except grpc.aio.AioRpcError as e:
+            logger.error(f"Corpus query error: {e.details()}")
+            raise
+
+    async def drop_corpus(self, name: str) -> Dict[str, Any]:
+        """Release a resident corpus on the Rust engine"""
+        response = await self._call("DropCorpus", sublinear_pb2.CorpusRef(name=name))
+        return self._corpus_info(response)
+
+    async def remove_from_corpus(self, name: str, ids: Sequence[int]) -> Dict[str, Any]:
+        """
+        Remove vectors from a resident corpus
+
+        Args:
+            name: Corpus name
+            ids: Ids to remove; unknown ids are ignored
+
+        Returns:
+            Corpus info with name, size and dimension
+        """
+        request = sublinear_pb2.CorpusRemoveRequest(corpus=name, ids=[int(i) for i in ids])
+        response = await self._call("RemoveFromCorpus", request)
+        return self._corpus_info(response)
+
+    async def _stream_corpus(
+        self,
+        method: str,
+        name: str,
+        embeddings: Union[List[np.ndarray], np.ndarray],
+        ids: Optional[Sequence[int]],
+        chunk_size: int,
+        distortion: float = 0.0
+    ) -> Dict[str, Any]:
+        matrix = np.asarray(embeddings)
+        if ids is None:
+            ids = range(len(matrix))
+        if len(ids) != len(matrix):
+            raise ValueError(f"Got {len(ids)} ids for {len(matrix)} vectors")
+
+        logger.info(f"Streaming {len(matrix)} vectors to corpus '{name}'")
+
+        try:
+            response = await self._call(
+                method,
+                self._corpus_chunks(name, matrix, ids, chunk_size, distortion)
+            )
+            return self._corpus_info(response)
+
+        except grpc.aio.AioRpcError as e:
+            logger.error(f"Corpus upload error: {e.details()}")
+            raise
+
+    def _corpus_chunks(
+        self,
+        name: str,
+        matrix: np.ndarray,
+        ids: Sequence[int],
+        chunk_size: int,
+        distortion: float
+    ) -> Iterator[sublinear_pb2.CorpusChunk]:
+        for start in range(0, len(matrix), chunk_size):
+            chunk_ids = [int(repo_id) for repo_id in ids[start:start + chunk_size]]
+            rows = matrix[start:start + chunk_size]
+
+            if self.packed:
+                yield sublinear_pb2.CorpusChunk(
+                    name=name,
+                    distortion=distortion,
+                    ids=chunk_ids,
+                    packed=self._packed(rows)
+                )
+            else:
+                yield sublinear_pb2.CorpusChunk(
+                    name=name,
+                    distortion=distortion,
+                    vectors=[
+                        sublinear_pb2.CorpusVector(id=repo_id, vector=self._vector(row))
+                        for repo_id, row in zip(chunk_ids, rows)
+                    ]
+                )
+
+    @staticmethod
+    def _corpus_info(response) -> Dict[str, Any]:
+        return {
+            "name": response.name,
+            "size": response.size,
+            "dimension": response.dimension
+        }
+
+    def _require_stub(self) -> sublinear_pb2_grpc.SublinearServiceStub:
+        if not self.connected:
+            raise RuntimeError("Not connected to Rust engine; call connect() first")
+        return self._stub()
+
     async def compare_vectors(
         self,
         vec_a: np.ndarray,
@@ -88,7 +668,25 @@ class RustSublinearClient:
             Comparison result with similarity and complexity
         """
         try:
-            # TODO: Implement gRPC call
+            if self.connected:
+                try:
+                    request = sublinear_pb2.CompareRequest(distortion=distortion)
+                    if self.packed:
+                        request.packed.CopyFrom(self._packed(np.stack([vec_a, vec_b])))
+                    else:
+                        request.vec_a.CopyFrom(self._vector(vec_a))
+                        request.vec_b.CopyFrom(self._vector(vec_b))
+
+                    response = await self._call("CompareVectors", request, timeout=self.fallback_timeout)
+                    return {
+                        "similarity": response.similarity,
+                        "complexity": response.complexity,
+                        "method": response.method_used,
+                        "distortion": distortion,
+                        "computation_time_ms": response.computation_time_ms
+                    }
+                except FALLBACK_ERRORS as e:
+                    logger.warning(f"Rust engine unavailable ({self._fallback_reason(e)}), comparing locally")
 
             similarity = self._cosine_similarity(vec_a, vec_b)
 
@@ -117,9 +715,30 @@ class RustSublinearClient:
             Analysis result
         """
         try:
-            # TODO: Implement gRPC call
-
-            # Placeholder analysis
+            if self.connected:
+                try:
+                    rows, cols = np.nonzero(matrix)
+                    response = await self._call("AnalyzeMatrix", sublinear_pb2.MatrixRequest(
+                        matrix=sublinear_pb2.SparseMatrix(
+                            values=matrix[rows, cols].astype(np.float64).tolist(),
+                            row_indices=rows.tolist(),
+                            col_indices=cols.tolist(),
+                            rows=matrix.shape[0],
+                            cols=matrix.shape[1]
+                        )
+                    ), timeout=self.fallback_timeout)
+                    return {
+                        "is_sparse": response.is_sparse,
+                        "is_symmetric": response.is_symmetric,
+                        "is_diagonally_dominant": response.is_diagonally_dominant,
+                        "recommended_method": response.recommended_method,
+                        "complexity_estimate": response.complexity_estimate,
+                        "condition_number_estimate": response.condition_number_estimate
+                    }
+                except FALLBACK_ERRORS as e:
+                    logger.warning(f"Rust engine unavailable ({self._fallback_reason(e)}), analyzing locally")
+
+            # Local analysis
             is_sparse = np.count_nonzero(matrix) / matrix.size < 0.3
             is_symmetric = np.allclose(matrix, matrix.T)
 
@@ -160,7 +779,14 @@ class RustSublinearClient:
         return True
 
     async def close(self):
-        """Close gRPC connection"""
-        if self.channel:
-            await self.channel.close()
+        """Close all pooled gRPC channels"""
+        if self.channels:
+            for channel in self.channels:
+                await channel.close()
+            for task in self._syncs.values():
+                task.cancel()
+            self.channels = []
+            self.stubs = []
+            self._resident = {}
+            self._syncs = {}
             logger.info("Closed connection to Rust engine")
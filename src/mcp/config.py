@@ -0,0 +1,70 @@
+"""
+Runtime configuration for RuvScan
+Loads config/config.yaml (or the file named by RUVSCAN_CONFIG)
+"""
+
+from typing import Any, Dict, Optional
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "config", "config.yaml"
+)
+
+def _expand(value: Any) -> Any:
+    """Substitute ${VAR} references in string values"""
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    return value
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the YAML configuration
+
+    A missing file (or a missing PyYAML) yields an empty config, so every
+    caller falls back to its built-in defaults.
+
+    Args:
+        path: Config file (defaults to RUVSCAN_CONFIG, then config/config.yaml)
+
+    Returns:
+        Nested configuration dictionary
+    """
+    path = path or os.getenv("RUVSCAN_CONFIG") or DEFAULT_CONFIG_PATH
+    if not os.path.exists(path):
+        logger.info(f"No config file at {path}, using defaults")
+        return {}
+
+    try:
+        import yaml
+    except ImportError:
+        logger.warning("PyYAML not installed, ignoring config file and using defaults")
+        return {}
+
+    try:
+        with open(path) as f:
+            return _expand(yaml.safe_load(f) or {})
+    except Exception as e:
+        logger.error(f"Failed to load config {path}: {e}")
+        raise
+
+def setting(config: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """
+    Look up a dotted key, e.g. ``setting(config, "hybrid.rrf_k", 60)``
+
+    Returns:
+        The configured value, or ``default`` when any part of the path is missing
+    """
+    value: Any = config
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
@@ -5,26 +5,287 @@ Handles leverage discovery queries
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import functools
+import json
 import logging
+import multiprocessing
+import os
 import numpy as np
 
+from ..config import load_config, setting
 from ..reasoning.embeddings import EmbeddingService
+from ..reasoning.embedding_cache import EmbeddingCache
+from ..reasoning.reduction import DimensionReducer
 from ..reasoning.fact_cache import FACTCache
 from ..reasoning.safla_agent import SAFLAAgent
 from ..bindings.rust_client import RustSublinearClient
+from ..bindings.circuit_breaker import CircuitBreaker
+from ..index.hnsw import HNSWIndex, build_index_file, save_index, tune_ef_search
+from ..index.quantized import QuantizedIndex
+from ..index.multivector import ChunkIndex
+from ..index.fusion import reciprocal_rank_fusion
 from ..storage.db import RuvScanDB
+from ..storage.async_db import AsyncRuvScanDB
 from ..storage.models import LeverageCard
+from ..storage.vector_store import TOMBSTONE_ID
+from ..monitoring import metrics_collector
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize services
-embedding_service = EmbeddingService()
+config = load_config()
+
+def load_reducer(config: Dict[str, Any]) -> Optional[DimensionReducer]:
+    """Reducer named by ``llm.embedding_reduction``; None when reduction is off or not fitted yet"""
+    method = setting(config, "llm.embedding_reduction.method", "none")
+    if method == "none":
+        return None
+
+    path = setting(config, "llm.embedding_reduction.path", "data/embedding_reducer.npz")
+    if method == "truncate" and not os.path.exists(path):
+        return DimensionReducer(setting(config, "llm.embedding_reduction.dimension", 384), method)
+    if not os.path.exists(path):
+        logger.warning(f"Embedding reduction '{method}' has no fitted reducer at {path}; embeddings are not reduced")
+        return None
+    return DimensionReducer.load(path)
+
+def create_embedding_cache(config: Dict[str, Any]) -> Optional[EmbeddingCache]:
+    """
+    Embedding cache from ``llm.embedding_cache``; None when caching is off
+
+    The cache starts as an in-memory LRU of ``llm.embedding_cache_lru``
+    vectors; the server attaches the database (``cache.db``) at startup so
+    entries persist.
+    """
+    if not setting(config, "llm.embedding_cache", True):
+        return None
+    return EmbeddingCache(lru_size=setting(config, "llm.embedding_cache_lru", 10000))
+
+def create_embedding_service(config: Dict[str, Any], reduce: bool = True) -> EmbeddingService:
+    """
+    Embedding service from the ``llm`` config section
+
+    Falls back to the local embedder when OpenAI is configured but
+    OPENAI_API_KEY is not set, so the server starts without credentials.
+    All services share the module's ``embedding_cache``; its keys include
+    the provider and model.
+
+    Args:
+        config: Loaded configuration
+        reduce: Apply the configured ``llm.embedding_reduction``
+    """
+    provider = setting(config, "llm.embedding_provider", "openai")
+    if provider == "openai" and not os.getenv("OPENAI_API_KEY"):
+        logger.warning("OPENAI_API_KEY is not set, using the local embedder")
+        provider = "local"
+
+    return EmbeddingService(
+        provider=provider,
+        model=setting(config, "llm.embedding_model", "text-embedding-3-small"),
+        local_model_path=setting(config, "llm.local_embedding_model"),
+        max_concurrency=setting(config, "llm.embedding_concurrency", 8),
+        max_retries=setting(config, "llm.embedding_max_retries", 5),
+        backoff_base=setting(config, "llm.embedding_backoff", 0.5),
+        coalesce=setting(config, "llm.embedding_coalesce", False),
+        coalesce_max_batch=setting(config, "llm.embedding_coalesce_max_batch", 64),
+        coalesce_max_wait_ms=setting(config, "llm.embedding_coalesce_max_wait_ms", 5),
+        dtype=setting(config, "llm.embedding_dtype", "float32"),
+        cache=embedding_cache,
+        reducer=load_reducer(config) if reduce else None
+    )
+
+def serving_embedding_service(active_version: str, target: EmbeddingService) -> EmbeddingService:
+    """
+    Embedding service matching the database's active version
+
+    While a re-embedding job moves the corpus to ``target``, queries must
+    keep embedding intents the way the active version was built. That is
+    reconstructible when only the reducer changed; otherwise ``target`` is
+    returned and vector scores are unreliable until the switch.
+    """
+    if active_version == target.embedding_version:
+        return target
+    if target.reducer is not None and active_version == target.model_id:
+        return create_embedding_service(config, reduce=False)
+
+    logger.warning(
+        f"Cannot rebuild the embedder for active version {active_version}; "
+        f"serving {target.embedding_version} until re-embedding completes"
+    )
+    return target
+
+def create_rust_client(config: Dict[str, Any]) -> RustSublinearClient:
+    """Rust engine client and circuit breaker from the ``rust_engine`` config section"""
+    breaker = CircuitBreaker(
+        "rust_engine",
+        failure_threshold=setting(config, "rust_engine.circuit_breaker.failure_threshold", 5),
+        slow_call_ms=setting(config, "rust_engine.circuit_breaker.slow_call_ms", 1000.0),
+        reset_timeout=setting(config, "rust_engine.circuit_breaker.reset_timeout", 10.0),
+        half_open_max_calls=setting(config, "rust_engine.circuit_breaker.half_open_max_calls", 1)
+    )
+    return RustSublinearClient(
+        host=setting(config, "rust_engine.host", "localhost"),
+        port=setting(config, "rust_engine.port", 50051),
+        pool_size=setting(config, "rust_engine.pool_size", 4),
+        timeout=setting(config, "rust_engine.timeout", 30.0),
+        keepalive_ms=setting(config, "rust_engine.keepalive_ms", 30000),
+        vector_encoding=setting(config, "rust_engine.vector_encoding", "float32"),
+        fallback_timeout=setting(config, "rust_engine.fallback_timeout", 2.0),
+        breaker=breaker
+    )
+
+def set_embedding_service(service: EmbeddingService):
+    """Serve /query embeddings with ``service`` and export its coalescer metrics"""
+    global embedding_service
+    embedding_service = service
+    metrics_collector.register_coalescer("query_embeddings", service.coalescer)
+
+# Initialize services; the server swaps embedding_service through set_embedding_service
+embedding_cache = create_embedding_cache(config)
+set_embedding_service(create_embedding_service(config))
 fact_cache = FACTCache()
 safla_agent = SAFLAAgent(fact_cache)
-rust_client = RustSublinearClient()
+rust_client = create_rust_client(config)
+metrics_collector.register_breaker("rust_engine", rust_client.breaker)
+
+# ANN index settings (`index` in config/config.yaml)
+ANN_ENABLED = setting(config, "index.enabled", True)
+ANN_MIN_CORPUS_SIZE = setting(config, "index.min_corpus_size", 50000)
+ANN_INDEX_PATH = setting(config, "index.path", "data/ruvscan.hnsw.npz")
+ANN_PARAMS = {
+    "M": setting(config, "index.M", 16),
+    "ef_construction": setting(config, "index.ef_construction", 200),
+    "ef_search": setting(config, "index.ef_search", 64)
+}
+# ANN is only served when sampled recall@10 reaches ANN_MIN_RECALL (ef_search
+# is raised up to ANN_MAX_EF to get there); writes are applied to the graph
+# incrementally unless they touch more than ANN_MAX_DELTA_FRACTION of the rows
+# or tombstones pass ANN_MAX_DELETED_FRACTION, which trigger a full rebuild
+ANN_MIN_RECALL = setting(config, "index.min_recall", 0.9)
+ANN_MAX_EF = setting(config, "index.max_ef_search", 512)
+ANN_MAX_DELTA_FRACTION = setting(config, "index.max_delta_fraction", 0.05)
+ANN_MAX_DELETED_FRACTION = setting(config, "index.max_deleted_fraction", 0.2)
+ANN_BUILD_PROCESS = setting(config, "index.build_process", True)
+ANN_SAVE_EVERY = setting(config, "index.save_every", 1000)
+
+# Int8 scan for corpora below the ANN threshold; README chunk (multi-vector) scoring
+QUANTIZATION = setting(config, "index.quantization", "none")
+RERANK_FACTOR = setting(config, "index.rerank_factor", 4)
+README_CHUNKS = setting(config, "index.readme_chunks", False)
+TOP_CHUNKS = setting(config, "index.top_chunks", 1)
+CHUNK_TOKENS = setting(config, "index.chunk_tokens", 256)
+CHUNK_OVERLAP = setting(config, "index.chunk_overlap", 32)
+
+class CorpusIndexCache:
+    """
+    Index derived from a database matrix, refreshed off the request path
+
+    ``get`` returns the current index and, when the matrix revision has
+    moved, starts a background refresh. With an ``update`` callable the
+    refresh hands it the rows written since the index's revision;
+    otherwise (or when ``update`` returns None) it loads the matrix and
+    runs ``build``. Both run on the default executor. Until the first
+    build finishes ``get`` returns None (callers scan exactly); afterwards
+    the previous index keeps serving while it covers the same store
+    generation.
+
+    Args:
+        build: ``build(ids, matrix)`` returning the index
+        chunks: Index the README chunk matrix instead of the repo matrix
+        update: ``update(index, ids, matrix, rows)`` applying changed rows
+            to ``index`` in place; returns the index, or None to rebuild
+        usable: Predicate an index has to pass to be served
+    """
+
+    def __init__(
+        self,
+        build: Callable[[np.ndarray, np.ndarray], Any],
+        chunks: bool = False,
+        update: Optional[Callable[[Any, np.ndarray, np.ndarray, np.ndarray], Any]] = None,
+        usable: Optional[Callable[[Any], bool]] = None
+    ):
+        self.build = build
+        self.chunks = chunks
+        self.update = update
+        self.usable = usable
+        self.index: Optional[Any] = None
+        self.revision: Optional[Tuple] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+    async def _revision(self, db: AsyncRuvScanDB) -> Tuple:
+        if self.chunks:
+            return await db.get_chunk_matrix_revision()
+        return await db.get_embedding_matrix_revision()
+
+    async def get(self, db: AsyncRuvScanDB, rows: Optional[int] = None) -> Optional[Any]:
+        """
+        Current index for ``db``
+
+        Args:
+            db: Database the matrix comes from
+            rows: Rows in the caller's matrix; a row-labelled index built
+                over more rows than that is not served
+        """
+        revision = await self._revision(db)
+        loop = asyncio.get_running_loop()
+        if revision != self.revision and (
+            self.refresh_task is None
+            or self.refresh_task.done()
+            or self.refresh_task.get_loop() is not loop
+        ):
+            self.refresh_task = loop.create_task(self.refresh(db))
+
+        if self.index is None or self.revision[:2] != revision[:2]:
+            return None
+        if rows is not None and len(self.index) > rows:
+            return None
+        if self.usable is not None and not self.usable(self.index):
+            return None
+        return self.index
+
+    async def refresh(self, db: AsyncRuvScanDB):
+        """Bring the index up to the database's current matrix"""
+        # Read the revision first: a write after it triggers another refresh
+        revision = await self._revision(db)
+        ids, matrix = await (db.get_chunk_matrix() if self.chunks else db.get_embedding_matrix())
+
+        try:
+            loop = asyncio.get_running_loop()
+            index = None
+            if self.update is not None and not self.chunks and self.index is not None \
+                    and self.revision[:2] == revision[:2]:
+                changed = await db.get_embedding_matrix_changes(self.revision[2])
+                if changed is not None:
+                    index = await loop.run_in_executor(None, self.update, self.index, ids, matrix, changed)
+            if index is None:
+                index = await loop.run_in_executor(None, self.build, ids, matrix)
+        except Exception as e:
+            logger.error(f"Index refresh failed, using exact search: {e}")
+            return
+
+        self.index, self.revision = index, revision
+
+    def reset(self):
+        """Forget the index, e.g. when the database is closed"""
+        if self.refresh_task is not None and not self.refresh_task.done():
+            self.refresh_task.cancel()
+        self.index, self.revision, self.refresh_task = None, None, None
+
+# Hybrid retrieval settings (`hybrid` in config/config.yaml)
+HYBRID_PARAMS = {
+    "enabled": setting(config, "hybrid.enabled", True),
+    "lexical_candidates": setting(config, "hybrid.lexical_candidates", 200),
+    "vector_weight": setting(config, "hybrid.vector_weight", 1.0),
+    "lexical_weight": setting(config, "hybrid.lexical_weight", 1.0),
+    "rrf_k": setting(config, "hybrid.rrf_k", 60)
+}
+
+# Repo database, opened by the server at startup; mock repos are served while unset
+repo_db: Optional[AsyncRuvScanDB] = None
 
 class QueryRequest(BaseModel):
     """Request to query for leverage"""
@@ -32,6 +293,10 @@ class QueryRequest(BaseModel):
     max_results: int = Field(10, gt=0, le=100)
     min_score: float = Field(0.7, ge=0.0, le=1.0)
 
+class IngestRequest(BaseModel):
+    """Scanned repositories to store"""
+    repos: List[Dict[str, Any]] = Field(..., min_length=1)
+
 @router.post("/query", response_model=List[LeverageCard])
 async def query_leverage(request: QueryRequest):
     """
@@ -46,52 +311,77 @@ async def query_leverage(request: QueryRequest):
         cached = fact_cache.get(f"query:{request.intent}")
         if cached:
             logger.info("Returning cached query results")
-            import json
             return json.loads(cached['response'])
 
         # Generate embedding for intent
         logger.info("Generating embedding for query intent")
         intent_embedding = await embedding_service.embed_text(request.intent)
 
-        # Get all repo embeddings from database
-        # TODO: Implement database retrieval
-        # For now, create mock data
-        mock_repos = create_mock_repos()
+        # Read before the matrix, so a write in between only forces an extra upload
+        corpus_key = await repo_db.get_embedding_matrix_revision() if repo_db is not None else None
+        repo_ids, corpus_embeddings, repos = await load_corpus()
 
-        # Compute similarities using Rust engine
-        logger.info(f"Computing sublinear similarity against {len(mock_repos)} repos")
-        corpus_embeddings = [repo['embedding'] for repo in mock_repos]
+        # Compute similarities using Rust engine (falls back locally if it is down)
+        await rust_client.connect()
+        logger.info(f"Computing sublinear similarity against {len(repo_ids)} repos")
 
-        similarities = await rust_client.compute_similarity(
-            intent_embedding,
-            corpus_embeddings,
-            distortion=0.5
+        # Vector top-k, README chunk and BM25 candidates are fetched concurrently
+        similarities, chunk_hits, lexical = await asyncio.gather(
+            vector_candidates(intent_embedding, corpus_embeddings, request.max_results, corpus_key, repo_ids),
+            chunk_candidates(intent_embedding, request.max_results),
+            lexical_candidates(request.intent)
         )
 
+        # Retired rows (id -1) hold zero vectors
+        similarities = [(row, score) for row, score in similarities if repo_ids[row] >= 0]
+        if chunk_hits:
+            similarities = merge_chunk_hits(repo_ids, similarities, chunk_hits)
+
         # Filter by minimum score
         filtered = [
             (idx, score) for idx, score in similarities
             if score >= request.min_score
         ][:request.max_results]
 
+        if lexical:
+            filtered = fuse_rankings(
+                repo_ids, corpus_embeddings, intent_embedding,
+                filtered, lexical, request.max_results,
+                min_score=request.min_score
+            )
+
         logger.info(f"Found {len(filtered)} repos above threshold {request.min_score}")
 
+        if repos is None:
+            repos = await repo_db.get_repos_by_id([int(repo_ids[row]) for row, _ in filtered])
+
         # Generate leverage cards with SAFLA reasoning
         leverage_cards = []
         for idx, score in filtered:
-            repo_data = mock_repos[idx]
+            repo_data = repos.get(int(repo_ids[idx]))
+            if repo_data is None:
+                continue
 
             # Generate SAFLA reasoning
             card = safla_agent.generate_leverage_card(
                 repo_data=repo_data,
                 query_intent=request.intent,
-                similarity_score=score
+                # float32 rounding can put a perfect match just above 1.0
+                similarity_score=min(max(score, 0.0), 1.0)
             )
 
-            leverage_cards.append(LeverageCard(**card))
+            leverage_cards.append(LeverageCard(
+                **card, repo_id=repo_data['id'], query_intent=request.intent
+            ))
+
+        # Save the cards so /cards can page through them
+        if repo_db is not None and leverage_cards:
+            try:
+                await repo_db.add_cards_bulk([card.dict() for card in leverage_cards])
+            except Exception as e:
+                logger.warning(f"Failed to save leverage cards: {e}")
 
         # Cache results
-        import json
         fact_cache.set(
             f"query:{request.intent}",
             json.dumps([card.dict() for card in leverage_cards]),
@@ -105,6 +395,371 @@ async def query_leverage(request: QueryRequest):
         logger.error(f"Query error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_corpus() -> Tuple[np.ndarray, np.ndarray, Optional[Dict[int, dict]]]:
+    """
+    Corpus searched by /query
+
+    Returns:
+        (repo_ids, matrix, repos): ``repo_ids[i]`` owns ``matrix[i]``. With a
+        database, the matrix is the memory-mapped active embedding matrix
+        and ``repos`` is None (metadata is fetched for the results only);
+        without one, mock repos are returned with their metadata.
+    """
+    if repo_db is None:
+        mock_repos = create_mock_repos()
+        return (
+            np.array([repo['id'] for repo in mock_repos], dtype=np.int64),
+            np.stack([repo['embedding'] for repo in mock_repos]),
+            {repo['id']: repo for repo in mock_repos}
+        )
+
+    repo_ids, matrix = await repo_db.get_embedding_matrix()
+    return repo_ids, matrix, None
+
+async def vector_candidates(
+    intent_embedding: np.ndarray,
+    corpus_embeddings: np.ndarray,
+    max_results: int,
+    corpus_key: Optional[Tuple] = None,
+    repo_ids: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
+    """
+    Vector top-k as (row, cosine) pairs; empty for an empty corpus
+
+    With a ``corpus_key`` (the matrix revision), an exact scan on the Rust
+    engine queries a resident copy of the corpus. Writes reach it as row
+    deltas (see ``resident_corpus_delta``) applied in the background, so
+    hits from a resident snapshot or an index are re-scored against the
+    current rows.
+    """
+    if len(corpus_embeddings) == 0:
+        return []
+
+    corpus_delta = None
+    if corpus_key is not None and repo_ids is not None:
+        corpus_delta = functools.partial(resident_corpus_delta, corpus_key, repo_ids)
+
+    index = await get_corpus_index(corpus_embeddings)
+    similarities = await rust_client.compute_similarity(
+        intent_embedding,
+        corpus_embeddings,
+        distortion=0.5,
+        max_results=max_results,
+        # The matrix store keeps rows unit length
+        normalized=repo_db is not None,
+        index=index,
+        corpus_key=corpus_key,
+        corpus_name="repos",
+        corpus_delta=corpus_delta
+    )
+    if index is None and corpus_key is None:
+        return similarities
+    return rescore(intent_embedding, corpus_embeddings, similarities)
+
+async def resident_corpus_delta(
+    corpus_key: Tuple,
+    repo_ids: np.ndarray,
+    resident_key: Tuple
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Matrix rows to upsert and to remove to bring a resident corpus from
+    ``resident_key`` to ``corpus_key``
+
+    Returns None when the store was swapped or compacted in between, or
+    its change log no longer reaches back to ``resident_key``.
+    """
+    if repo_db is None or resident_key[:2] != corpus_key[:2]:
+        return None
+
+    rows = await repo_db.get_embedding_matrix_changes(resident_key[2])
+    if rows is None:
+        return None
+
+    # Rows written after this request read the matrix follow with the next key
+    rows = rows[rows < len(repo_ids)]
+    live = repo_ids[rows] != TOMBSTONE_ID
+    return rows[live], rows[~live]
+
+@router.post("/ingest")
+async def ingest(request: IngestRequest):
+    """Embed and store repositories sent by the scanner workers"""
+    if repo_db is None:
+        raise HTTPException(status_code=503, detail="Repository database is not open")
+
+    try:
+        repo_ids = await ingest_repos(request.repos)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"status": "ingested", "repo_ids": repo_ids}
+
+async def ingest_repos(repos: List[Dict[str, Any]]) -> List[int]:
+    """
+    Embed and store repositories, with their README chunks when chunk scoring is on
+
+    Args:
+        repos: Repo dicts with at least ``full_name``
+
+    Returns:
+        Repo ids in input order
+
+    Raises:
+        ValueError: The embeddings are not of the active version (re-embedding
+            switched models while the batch was being embedded)
+    """
+    version = embedding_service.embedding_version
+    # embed_repos yields in input order
+    vectors = [vector async for _, vector in embedding_service.embed_repos(repos)]
+
+    repo_ids = await repo_db.add_repos_bulk([
+        {**repo, 'embedding': vector, 'embedding_version': version}
+        for repo, vector in zip(repos, vectors)
+    ])
+
+    if README_CHUNKS:
+        for repo_id, repo in zip(repo_ids, repos):
+            chunks, embeddings = await embedding_service.embed_repo_chunks(
+                repo, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP
+            )
+            await repo_db.set_repo_chunks(repo_id, chunks, embeddings, version=version)
+
+    logger.info(f"Ingested {len(repo_ids)} repos")
+    return repo_ids
+
+async def chunk_candidates(intent_embedding: np.ndarray, max_results: int) -> List[Tuple[int, float]]:
+    """README chunk max-sim (repo_id, cosine) candidates, empty when chunk scoring is off"""
+    if repo_db is None or not README_CHUNKS:
+        return []
+
+    index = await chunk_cache.get(repo_db)
+    if index is None:
+        return []
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(index.search, intent_embedding, max_results, top_chunks=TOP_CHUNKS)
+    )
+
+def merge_chunk_hits(
+    repo_ids: Sequence[int],
+    similarities: List[Tuple[int, float]],
+    chunk_hits: List[Tuple[int, float]]
+) -> List[Tuple[int, float]]:
+    """
+    Combine repo-vector and chunk scores, keeping each repo's best cosine
+
+    Args:
+        repo_ids: Repo id of each corpus row
+        similarities: (row, cosine) pairs from the repo vectors
+        chunk_hits: (repo_id, cosine) pairs from README chunks; repos
+            without a repo vector are skipped
+
+    Returns:
+        (row, cosine) pairs, best first
+    """
+    row_by_id = {int(repo_id): row for row, repo_id in enumerate(repo_ids) if repo_id >= 0}
+    best = dict(similarities)
+    for repo_id, score in chunk_hits:
+        row = row_by_id.get(repo_id)
+        if row is not None and score > best.get(row, -1.0):
+            best[row] = score
+
+    return sorted(best.items(), key=lambda item: -item[1])
+
+async def lexical_candidates(intent: str) -> List[Tuple[int, float]]:
+    """BM25 (repo_id, score) candidates for an intent, empty when hybrid search is off"""
+    if repo_db is None or not HYBRID_PARAMS["enabled"]:
+        return []
+
+    try:
+        return await repo_db.search_repos_text(intent, HYBRID_PARAMS["lexical_candidates"])
+    except Exception as e:
+        # Lexical search only refines the ranking; serve vector results without it
+        logger.warning(f"Lexical search failed, using vector ranking only: {e}")
+        return []
+
+def fuse_rankings(
+    repo_ids: Sequence[int],
+    corpus_embeddings: np.ndarray,
+    intent_embedding: np.ndarray,
+    vector_results: List[Tuple[int, float]],
+    lexical_results: List[Tuple[int, float]],
+    limit: int,
+    min_score: float = 0.0
+) -> List[Tuple[int, float]]:
+    """
+    Reciprocal rank fusion of vector and BM25 results
+
+    Args:
+        repo_ids: Repo id of each corpus row; vector results index into it
+        corpus_embeddings: Corpus matrix, one row per repo
+        intent_embedding: Query vector
+        vector_results: (row, cosine) pairs, best first
+        lexical_results: (repo_id, bm25) pairs, best first
+        limit: Fused results kept for card generation
+        min_score: Minimum cosine; lexical-only hits are held to it too
+
+    Returns:
+        (row, cosine) pairs in fused order; lexical-only hits are scored
+        against the intent so cards keep a similarity score
+    """
+    row_by_id = {int(repo_id): row for row, repo_id in enumerate(repo_ids) if repo_id >= 0}
+    lexical_rows = [(row_by_id[repo_id], score) for repo_id, score in lexical_results if repo_id in row_by_id]
+
+    fused = reciprocal_rank_fusion(
+        [vector_results, lexical_rows],
+        weights=[HYBRID_PARAMS["vector_weight"], HYBRID_PARAMS["lexical_weight"]],
+        k=HYBRID_PARAMS["rrf_k"]
+    )
+
+    cosine = dict(vector_results)
+    results = []
+    for row, _ in fused:
+        if len(results) >= limit:
+            break
+        if row not in cosine:
+            vector = np.asarray(corpus_embeddings[row], dtype=np.float32)
+            norms = np.linalg.norm(vector) * np.linalg.norm(intent_embedding)
+            cosine[row] = float(np.dot(vector, intent_embedding) / norms) if norms > 0 else 0.0
+        if cosine[row] >= min_score:
+            results.append((row, cosine[row]))
+
+    return results
+
+async def get_corpus_index(corpus_embeddings: np.ndarray) -> Optional[Any]:
+    """
+    Index replacing the full scan of the database corpus, labelled by row
+
+    HNSW from ANN_MIN_CORPUS_SIZE rows up, the int8 scan below that when
+    ``index.quantization`` is "int8"; None means an exact scan.
+    """
+    if repo_db is None:
+        return None
+
+    rows = len(corpus_embeddings)
+    index = None
+    if ANN_ENABLED and rows >= ANN_MIN_CORPUS_SIZE:
+        index = await ann_cache.get(repo_db, rows)
+    if index is None and QUANTIZATION == "int8":
+        index = await quantized_cache.get(repo_db, rows)
+    return index
+
+def build_ann_index(ids: np.ndarray, matrix: np.ndarray) -> HNSWIndex:
+    """
+    HNSW index over the live rows of ``matrix``, labelled by row
+
+    The index persisted at ANN_INDEX_PATH is reused when it was built with
+    ANN_PARAMS: it is brought in line with the matrix by
+    ``update_ann_index``, comparing every row. Otherwise, or when too much
+    has changed, a new index is built and tuned (see ``tune_ef_search``),
+    in a worker process when ``index.build_process`` is set, and saved.
+    """
+    path = ANN_INDEX_PATH
+    if path and os.path.exists(path):
+        try:
+            index = HNSWIndex.load(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable HNSW index {path}: {e}")
+            index = None
+
+        if index is not None and (index.M, index.ef_construction) == (ANN_PARAMS["M"], ANN_PARAMS["ef_construction"]):
+            if index.recall is None:
+                tune_ef_search(index, min_recall=ANN_MIN_RECALL, max_ef=ANN_MAX_EF)
+            synced = update_ann_index(index, ids, matrix, np.arange(len(ids)))
+            if synced is not None:
+                return synced
+
+    rows = np.flatnonzero(ids != TOMBSTONE_ID)
+    tuning = {"min_recall": ANN_MIN_RECALL, "max_ef": ANN_MAX_EF}
+    if ANN_BUILD_PROCESS and path:
+        # Memory-mapped stores are re-opened by the worker instead of pickled
+        if isinstance(matrix, np.memmap):
+            source = (matrix.filename, matrix.dtype.str, matrix.shape)
+        else:
+            source = np.asarray(matrix)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(build_index_file, source, rows, path, ANN_PARAMS, tuning).result()
+        index = HNSWIndex.load(path)
+    else:
+        index = HNSWIndex.build(rows, matrix[rows], **ANN_PARAMS)
+        result = tune_ef_search(index, **tuning)
+        if path:
+            save_index(index, path)
+
+    logger.info(
+        f"HNSW index over {len(index)} vectors: sampled recall@10 {result['recall']:.3f} "
+        f"at ef_search={result['ef']} (floor {ANN_MIN_RECALL})"
+    )
+    return index
+
+def update_ann_index(
+    index: HNSWIndex,
+    ids: np.ndarray,
+    matrix: np.ndarray,
+    rows: np.ndarray
+) -> Optional[HNSWIndex]:
+    """
+    Apply changed matrix rows to ``index`` in place
+
+    Retired rows (and rows past the end of the matrix) are deleted, new or
+    changed rows re-inserted. Returns None, leaving a rebuild to the
+    caller, when more than ANN_MAX_DELTA_FRACTION of the rows changed or
+    tombstones exceed ANN_MAX_DELETED_FRACTION of the graph.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    vectors = matrix if len(rows) == len(ids) else matrix[rows]
+    max_changes = max(ANN_SAVE_EVERY, int(ANN_MAX_DELTA_FRACTION * len(ids)))
+
+    applied = index.update(rows, vectors, live=ids[rows] != TOMBSTONE_ID, max_changes=max_changes)
+    if applied is None:
+        logger.info(f"Over {max_changes} matrix rows changed, rebuilding the HNSW index")
+        return None
+    for label in index.labels():
+        if label >= len(ids):
+            index.delete(label)
+
+    if index.deleted_count > ANN_MAX_DELETED_FRACTION * (len(index) + index.deleted_count):
+        logger.info(f"{index.deleted_count} tombstones in the HNSW index, rebuilding it")
+        return None
+
+    if ANN_INDEX_PATH and index.unsaved_changes >= ANN_SAVE_EVERY:
+        save_index(index, ANN_INDEX_PATH)
+    logger.info(f"Applied {applied} changed rows to the HNSW index")
+    return index
+
+def rescore(
+    intent_embedding: np.ndarray,
+    corpus_embeddings: np.ndarray,
+    similarities: List[Tuple[int, float]]
+) -> List[Tuple[int, float]]:
+    """
+    Re-score hits against the current matrix rows, best first
+
+    Indexes and resident corpora are refreshed in the background, so a hit
+    may carry the score of a vector that has since been overwritten.
+    """
+    rows = [row for row, _ in similarities if row < len(corpus_embeddings)]
+    if not rows:
+        return []
+
+    vectors = np.asarray(corpus_embeddings[rows], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(intent_embedding)
+    scores = np.divide(vectors @ intent_embedding.astype(np.float32), norms, out=np.zeros(len(rows)), where=norms > 0)
+    return sorted(zip(rows, scores.tolist()), key=lambda item: -item[1])
+
+ann_cache = CorpusIndexCache(
+    build_ann_index,
+    update=update_ann_index,
+    usable=lambda index: (index.recall or 0.0) >= ANN_MIN_RECALL
+)
+quantized_cache = CorpusIndexCache(
+    lambda ids, matrix: QuantizedIndex(range(len(matrix)), matrix, rerank_factor=RERANK_FACTOR)
+)
+chunk_cache = CorpusIndexCache(
+    lambda ids, matrix: ChunkIndex(ids, matrix, top_chunks=TOP_CHUNKS),
+    chunks=True
+)
+
 def create_mock_repos() -> List[dict]:
     """Create mock repository data for testing"""
     return [
@@ -0,0 +1,18 @@
+"""Approximate nearest-neighbour indexes for RuvScan"""
+
+from .hnsw import HNSWIndex, recall_report, tune_ef_search
+from .quantized import QuantizedIndex, quantize_int8
+from .multivector import ChunkIndex, segment_top_mean
+from .fusion import reciprocal_rank_fusion, hybrid_report
+
+__all__ = [
+    'HNSWIndex',
+    'recall_report',
+    'tune_ef_search',
+    'QuantizedIndex',
+    'quantize_int8',
+    'ChunkIndex',
+    'segment_top_mean',
+    'reciprocal_rank_fusion',
+    'hybrid_report'
+]
@@ -0,0 +1,106 @@
+"""
+Hybrid lexical + vector ranking
+Reciprocal rank fusion of BM25 and embedding result lists
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Ranking = Sequence[Tuple[Hashable, float]]
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Ranking],
+    weights: Optional[Sequence[float]] = None,
+    k: int = 60,
+    limit: Optional[int] = None
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists by weighted reciprocal rank
+
+    Each list contributes ``weight / (k + rank)`` (rank starting at 1) to
+    every item it contains; only ranks matter, so BM25 and cosine scores
+    need no calibration against each other.
+
+    Args:
+        rankings: Result lists of (item, score), best first
+        weights: Weight per list (all 1.0 when None)
+        k: Rank damping constant; larger values flatten the head of each list
+        limit: Keep only the best this many fused items
+
+    Returns:
+        List of (item, fused_score) tuples, best first
+    """
+    weights = list(weights) if weights is not None else [1.0] * len(rankings)
+    if len(weights) != len(rankings):
+        raise ValueError(f"Got {len(weights)} weights for {len(rankings)} rankings")
+
+    fused: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, (item, _) in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + weight / (k + rank)
+
+    # Ties keep first-seen order, i.e. the earlier list wins
+    ordered = sorted(fused.items(), key=lambda pair: -pair[1])
+    return ordered[:limit] if limit is not None else ordered
+
+def hybrid_report(
+    queries: Sequence[Tuple[str, np.ndarray, Set[Hashable]]],
+    vector_search: Callable[[np.ndarray, int], Ranking],
+    lexical_search: Callable[[str, int], Ranking],
+    k: int = 10,
+    lexical_candidates: int = 100,
+    weights: Sequence[float] = (1.0, 1.0),
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Compare vector-only and hybrid ranking on labelled queries
+
+    Args:
+        queries: (intent text, intent vector, relevant ids) per query
+        vector_search: ``(vector, k) -> [(id, score)]``
+        lexical_search: ``(text, limit) -> [(id, score)]``
+        k: Results per query
+        lexical_candidates: BM25 candidates fused per query
+        weights: (vector, lexical) RRF weights
+        rrf_k: RRF damping constant
+
+    Returns:
+        One row per mode ("vector", "hybrid") with recall@k, MRR and mean latency
+    """
+    rows = {mode: {"hits": 0, "relevant": 0, "rr": 0.0, "latencies": []} for mode in ("vector", "hybrid")}
+
+    for text, vector, relevant in queries:
+        start = time.perf_counter()
+        vector_results = list(vector_search(vector, k))
+        vector_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        lexical_results = list(lexical_search(text, lexical_candidates))
+        fused = reciprocal_rank_fusion(
+            [vector_results, lexical_results], weights, k=rrf_k, limit=k
+        )
+        # Sequential upper bound; the query endpoint runs both searches concurrently
+        hybrid_ms = vector_ms + (time.perf_counter() - start) * 1000
+
+        for mode, results, latency in (("vector", vector_results, vector_ms), ("hybrid", fused, hybrid_ms)):
+            found = [item for item, _ in results[:k]]
+            row = rows[mode]
+            row["hits"] += len(relevant.intersection(found))
+            row["relevant"] += min(len(relevant), k)
+            row["rr"] += next((1.0 / rank for rank, item in enumerate(found, 1) if item in relevant), 0.0)
+            row["latencies"].append(latency)
+
+    return [
+        {
+            "mode": mode,
+            "recall": row["hits"] / max(1, row["relevant"]),
+            "mrr": row["rr"] / max(1, len(queries)),
+            "mean_latency_ms": float(np.mean(row["latencies"])) if row["latencies"] else 0.0
+        }
+        for mode, row in rows.items()
+    ]
@@ -0,0 +1,663 @@
+"""
+Hierarchical Navigable Small World (HNSW) index
+Approximate nearest-neighbour search over repo embeddings
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from typing import List, Tuple, Optional, Dict, Any, Iterable, Sequence, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class HNSWIndex:
+    """
+    In-process HNSW graph index using cosine similarity
+
+    Vectors are stored unit-normalized as float32, so distance is
+    ``1 - dot(a, b)``. Deleted labels are tombstoned: they remain in the
+    graph for navigation but are never returned; ``deleted_count`` tells
+    owners when a rebuild is worth it.
+
+    ``insert``, ``delete`` and ``search`` are serialized by a lock, so one
+    writer can apply changes while other threads search.
+
+    Args:
+        dimension: Vector dimension
+        M: Max neighbours per node on upper layers (2*M on layer 0)
+        ef_construction: Candidate list size while inserting
+        ef_search: Default candidate list size while searching
+        seed: Seed for level assignment
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        seed: int = 42
+    ):
+        if M < 2:
+            raise ValueError("M must be at least 2")
+
+        self.dimension = dimension
+        self.M = M
+        self.max_M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+
+        self._level_mult = 1.0 / math.log(M)
+        self._rng = np.random.default_rng(seed)
+
+        self._data = np.empty((0, dimension), dtype=np.float32)
+        self._count = 0
+        self._labels: List[int] = []
+        self._levels: List[int] = []
+        self._links: List[List[List[int]]] = []
+        self._deleted: List[bool] = []
+        self._label_to_node: Dict[int, int] = {}
+
+        self.entry_point: Optional[int] = None
+        self.max_level = -1
+
+        # Sampled recall@10 at ef_search, set by tune_ef_search
+        self.recall: Optional[float] = None
+        self.unsaved_changes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._label_to_node)
+
+    def __contains__(self, label: int) -> bool:
+        return label in self._label_to_node
+
+    @property
+    def deleted_count(self) -> int:
+        """Tombstoned nodes still in the graph"""
+        return self._count - len(self._label_to_node)
+
+    def labels(self) -> List[int]:
+        """Live labels"""
+        return list(self._label_to_node)
+
+    @classmethod
+    def build(
+        cls,
+        labels: Sequence[int],
+        vectors: np.ndarray,
+        **params
+    ) -> 'HNSWIndex':
+        """
+        Build an index from a corpus
+
+        Args:
+            labels: External id for each row (e.g. repo ids)
+            vectors: 2-D matrix with one vector per row
+            **params: Constructor parameters (M, ef_construction, ...)
+
+        Returns:
+            Populated index
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        index = cls(vectors.shape[1], **params)
+        index._reserve(len(vectors))
+
+        start = time.time()
+        for label, vector in zip(labels, vectors):
+            index.insert(int(label), vector)
+
+        logger.info(
+            f"Built HNSW index over {len(index)} vectors in "
+            f"{(time.time() - start) * 1000:.0f}ms (M={index.M}, ef_construction={index.ef_construction})"
+        )
+        return index
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._data):
+            return
+        grown = np.empty((capacity, self.dimension), dtype=np.float32)
+        grown[:self._count] = self._data[:self._count]
+        self._data = grown
+
+    def _normalize(self, vector: np.ndarray) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vec.shape[0] != self.dimension:
+            raise ValueError(f"Vector has dimension {vec.shape[0]}, index expects {self.dimension}")
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _random_level(self) -> int:
+        return int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+
+    def _distances(self, query: np.ndarray, nodes: Sequence[int]) -> np.ndarray:
+        return 1.0 - self._data[list(nodes)] @ query
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int
+    ) -> List[Tuple[float, int]]:
+        """Greedy best-first search on one layer; returns (distance, node) ascending"""
+        visited = set(entry_points)
+        entry_dists = self._distances(query, entry_points)
+
+        candidates = [(float(d), n) for d, n in zip(entry_dists, entry_points)]
+        heapq.heapify(candidates)
+        # Max-heap of the current best results via negated distances
+        results = [(-d, n) for d, n in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+
+            neighbours = [n for n in self._links[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            for d, n in zip(self._distances(query, neighbours).tolist(), neighbours):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    heapq.heappush(results, (-d, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted((-d, n) for d, n in results)
+
+    def _select_neighbours(
+        self,
+        candidates: List[Tuple[float, int]],
+        max_neighbours: int
+    ) -> List[int]:
+        """Neighbour selection heuristic that favours diverse directions"""
+        if len(candidates) <= max_neighbours:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        vectors = self._data[nodes]
+        # Distance from each candidate to its closest already-selected node
+        closest = np.full(len(nodes), np.inf, dtype=np.float32)
+
+        selected: List[int] = []
+        pruned: List[int] = []
+
+        for i, (dist, node) in enumerate(candidates):
+            if len(selected) >= max_neighbours:
+                break
+            if closest[i] < dist:
+                pruned.append(node)
+                continue
+            selected.append(node)
+            np.minimum(closest, 1.0 - vectors @ vectors[i], out=closest)
+
+        # Keep the graph well connected when the heuristic is too strict
+        for node in pruned:
+            if len(selected) >= max_neighbours:
+                break
+            selected.append(node)
+
+        return selected
+
+    def _connect(self, node: int, neighbours: List[int], level: int):
+        max_links = self.max_M0 if level == 0 else self.M
+        self._links[node][level] = neighbours
+
+        for other in neighbours:
+            links = self._links[other][level]
+            if node in links:
+                continue
+            links.append(node)
+
+            if len(links) > max_links:
+                # Shrinking an overflowing list just drops the farthest link;
+                # running the full heuristic here dominates build time
+                dists = self._distances(self._data[other], links)
+                links.pop(int(np.argmax(dists)))
+
+    def insert(self, label: int, vector: np.ndarray):
+        """
+        Insert a vector, replacing any existing vector for the label
+
+        Args:
+            label: External id
+            vector: Vector of the index dimension
+        """
+        with self._lock:
+            self._insert(label, vector)
+            self.unsaved_changes += 1
+
+    def _insert(self, label: int, vector: np.ndarray):
+        if label in self._label_to_node:
+            self._delete(label)
+
+        vec = self._normalize(vector)
+        if self._count >= len(self._data):
+            self._reserve(max(16, 2 * len(self._data)))
+
+        node = self._count
+        self._data[node] = vec
+        self._count += 1
+
+        level = self._random_level()
+        self._labels.append(label)
+        self._levels.append(level)
+        self._links.append([[] for _ in range(level + 1)])
+        self._deleted.append(False)
+        self._label_to_node[label] = node
+
+        if self.entry_point is None:
+            self.entry_point = node
+            self.max_level = level
+            return
+
+        entry = [self.entry_point]
+        for lvl in range(self.max_level, level, -1):
+            entry = [self._search_layer(vec, entry, 1, lvl)[0][1]]
+
+        for lvl in range(min(level, self.max_level), -1, -1):
+            candidates = self._search_layer(vec, entry, self.ef_construction, lvl)
+            max_links = self.max_M0 if lvl == 0 else self.M
+            self._connect(node, self._select_neighbours(candidates, max_links), lvl)
+            entry = [n for _, n in candidates]
+
+        if level > self.max_level:
+            self.entry_point = node
+            self.max_level = level
+
+    def delete(self, label: int) -> bool:
+        """
+        Remove a label from search results
+
+        Args:
+            label: External id
+
+        Returns:
+            True if the label was present
+        """
+        with self._lock:
+            deleted = self._delete(label)
+            if deleted:
+                self.unsaved_changes += 1
+            return deleted
+
+    def _delete(self, label: int) -> bool:
+        node = self._label_to_node.pop(label, None)
+        if node is None:
+            return False
+
+        self._deleted[node] = True
+        return True
+
+    def update(
+        self,
+        labels: Sequence[int],
+        vectors: np.ndarray,
+        live: Optional[np.ndarray] = None,
+        max_changes: Optional[int] = None,
+        block: int = 8192
+    ) -> Optional[int]:
+        """
+        Bring the index in line with a set of (label, vector) rows
+
+        Rows whose vector is already indexed are skipped, new or changed
+        ones are (re-)inserted and rows that are not ``live`` are deleted,
+        so one call serves both a write delta and a whole re-read matrix.
+        The comparison is vectorised; only real changes reach the graph.
+
+        Args:
+            labels: External id of each row
+            vectors: 2-D matrix with one vector per row (may be memory-mapped)
+            live: Per-row flag; False deletes the label (all live when None)
+            max_changes: Apply nothing and return None when more rows than
+                this changed (a rebuild is cheaper)
+            block: Rows compared at a time
+
+        Returns:
+            Number of labels inserted or deleted, or None (see ``max_changes``)
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        live = np.ones(len(labels), dtype=bool) if live is None else np.asarray(live, dtype=bool)
+
+        changed = []
+        for start in range(0, len(labels), block):
+            stop = start + block
+            nodes = np.array(
+                [self._label_to_node.get(label, -1) for label in labels[start:stop].tolist()],
+                dtype=np.int64
+            )
+            known = nodes >= 0
+            alive = live[start:stop]
+            # Deleted labels, plus live rows that are new ...
+            dirty = known != alive
+            compare = np.flatnonzero(known & alive)
+            if len(compare):
+                # ... or whose vector moved
+                vecs = _unit_rows(np.asarray(vectors[start:stop][compare], dtype=np.float32))
+                moved = np.abs(self._data[nodes[compare]] - vecs).max(axis=1) > 1e-5
+                dirty[compare[moved]] = True
+            changed.extend((start + np.flatnonzero(dirty)).tolist())
+
+        if max_changes is not None and len(changed) > max_changes:
+            return None
+
+        for row in changed:
+            if live[row]:
+                self.insert(int(labels[row]), vectors[row])
+            else:
+                self.delete(int(labels[row]))
+        return len(changed)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        ef: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Approximate k nearest neighbours
+
+        Args:
+            query: Query vector
+            k: Number of results
+            ef: Candidate list size (defaults to ``ef_search``; at least k)
+
+        Returns:
+            List of (label, cosine_similarity) tuples, best first
+        """
+        if k <= 0:
+            return []
+
+        q = self._normalize(query)
+        ef = max(ef or self.ef_search, k)
+
+        with self._lock:
+            return self._search(q, k, ef)
+
+    def _search(self, q: np.ndarray, k: int, ef: int) -> List[Tuple[int, float]]:
+        if self.entry_point is None:
+            return []
+
+        entry = [self.entry_point]
+        for lvl in range(self.max_level, 0, -1):
+            entry = [self._search_layer(q, entry, 1, lvl)[0][1]]
+
+        found = self._search_layer(q, entry, ef, 0)
+        results = [
+            (self._labels[node], 1.0 - dist)
+            for dist, node in found
+            if not self._deleted[node]
+        ]
+        return results[:k]
+
+    def _exact_labels(self, queries: np.ndarray, k: int, block: int = 65536) -> List[List[int]]:
+        """Exact top-k labels for each (unit) query row, scanning live nodes in blocks"""
+        live = np.fromiter(self._label_to_node.values(), dtype=np.int64, count=len(self._label_to_node))
+        k = min(k, len(live))
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_nodes = np.empty((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, len(live), block):
+            nodes = live[start:start + block]
+            scores = np.concatenate([best_scores, queries @ self._data[nodes].T], axis=1)
+            candidates = np.concatenate([best_nodes, np.broadcast_to(nodes, (len(queries), len(nodes)))], axis=1)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_nodes = np.take_along_axis(candidates, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_nodes = np.take_along_axis(best_nodes, order, axis=1)
+        return [[self._labels[node] for node in row] for row in best_nodes.tolist()]
+
+    def exact_search(self, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """Brute-force k nearest neighbours over live vectors, for reference"""
+        live = [node for node in self._label_to_node.values()]
+        if not live or k <= 0:
+            return []
+
+        scores = self._data[live] @ self._normalize(query)
+        k = min(k, len(live))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self._labels[live[i]], float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        """Persist the index to a ``.npz`` file"""
+        link_counts = []
+        link_data = []
+        for node_links in self._links:
+            for layer in node_links:
+                link_counts.append(len(layer))
+                link_data.extend(layer)
+
+        params = {
+            "dimension": self.dimension,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "seed": self.seed,
+            "entry_point": self.entry_point,
+            "max_level": self.max_level,
+            "recall": self.recall
+        }
+
+        np.savez(
+            path,
+            params=np.array(json.dumps(params)),
+            data=self._data[:self._count],
+            labels=np.array(self._labels, dtype=np.int64),
+            levels=np.array(self._levels, dtype=np.int32),
+            deleted=np.array(self._deleted, dtype=bool),
+            link_counts=np.array(link_counts, dtype=np.int32),
+            link_data=np.array(link_data, dtype=np.int32)
+        )
+        self.unsaved_changes = 0
+        logger.info(f"Saved HNSW index with {len(self)} vectors to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'HNSWIndex':
+        """Load an index written by ``save``"""
+        with np.load(path, allow_pickle=False) as archive:
+            params = json.loads(str(archive['params']))
+            index = cls(
+                params['dimension'],
+                M=params['M'],
+                ef_construction=params['ef_construction'],
+                ef_search=params['ef_search'],
+                seed=params['seed']
+            )
+
+            index._data = archive['data'].astype(np.float32)
+            index._count = len(index._data)
+            index._labels = archive['labels'].tolist()
+            index._levels = archive['levels'].tolist()
+            index._deleted = archive['deleted'].tolist()
+            link_counts = archive['link_counts'].tolist()
+            link_data = archive['link_data'].tolist()
+
+        pos = 0
+        layer = 0
+        for level in index._levels:
+            node_links = []
+            for _ in range(level + 1):
+                count = link_counts[layer]
+                node_links.append(link_data[pos:pos + count])
+                pos += count
+                layer += 1
+            index._links.append(node_links)
+
+        index._label_to_node = {
+            label: node
+            for node, label in enumerate(index._labels)
+            if not index._deleted[node]
+        }
+        index.entry_point = params['entry_point']
+        index.max_level = params['max_level']
+        index.recall = params.get('recall')
+
+        logger.info(f"Loaded HNSW index with {len(index)} vectors from {path}")
+        return index
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def tune_ef_search(
+    index: HNSWIndex,
+    min_recall: float = 0.9,
+    max_ef: int = 512,
+    k: int = 10,
+    sample: int = 200,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Raise ``index.ef_search`` until sampled recall@k reaches ``min_recall``
+
+    The queries are ``sample`` indexed vectors. Each query's own label is
+    left out of both the exact and the approximate top-k, so self-matches
+    do not inflate the score. ef doubles from the current ``ef_search`` up
+    to ``max_ef``; when the floor is never reached, the ef with the best
+    recall is kept.
+
+    Returns:
+        {"ef", "recall", "queries"}; ``index.ef_search`` and ``index.recall``
+        are set to the chosen ef and its recall
+    """
+    labels = index.labels()
+    if len(labels) <= k + 1:
+        index.recall = 1.0
+        return {"ef": index.ef_search, "recall": 1.0, "queries": 0}
+
+    rng = np.random.default_rng(seed)
+    query_labels = [labels[i] for i in rng.choice(len(labels), min(sample, len(labels)), replace=False)]
+    queries = index._data[[index._label_to_node[label] for label in query_labels]]
+    truth = [
+        set([found for found in expected if found != label][:k])
+        for label, expected in zip(query_labels, index._exact_labels(queries, k + 1))
+    ]
+
+    ef = max(index.ef_search, k + 1)
+    best = (-1.0, ef)
+    while True:
+        hits = 0
+        for label, query, expected in zip(query_labels, queries, truth):
+            found = [match for match, _ in index.search(query, k + 1, ef=ef) if match != label][:k]
+            hits += len(expected.intersection(found))
+        recall = hits / max(1, sum(len(expected) for expected in truth))
+        if recall > best[0]:
+            best = (recall, ef)
+        if recall >= min_recall or ef >= max_ef:
+            break
+        ef = min(2 * ef, max_ef)
+
+    if recall < min_recall:
+        recall, ef = best
+    index.ef_search, index.recall = ef, recall
+    return {"ef": ef, "recall": recall, "queries": len(query_labels)}
+
+def save_index(index: HNSWIndex, path: str):
+    """Write ``index`` to ``path`` through a temporary file, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    index.save(f"{path}.tmp.npz")
+    os.replace(f"{path}.tmp.npz", path)
+
+def build_index_file(
+    source: Union[np.ndarray, Tuple[str, str, Tuple[int, ...]]],
+    rows: np.ndarray,
+    path: str,
+    params: Dict[str, Any],
+    tuning: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Build, tune and save an index over some rows of a matrix
+
+    Meant to run in a worker process, so the graph build does not hold the
+    server's GIL; the owner loads the result from ``path``.
+
+    Args:
+        source: The matrix, or (filename, dtype, shape) of a matrix file to
+            memory-map, so a large store is not pickled to the worker
+        rows: Row positions to index; each row is labelled by its position
+        path: ``.npz`` file the index is written to
+        params: Constructor parameters (M, ef_construction, ef_search)
+        tuning: ``tune_ef_search`` keyword arguments
+
+    Returns:
+        The ``tune_ef_search`` result plus the number of indexed vectors
+    """
+    if isinstance(source, tuple):
+        filename, dtype, shape = source
+        source = np.memmap(filename, dtype=dtype, mode='r', shape=shape)
+
+    index = HNSWIndex.build(rows, source[rows], **params)
+    result = tune_ef_search(index, **tuning)
+    save_index(index, path)
+    return {**result, "vectors": len(index)}
+
+def recall_report(
+    index: HNSWIndex,
+    queries: np.ndarray,
+    k: int = 10,
+    ef_values: Iterable[int] = (16, 32, 64, 128, 256)
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k and latency of approximate search against exact search
+
+    Args:
+        index: Populated index
+        queries: 2-D matrix with one query per row
+        k: Number of neighbours per query
+        ef_values: Search candidate sizes to evaluate
+
+    Returns:
+        One row per ef with recall and mean/p99 latency; the exact baseline
+        is reported with ``ef`` set to None
+    """
+    queries = np.atleast_2d(queries)
+
+    truth = []
+    exact_latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        truth.append({label for label, _ in index.exact_search(query, k)})
+        exact_latencies.append((time.perf_counter() - start) * 1000)
+
+    report = [{
+        "ef": None,
+        "recall": 1.0,
+        "mean_latency_ms": float(np.mean(exact_latencies)),
+        "p99_latency_ms": float(np.percentile(exact_latencies, 99))
+    }]
+
+    for ef in ef_values:
+        hits = 0
+        latencies = []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            found = index.search(query, k, ef=ef)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(expected.intersection(label for label, _ in found))
+
+        report.append({
+            "ef": ef,
+            "recall": hits / max(1, sum(len(t) for t in truth)),
+            "mean_latency_ms": float(np.mean(latencies)),
+            "p99_latency_ms": float(np.percentile(latencies, 99))
+        })
+
+    return report
@@ -0,0 +1,128 @@
+"""
+Multi-vector (chunk) scoring
+Scores repos by their best-matching README chunks in one matrix pass
+"""
+
+from typing import List, Tuple, Sequence, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def segment_top_mean(
+    scores: np.ndarray,
+    segments: np.ndarray,
+    top_chunks: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce per-chunk scores to per-repo scores
+
+    Args:
+        scores: Score of each chunk
+        segments: Repo id of each chunk
+        top_chunks: Average the best this many chunks per repo
+            (1 is max-sim)
+
+    Returns:
+        (repo_ids, repo_scores), repo ids ascending
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    if top_chunks <= 1:
+        order = np.argsort(segments, kind='stable')
+        sorted_segments = segments[order]
+        starts = np.flatnonzero(np.r_[True, sorted_segments[1:] != sorted_segments[:-1]])
+        return sorted_segments[starts], np.maximum.reduceat(scores[order], starts)
+
+    # Sort by repo, best chunk first within each repo
+    order = np.lexsort((-scores, segments))
+    sorted_segments = segments[order]
+    sorted_scores = scores[order]
+    starts = np.flatnonzero(np.r_[True, sorted_segments[1:] != sorted_segments[:-1]])
+
+    lengths = np.diff(np.r_[starts, len(order)])
+    rank = np.arange(len(order)) - np.repeat(starts, lengths)
+    kept = np.where(rank < top_chunks, sorted_scores, 0.0)
+
+    totals = np.add.reduceat(kept, starts)
+    return sorted_segments[starts], totals / np.minimum(lengths, top_chunks)
+
+class ChunkIndex:
+    """
+    Exact max-sim index over README chunk embeddings
+
+    Every chunk is scored with one matrix-vector product and the scores are
+    reduced per repo with a segment max (or top-m mean), so query cost grows
+    with the number of chunks but stays a single BLAS pass.
+
+    Args:
+        repo_ids: Repo id of each chunk row
+        vectors: Chunk embeddings, one per row
+        top_chunks: Default number of best chunks averaged per repo
+    """
+
+    def __init__(self, repo_ids: Sequence[int], vectors: np.ndarray, top_chunks: int = 1):
+        if len(repo_ids) != len(vectors):
+            raise ValueError(f"Got {len(repo_ids)} repo ids for {len(vectors)} chunks")
+
+        self.top_chunks = top_chunks
+
+        # Rows are grouped by repo once so max-sim is a plain reduceat
+        repo_ids = np.asarray(repo_ids, dtype=np.int64)
+        order = np.argsort(repo_ids, kind='stable')
+        self.repo_ids = repo_ids[order]
+        if len(order):
+            self._starts = np.flatnonzero(np.r_[True, self.repo_ids[1:] != self.repo_ids[:-1]])
+        else:
+            self._starts = np.empty(0, dtype=np.int64)
+        self._repos = self.repo_ids[self._starts]
+
+        matrix = np.asarray(vectors, dtype=np.float32)[order]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+        logger.info(f"Chunk index over {len(self.matrix)} chunks from {len(self._repos)} repos")
+
+    def __len__(self) -> int:
+        return len(self._repos)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        top_chunks: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k repos by chunk similarity
+
+        Args:
+            query: Query vector
+            k: Number of repos
+            top_chunks: Best chunks averaged per repo (index default when None)
+
+        Returns:
+            List of (repo_id, score) tuples, best first
+        """
+        if len(self.matrix) == 0 or k <= 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32).ravel()
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+
+        chunk_scores = self.matrix @ q
+        top_chunks = top_chunks or self.top_chunks
+        if top_chunks <= 1:
+            repos, scores = self._repos, np.maximum.reduceat(chunk_scores, self._starts)
+        else:
+            repos, scores = segment_top_mean(chunk_scores, self.repo_ids, top_chunks)
+
+        k = min(k, len(repos))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(repos) else np.arange(len(repos))
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [(int(repos[i]), float(scores[i])) for i in top]
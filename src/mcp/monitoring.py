@@ -2,8 +2,9 @@
 Monitoring and observability for RuvScan
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime
+import bisect
 import logging
 import time
 from dataclasses import dataclass, field
@@ -20,6 +21,35 @@ class RequestMetrics:
     duration_ms: float
     timestamp: datetime = field(default_factory=datetime.utcnow)
 
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts observations <= its bound"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts with count, sum and mean"""
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            cumulative += count
+            buckets[f"le_{bound:g}"] = cumulative
+
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0
+        }
+
 class MetricsCollector:
     """Collect and aggregate metrics"""
 
@@ -28,8 +58,21 @@ class MetricsCollector:
         self.endpoint_counts = defaultdict(int)
         self.endpoint_durations = defaultdict(list)
         self.error_counts = defaultdict(int)
+        self.breakers: Dict[str, Any] = {}
+        self.coalescers: Dict[str, Any] = {}
         self.start_time = datetime.utcnow()
 
+    def register_breaker(self, name: str, breaker: Any):
+        """Export a circuit breaker's state under ``name`` (anything with ``metrics()``)"""
+        self.breakers[name] = breaker
+
+    def register_coalescer(self, name: str, coalescer: Optional[Any]):
+        """Export an embedding coalescer's histograms under ``name``; None unregisters it"""
+        if coalescer is None:
+            self.coalescers.pop(name, None)
+        else:
+            self.coalescers[name] = coalescer
+
     def record_request(
         self,
         endpoint: str,
@@ -75,7 +118,13 @@ class MetricsCollector:
             "endpoint_counts": dict(self.endpoint_counts),
             "average_duration_ms": avg_durations,
             "error_rates_percent": error_rates,
-            "total_errors": sum(self.error_counts.values())
+            "total_errors": sum(self.error_counts.values()),
+            "circuit_breakers": {
+                name: breaker.metrics() for name, breaker in self.breakers.items()
+            },
+            "embedding_coalescers": {
+                name: coalescer.metrics() for name, coalescer in self.coalescers.items()
+            }
         }
 
     def get_recent_requests(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -0,0 +1,118 @@
+"""
+README chunking for multi-vector repo embeddings
+Splits long text into token-bounded, overlapping windows
+"""
+
+import re
+from typing import List, Dict, Any
+
+# Whitespace-delimited words stand in for model tokens; BPE tokenizers
+# average ~1.3 tokens per English word, so the default stays well under
+# embedding model input limits
+_TOKEN = re.compile(r"\S+")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+def chunk_text(text: str, max_tokens: int = 256, overlap: int = 32) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` words
+
+    Paragraphs are packed greedily so chunks break on blank lines where
+    possible; a paragraph longer than ``max_tokens`` is split into windows
+    that overlap by ``overlap`` words.
+
+    Args:
+        text: Input text
+        max_tokens: Maximum words per chunk
+        overlap: Words repeated between consecutive windows of a long paragraph
+
+    Returns:
+        List of chunk strings (empty for blank text)
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    overlap = max(0, min(overlap, max_tokens - 1))
+
+    chunks: List[str] = []
+    current: List[str] = []
+
+    for paragraph in _PARAGRAPH.split(text):
+        words = _TOKEN.findall(paragraph)
+        if not words:
+            continue
+
+        if len(current) + len(words) <= max_tokens:
+            current.extend(words)
+            continue
+
+        if current:
+            chunks.append(" ".join(current))
+            current = []
+
+        if len(words) <= max_tokens:
+            current = words
+            continue
+
+        step = max_tokens - overlap
+        for start in range(0, len(words), step):
+            window = words[start:start + max_tokens]
+            if start + max_tokens >= len(words):
+                current = window
+                break
+            chunks.append(" ".join(window))
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
+
+def repo_header(repo_data: Dict[str, Any]) -> str:
+    """Name, description and topics of a repo as one text"""
+    parts = []
+
+    if repo_data.get('name'):
+        parts.append(f"Repository: {repo_data['name']}")
+
+    if repo_data.get('description'):
+        parts.append(f"Description: {repo_data['description']}")
+
+    if repo_data.get('topics'):
+        parts.append(f"Topics: {', '.join(repo_data['topics'])}")
+
+    return "\n".join(parts)
+
+def repo_summary_text(repo_data: Dict[str, Any], readme_chars: int = 1000) -> str:
+    """Header plus the start of the README, the text behind a repo's single embedding"""
+    parts = []
+    header = repo_header(repo_data)
+    if header:
+        parts.append(header)
+
+    if repo_data.get('readme'):
+        parts.append(f"README: {repo_data['readme'][:readme_chars]}")
+
+    return "\n".join(parts)
+
+def chunk_repo(repo_data: Dict[str, Any], max_tokens: int = 256, overlap: int = 32) -> List[str]:
+    """
+    Chunks for a repo: the header first, then README windows prefixed with the repo name
+
+    Args:
+        repo_data: Repository data dictionary
+        max_tokens: Maximum README words per chunk
+        overlap: Word overlap between README windows
+
+    Returns:
+        List of chunk texts
+    """
+    chunks = []
+    header = repo_header(repo_data)
+    if header:
+        chunks.append(header)
+
+    prefix = f"Repository: {repo_data['name']}\n" if repo_data.get('name') else ""
+    chunks.extend(
+        prefix + chunk
+        for chunk in chunk_text(repo_data.get('readme') or "", max_tokens, overlap)
+    )
+
+    return chunks
@@ -0,0 +1,104 @@
+"""
+Micro-batching for single-text embedding requests
+Concurrent embed_text calls share one batched provider call
+"""
+
+from typing import Awaitable, Callable, List, Optional, Set, Tuple, Dict, Any
+import asyncio
+import logging
+
+import numpy as np
+
+from ..monitoring import Histogram
+
+logger = logging.getLogger(__name__)
+
+BatchEmbedder = Callable[[List[str]], Awaitable[List[np.ndarray]]]
+
+class EmbeddingCoalescer:
+    """
+    Collects texts for up to ``max_wait_ms`` or ``max_batch_size`` items and
+    embeds them with one ``embed_batch`` call
+
+    Each caller awaits a future resolved with its own vector; if the batch
+    call fails every caller in it gets the exception. Latency added to a
+    request is bounded by ``max_wait_ms``.
+    """
+
+    def __init__(
+        self,
+        embed_batch: BatchEmbedder,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100])
+
+    async def submit(self, text: str) -> np.ndarray:
+        """
+        Queue a text for the next batch
+
+        Args:
+            text: Input text
+
+        Returns:
+            Embedding vector for ``text``
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, loop.time()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        now = asyncio.get_running_loop().time()
+        self.batch_sizes.observe(len(batch))
+        for _, _, queued_at in batch:
+            self.wait_ms.observe((now - queued_at) * 1000)
+
+        try:
+            embeddings = await self.embed_batch([text for text, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Coalesced embedding batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait histograms"""
+        return {
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "pending": len(self._pending)
+        }
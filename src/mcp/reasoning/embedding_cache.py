@@ -0,0 +1,124 @@
+"""
+Content-addressed embedding cache
+Skips provider calls for texts that were already embedded with the same model
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, stripped"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def text_hash(text: str) -> str:
+    """SHA256 of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by (provider, model, sha256(normalized text))
+
+    Entries persist in the ``embedding_cache`` table of a RuvScanDB; an
+    optional in-memory LRU of ``lru_size`` vectors sits in front of it.
+    Without a database only the LRU is used.
+    """
+
+    def __init__(self, db_manager=None, lru_size: int = 10000):
+        self.db = db_manager
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[Tuple[str, str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, provider: str, model: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up embeddings for text hashes
+
+        Args:
+            provider: Embedding provider name
+            model: Model identifier
+            hashes: Text hashes from ``text_hash``
+
+        Returns:
+            Mapping of text hash to embedding for the hits
+        """
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for digest in hashes:
+                key = (provider, model, digest)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[digest] = self._lru[key]
+
+        missing = [digest for digest in dict.fromkeys(hashes) if digest not in found]
+        if missing and self.db:
+            try:
+                stored = self.db.get_cached_embeddings(provider, model, missing)
+            except Exception as e:
+                logger.error(f"Embedding cache lookup error: {e}")
+                stored = {}
+            self._remember(provider, model, stored.items())
+            found.update(stored)
+
+        unique = len(set(hashes))
+        # Lookups may run on executor threads
+        with self._lock:
+            self.hits += len(found)
+            self.misses += unique - len(found)
+        return found
+
+    def put_many(self, provider: str, model: str, entries: List[Tuple[str, np.ndarray]]):
+        """Store (text_hash, embedding) pairs"""
+        if not entries:
+            return
+
+        entries = [(digest, self._frozen(vector)) for digest, vector in entries]
+        self._remember(provider, model, entries)
+
+        if self.db:
+            try:
+                self.db.add_cached_embeddings(provider, model, entries)
+            except Exception as e:
+                logger.error(f"Embedding cache write error: {e}")
+
+    @staticmethod
+    def _frozen(vector: np.ndarray) -> np.ndarray:
+        # Cached vectors are shared between callers, so hand out read-only arrays
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        return vector
+
+    def _remember(self, provider: str, model: str, entries):
+        if self.lru_size <= 0:
+            return
+
+        with self._lock:
+            for digest, vector in entries:
+                key = (provider, model, digest)
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else None,
+            "lru_entries": len(self._lru)
+        }
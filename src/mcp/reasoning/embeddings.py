@@ -3,14 +3,28 @@ Embedding generation service
 Supports OpenAI, Anthropic, and local models
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterable, AsyncIterable, AsyncIterator, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import numpy as np
 import logging
 import os
+import random
 from enum import Enum
 
+from .local_embeddings import LocalEmbedder
+from .embedding_cache import EmbeddingCache, text_hash
+from .coalescer import EmbeddingCoalescer
+from .chunking import chunk_repo, repo_summary_text
+from .reduction import DimensionReducer
+
 logger = logging.getLogger(__name__)
 
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
 class EmbeddingProvider(Enum):
     """Supported embedding providers"""
     OPENAI = "openai"
@@ -20,18 +34,66 @@ class EmbeddingProvider(Enum):
 class EmbeddingService:
     """
     Service for generating embeddings from text
+
+    With an ``EmbeddingCache`` attached, texts already embedded by the same
+    provider and model are served from the cache and only misses reach the
+    provider.
+
+    OpenAI calls go through one pooled ``AsyncOpenAI`` client, so they never
+    block the event loop. At most ``max_concurrency`` requests are in flight;
+    429 and 5xx responses are retried with jittered exponential backoff.
+
+    With ``coalesce=True``, concurrent ``embed_text`` calls are micro-batched
+    into one provider call (see ``EmbeddingCoalescer``).
+
+    With a ``reducer``, every returned vector is reduced to
+    ``reducer.n_components`` dimensions, so ingest and queries share one
+    reduced space.
     """
 
     def __init__(
         self,
         provider: str = "openai",
         model: str = "text-embedding-3-small",
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        local_model_path: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        request_timeout: float = 60.0,
+        coalesce: bool = False,
+        coalesce_max_batch: int = 64,
+        coalesce_max_wait_ms: float = 5.0,
+        dtype: str = "float32",
+        reducer: Optional[DimensionReducer] = None
     ):
         self.provider = EmbeddingProvider(provider)
         self.model = model
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.local_model_path = local_model_path or os.getenv("RUVSCAN_LOCAL_EMBEDDING_MODEL")
         self.dimension = 1536  # Default for OpenAI
+        if dtype not in ("float32", "float64"):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.dtype = np.dtype(dtype)
+        self.cache = cache
+        # Applied after the cache, so cached full vectors survive a refit
+        self.reducer = reducer
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self._limiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.coalescer = EmbeddingCoalescer(
+            self._embed_uncached,
+            max_batch_size=coalesce_max_batch,
+            max_wait_ms=coalesce_max_wait_ms
+        ) if coalesce else None
 
         self._init_client()
 
@@ -39,18 +101,53 @@ class EmbeddingService:
         """Initialize the embedding client"""
         if self.provider == EmbeddingProvider.OPENAI:
             try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import AsyncOpenAI
+                # Retries are handled in _create_embeddings
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.request_timeout,
+                    max_retries=0
+                )
                 logger.info(f"Initialized OpenAI client with model {self.model}")
             except ImportError:
                 logger.error("OpenAI package not installed")
                 raise
-        elif self.provider == EmbeddingProvider.ANTHROPIC:
-            logger.warning("Anthropic embeddings not yet implemented")
-            self.client = None
         else:
-            logger.warning("Local embeddings not yet implemented")
-            self.client = None
+            if self.provider == EmbeddingProvider.ANTHROPIC:
+                # Anthropic has no embeddings endpoint
+                logger.warning("Anthropic embeddings not available, using local embedder")
+
+            if self.local_model_path and os.path.exists(self.local_model_path):
+                self.client = LocalEmbedder.load(self.local_model_path)
+            else:
+                self.client = LocalEmbedder(dimension=self.dimension)
+            self.dimension = self.client.dimension
+            logger.info(f"Initialized local embedder ({self.dimension} dims, fitted={self.client.fitted})")
+
+    @property
+    def is_local(self) -> bool:
+        return self.provider != EmbeddingProvider.OPENAI
+
+    @property
+    def model_id(self) -> str:
+        """Model identity used in cache keys"""
+        return self.client.model_id if self.is_local else self.model
+
+    def fit_local(self, texts: List[str], save: bool = True):
+        """
+        Fit the local embedder on a corpus (e.g. all repo summaries)
+
+        Args:
+            texts: Corpus documents
+            save: Persist the model to ``local_model_path`` when set
+        """
+        if not self.is_local:
+            raise ValueError(f"Provider {self.provider.value} has no local model to fit")
+
+        self.client = LocalEmbedder(dimension=self.dimension).fit(texts)
+        if save and self.local_model_path:
+            self.client.save(self.local_model_path)
 
     async def embed_text(self, text: str) -> np.ndarray:
         """
@@ -64,19 +161,30 @@ class EmbeddingService:
         """
         if not text or not text.strip():
             logger.warning("Empty text provided for embedding")
-            return np.zeros(self.dimension)
+            return np.zeros(self.output_dimension, dtype=self.dtype)
 
         try:
-            if self.provider == EmbeddingProvider.OPENAI:
-                return await self._embed_openai(text)
+            digest = None
+            if self.cache is not None:
+                digest = text_hash(text)
+                cached = await self._cache_get(self.provider.value, self.model_id, [digest])
+                if digest in cached:
+                    return self._finish(cached[digest])
+
+            if self.coalescer is not None:
+                embedding = await self.coalescer.submit(text)
+            elif self.provider == EmbeddingProvider.OPENAI:
+                embedding = await self._embed_openai(text)
             else:
-                # Fallback to random embedding for development
-                logger.warning(f"Using random embedding for provider {self.provider}")
-                return np.random.randn(self.dimension)
+                embedding = (await self._transform_local([text]))[0]
+
+            if digest is not None:
+                await self._cache_put(self.provider.value, self.model_id, [(digest, embedding)])
+            return self._finish(embedding)
 
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return np.zeros(self.dimension)
+            return np.zeros(self.output_dimension, dtype=self.dtype)
 
     async def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
         """
@@ -88,33 +196,126 @@ class EmbeddingService:
         Returns:
             List of numpy arrays
         """
-        embeddings = []
+        if self.cache is None:
+            return self._finish_batch(await self._embed_uncached(texts))
+
+        provider, model_id = self.provider.value, self.model_id
+        hashes = [text_hash(text) for text in texts]
+        found = await self._cache_get(provider, model_id, hashes)
+
+        # Each distinct missing text is embedded once
+        pending: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in found:
+                pending.setdefault(digest, text)
+
+        if pending:
+            fresh = list(zip(pending.keys(), await self._embed_uncached(list(pending.values()))))
+            await self._cache_put(provider, model_id, fresh)
+            found.update(fresh)
+
+        logger.info(f"Embedded {len(texts)} texts ({len(pending)} cache misses)")
+        return self._finish_batch([found[digest] for digest in hashes])
+
+    async def _cache_get(self, provider: str, model_id: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """``cache.get_many``, with database lookups run off the event loop"""
+        if self.cache.db is None:
+            return self.cache.get_many(provider, model_id, hashes)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.cache.get_many, provider, model_id, hashes)
+        )
+
+    async def _cache_put(self, provider: str, model_id: str, entries: List[Tuple[str, np.ndarray]]):
+        """``cache.put_many``, with database writes run off the event loop"""
+        if self.cache.db is None:
+            self.cache.put_many(provider, model_id, entries)
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, functools.partial(self.cache.put_many, provider, model_id, entries)
+        )
+
+    @property
+    def output_dimension(self) -> int:
+        """Dimension of returned vectors (after reduction)"""
+        return self.reducer.n_components if self.reducer is not None else self.dimension
+
+    @property
+    def embedding_version(self) -> str:
+        """Tag for stored vectors: model identity plus reduction version"""
+        if self.reducer is None:
+            return self.model_id
+        return f"{self.model_id}+{self.reducer.version}"
+
+    def _finish(self, embedding: np.ndarray) -> np.ndarray:
+        """Reduce (when configured) and convert to the compute dtype"""
+        if self.reducer is not None:
+            embedding = self.reducer.transform(embedding)
+        return np.asarray(embedding, dtype=self.dtype)
+
+    def _finish_batch(self, embeddings: List[np.ndarray]) -> List[np.ndarray]:
+        if self.reducer is None or not embeddings:
+            return [np.asarray(embedding, dtype=self.dtype) for embedding in embeddings]
+
+        reduced = self.reducer.transform(np.stack(embeddings))
+        return list(np.asarray(reduced, dtype=self.dtype))
+
+    def fit_reducer(
+        self,
+        corpus_embeddings: np.ndarray,
+        n_components: int,
+        method: str = "pca",
+        path: Optional[str] = None
+    ) -> DimensionReducer:
+        """
+        Fit a reduction stage on full-dimension corpus embeddings and enable it
+
+        Args:
+            corpus_embeddings: 2-D matrix of unreduced embeddings
+            n_components: Target dimension
+            method: "pca" or "truncate"
+            path: Save the reducer here when given
+
+        Returns:
+            The fitted reducer
+        """
+        reducer = DimensionReducer(n_components, method).fit(corpus_embeddings)
+        if path:
+            reducer.save(path)
 
-        # Process in batches for efficiency
+        self.reducer = reducer
+        return reducer
+
+    async def _embed_uncached(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts with the provider in batches of 100"""
         batch_size = 100
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
 
-            if self.provider == EmbeddingProvider.OPENAI:
-                batch_embeddings = await self._embed_openai_batch(batch)
-                embeddings.extend(batch_embeddings)
-            else:
-                # Fallback
-                for text in batch:
-                    embeddings.append(np.random.randn(self.dimension))
+        if self.provider != EmbeddingProvider.OPENAI:
+            embeddings = []
+            for batch in batches:
+                embeddings.extend(await self._transform_local(batch))
+            return embeddings
+
+        # Batches are submitted together; the semaphore bounds concurrency
+        results = await asyncio.gather(*[self._embed_openai_batch(batch) for batch in batches])
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
 
-        return embeddings
+    async def _transform_local(self, texts: List[str]) -> np.ndarray:
+        """Local embedder ``transform`` run off the event loop (it is CPU-bound)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.client.transform, texts)
 
     async def _embed_openai(self, text: str) -> np.ndarray:
         """Generate OpenAI embedding"""
         try:
-            response = self.client.embeddings.create(
-                input=text,
-                model=self.model
-            )
+            response = await self._create_embeddings(text)
 
             embedding = response.data[0].embedding
-            return np.array(embedding, dtype=np.float64)
+            return np.array(embedding, dtype=self.dtype)
 
         except Exception as e:
             logger.error(f"OpenAI embedding error: {e}")
@@ -123,14 +324,11 @@ class EmbeddingService:
     async def _embed_openai_batch(self, texts: List[str]) -> List[np.ndarray]:
         """Generate OpenAI embeddings in batch"""
         try:
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.model
-            )
+            response = await self._create_embeddings(texts)
 
             embeddings = [
-                np.array(data.embedding, dtype=np.float64)
-                for data in response.data
+                np.array(data.embedding, dtype=self.dtype)
+                for data in sorted(response.data, key=lambda data: data.index)
             ]
 
             return embeddings
@@ -139,9 +337,79 @@ class EmbeddingService:
             logger.error(f"OpenAI batch embedding error: {e}")
             raise
 
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter[0] is not loop:
+            self._limiter = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._limiter[1]
+
+    async def _create_embeddings(self, inputs):
+        """
+        Call the embeddings endpoint with bounded concurrency and retries
+
+        Args:
+            inputs: A text or list of texts
+
+        Returns:
+            Provider response
+        """
+        async with self._semaphore():
+            attempt = 0
+            while True:
+                try:
+                    return await self.client.embeddings.create(
+                        input=inputs,
+                        model=self.model,
+                        encoding_format="float"
+                    )
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        raise
+
+                    # The slot is held while backing off so a rate-limited
+                    # provider sees less traffic, not more
+                    delay = self._retry_delay(attempt, e)
+                    attempt += 1
+                    logger.warning(
+                        f"Embedding request failed ({e.__class__.__name__}), "
+                        f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        from openai import APIConnectionError, APIStatusError
+
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in RETRYABLE_STATUS
+        return False
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when sent"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def close(self):
+        """Release pooled provider connections"""
+        if self.provider == EmbeddingProvider.OPENAI and self.client is not None:
+            await self.client.close()
+
     def embed_repo_summary(self, repo_data: Dict[str, Any]) -> np.ndarray:
         """
-        Generate embedding for repository summary
+        Generate embedding for repository summary (blocking)
+
+        For scripts without an event loop; async code should use
+        ``embed_repos``.
 
         Args:
             repo_data: Repository data dictionary
@@ -149,36 +417,111 @@ class EmbeddingService:
         Returns:
             Embedding vector
         """
-        # Combine relevant fields
-        text_parts = []
-
-        if repo_data.get('name'):
-            text_parts.append(f"Repository: {repo_data['name']}")
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "embed_repo_summary() blocks and cannot run inside an event loop; "
+                "use 'async for ... in embed_repos(...)' instead"
+            )
 
-        if repo_data.get('description'):
-            text_parts.append(f"Description: {repo_data['description']}")
+        # A private loop keeps pooled provider connections usable across calls
+        if self._sync_loop is None or self._sync_loop.is_closed():
+            self._sync_loop = asyncio.new_event_loop()
+        return self._sync_loop.run_until_complete(self.embed_text(repo_summary_text(repo_data)))
 
-        if repo_data.get('topics'):
-            topics = ', '.join(repo_data['topics'])
-            text_parts.append(f"Topics: {topics}")
+    async def embed_repos(
+        self,
+        repos: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        batch_size: int = 100,
+        max_in_flight: Optional[int] = None,
+        workers: int = 4
+    ) -> AsyncIterator[Tuple[Any, np.ndarray]]:
+        """
+        Embed a stream of repos as summary vectors
 
-        if repo_data.get('readme'):
-            # Use first 1000 chars of README
-            readme_excerpt = repo_data['readme'][:1000]
-            text_parts.append(f"README: {readme_excerpt}")
+        Summary texts are built in a thread pool and embedded in batches of
+        ``batch_size``, with up to ``max_in_flight`` batches running at once.
+        Repos are pulled from ``repos`` only as results are consumed, so a
+        slow consumer holds back reading (and memory) instead of queueing
+        the whole corpus.
 
-        combined_text = "\n".join(text_parts)
+        Args:
+            repos: Repo dicts (sync or async iterable)
+            batch_size: Repos per embedding call
+            max_in_flight: Concurrent batches (defaults to ``max_concurrency``)
+            workers: Threads building summary texts
+
+        Yields:
+            (repo_id, vector) in input order; repo_id is ``repo['id']``,
+            or ``repo['full_name']`` for repos not stored yet
+        """
+        max_in_flight = max(1, max_in_flight or self.max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="repo-summary")
+        in_flight: deque = deque()
 
-        # Generate embedding synchronously for now
-        # In production, this should be async
-        import asyncio
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            batch: List[Dict[str, Any]] = []
+            async for repo in _aiter(repos):
+                batch.append(repo)
+                if len(batch) < batch_size:
+                    continue
+
+                in_flight.append(asyncio.ensure_future(self._embed_repo_batch(batch, executor)))
+                batch = []
+                if len(in_flight) >= max_in_flight:
+                    for pair in await in_flight.popleft():
+                        yield pair
+
+            if batch:
+                in_flight.append(asyncio.ensure_future(self._embed_repo_batch(batch, executor)))
+            while in_flight:
+                for pair in await in_flight.popleft():
+                    yield pair
+        finally:
+            for task in in_flight:
+                task.cancel()
+            executor.shutdown(wait=False)
+
+    async def _embed_repo_batch(
+        self,
+        repos: List[Dict[str, Any]],
+        executor: ThreadPoolExecutor
+    ) -> List[Tuple[Any, np.ndarray]]:
+        loop = asyncio.get_running_loop()
+        texts = await loop.run_in_executor(executor, _summary_texts, repos)
+        embeddings = await self.embed_batch(texts)
+        return [
+            (repo.get('id', repo.get('full_name')), embedding)
+            for repo, embedding in zip(repos, embeddings)
+        ]
+
+    async def embed_repo_chunks(
+        self,
+        repo_data: Dict[str, Any],
+        max_tokens: int = 256,
+        overlap: int = 32
+    ) -> Tuple[List[str], List[np.ndarray]]:
+        """
+        Embed a repo as multiple vectors: its header plus README chunks
+
+        Unlike ``embed_repo_summary`` the whole README is covered.
+
+        Args:
+            repo_data: Repository data dictionary
+            max_tokens: Maximum README words per chunk
+            overlap: Word overlap between README chunks
+
+        Returns:
+            (chunks, embeddings) in document order
+        """
+        chunks = chunk_repo(repo_data, max_tokens=max_tokens, overlap=overlap)
+        if not chunks:
+            return [], []
 
-        return loop.run_until_complete(self.embed_text(combined_text))
+        return chunks, await self.embed_batch(chunks)
 
     def cosine_similarity(self, vec_a: np.ndarray, vec_b: np.ndarray) -> float:
         """
@@ -205,4 +548,15 @@ class EmbeddingService:
 
     def get_dimension(self) -> int:
         """Get embedding dimension"""
-        return self.dimension
+        return self.output_dimension
+
+def _summary_texts(repos: List[Dict[str, Any]]) -> List[str]:
+    return [repo_summary_text(repo) for repo in repos]
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -0,0 +1,180 @@
+"""
+Local embedding model
+Hashed n-gram TF-IDF with an LSA (truncated SVD) projection; no network access
+"""
+
+from typing import List, Iterable, Optional
+import hashlib
+import logging
+import os
+
+import numpy as np
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.decomposition import TruncatedSVD
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSION = 1536  # matches text-embedding-3-small, so stored vectors keep one width
+DEFAULT_N_FEATURES = 2 ** 14
+
+class LocalEmbedder:
+    """
+    Deterministic, batchable text embedder
+
+    Text is tokenized into word unigrams and bigrams and hashed into
+    ``n_features`` buckets, so there is no vocabulary to store. ``fit``
+    learns IDF weights and a ``dimension``-component SVD projection from a
+    corpus. Until a model is fitted (or loaded), texts are signed-hashed
+    straight into ``dimension`` buckets, which is a fixed random projection
+    of the same n-gram counts.
+
+    Fitting changes the embedding space: re-embed the corpus after ``fit``
+    or ``load``.
+    """
+
+    def __init__(
+        self,
+        dimension: int = DEFAULT_DIMENSION,
+        n_features: int = DEFAULT_N_FEATURES,
+        seed: int = 42
+    ):
+        self.dimension = dimension
+        self.n_features = n_features
+        self.seed = seed
+
+        self._vectorizer = self._hashing_vectorizer(n_features, alternate_sign=False, norm=None)
+        self._fallback = self._hashing_vectorizer(dimension, alternate_sign=True, norm='l2')
+        self._tfidf: Optional[TfidfTransformer] = None
+        self._svd: Optional[TruncatedSVD] = None
+        self._model_id: Optional[str] = None
+        self._warned_unfitted = False
+
+    @staticmethod
+    def _hashing_vectorizer(n_features: int, alternate_sign: bool, norm: Optional[str]) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=alternate_sign,
+            norm=norm,
+            lowercase=True,
+            dtype=np.float32
+        )
+
+    @property
+    def fitted(self) -> bool:
+        return self._svd is not None
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the embedding space; changes whenever the model is refitted"""
+        if not self.fitted:
+            return f"hashing-{self.dimension}"
+
+        if self._model_id is None:
+            digest = hashlib.sha256(self._svd.components_.tobytes())
+            digest.update(self._tfidf.idf_.tobytes())
+            self._model_id = f"lsa-{self.dimension}-{digest.hexdigest()[:16]}"
+        return self._model_id
+
+    def fit(self, texts: Iterable[str], max_documents: Optional[int] = 50000) -> "LocalEmbedder":
+        """
+        Fit IDF weights and the SVD projection on a corpus
+
+        Args:
+            texts: Corpus documents (e.g. README summaries)
+            max_documents: Fit on an evenly spaced sample of at most this
+                many documents (all when None)
+
+        Returns:
+            self
+        """
+        texts = list(texts)
+        if max_documents and len(texts) > max_documents:
+            step = len(texts) / max_documents
+            texts = [texts[int(i * step)] for i in range(max_documents)]
+
+        if len(texts) < 2:
+            raise ValueError("Need at least 2 documents to fit the local embedder")
+
+        counts = self._vectorizer.transform(texts)
+        self._tfidf = TfidfTransformer(sublinear_tf=True).fit(counts)
+        weighted = self._tfidf.transform(counts)
+
+        # Components beyond the corpus rank carry no signal; pad them with zeros
+        n_components = min(self.dimension, len(texts) - 1)
+        self._svd = TruncatedSVD(n_components=n_components, random_state=self.seed)
+        self._svd.fit(weighted)
+        self._svd.components_ = self._svd.components_.astype(np.float32)
+        self._model_id = None
+
+        logger.info(
+            f"Fitted local embedder on {len(texts)} documents "
+            f"({n_components} components, {self._svd.explained_variance_ratio_.sum():.2f} variance)"
+        )
+        return self
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            (len(texts), dimension) float32 matrix of unit-length rows;
+            empty texts map to zero rows
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        if not self.fitted:
+            if not self._warned_unfitted:
+                self._warned_unfitted = True
+                logger.warning(
+                    "Local embedder is not fitted; embedding with the hashing fallback, "
+                    "which only matches shared n-grams. Fit it on the corpus (llm.fit_local_embedder)"
+                )
+            return self._fallback.transform(texts).toarray()
+
+        weighted = self._tfidf.transform(self._vectorizer.transform(texts))
+        projected = np.asarray(weighted @ self._svd.components_.T, dtype=np.float32)
+
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        embeddings[:, :projected.shape[1]] = projected
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def save(self, path: str):
+        """Persist the fitted model"""
+        if not self.fitted:
+            raise ValueError("Local embedder is not fitted")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        joblib.dump({
+            "dimension": self.dimension,
+            "n_features": self.n_features,
+            "seed": self.seed,
+            "tfidf": self._tfidf,
+            "svd": self._svd
+        }, path)
+        logger.info(f"Saved local embedder to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "LocalEmbedder":
+        """Load a model written by ``save``"""
+        state = joblib.load(path)
+        embedder = cls(
+            dimension=state["dimension"],
+            n_features=state["n_features"],
+            seed=state["seed"]
+        )
+        embedder._tfidf = state["tfidf"]
+        embedder._svd = state["svd"]
+        logger.info(f"Loaded local embedder from {path}")
+        return embedder
@@ -0,0 +1,221 @@
+"""
+Dimension reduction for stored embeddings
+Fitted PCA or Matryoshka-style prefix truncation, persisted with a version
+"""
+
+import hashlib
+import json
+import time
+from typing import List, Dict, Any, Iterable, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class DimensionReducer:
+    """
+    Maps embeddings to ``n_components`` dimensions and re-normalizes them
+
+    ``method`` is "pca" (projection onto the corpus principal components,
+    learned by ``fit``) or "truncate" (keep the first ``n_components``
+    dimensions; only meaningful for Matryoshka-trained models such as
+    text-embedding-3-*). Vectors reduced by different versions are not
+    comparable, so ``version`` is stored alongside them.
+    """
+
+    METHODS = ("pca", "truncate")
+
+    def __init__(self, n_components: int, method: str = "pca"):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+
+        self.n_components = n_components
+        self.method = method
+        self.input_dimension: Optional[int] = None
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.explained_variance_ratio: Optional[float] = None
+        self._version: Optional[str] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.method == "truncate" or self.components is not None
+
+    @property
+    def version(self) -> str:
+        """Identifies the reduced space; changes whenever PCA is refitted"""
+        if self.method == "truncate":
+            return f"truncate-{self.n_components}"
+        if self.components is None:
+            return f"pca-{self.n_components}-unfitted"
+
+        if self._version is None:
+            digest = hashlib.sha256(self.components.tobytes() + self.mean.tobytes()).hexdigest()
+            self._version = f"pca-{self.n_components}-{digest[:12]}"
+        return self._version
+
+    def fit(self, matrix: np.ndarray) -> "DimensionReducer":
+        """
+        Learn the PCA basis from corpus embeddings (no-op for truncation)
+
+        Args:
+            matrix: 2-D corpus matrix, one embedding per row
+
+        Returns:
+            self
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        self.input_dimension = matrix.shape[1]
+        if self.n_components > self.input_dimension:
+            raise ValueError(
+                f"Cannot reduce {self.input_dimension} dimensions to {self.n_components}"
+            )
+
+        if self.method == "truncate":
+            return self
+
+        self.mean = matrix.mean(axis=0)
+        centered = matrix - self.mean
+
+        # d x d covariance eigendecomposition: cost is independent of corpus size
+        covariance = centered.T @ centered / max(1, len(matrix) - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        top = np.argsort(eigenvalues)[::-1][:self.n_components]
+        components = eigenvectors[:, top].T
+
+        # Fix signs so refitting on the same data gives the same basis
+        signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+        signs[signs == 0] = 1.0
+        components *= signs[:, np.newaxis]
+
+        total = eigenvalues.clip(min=0).sum()
+        self.explained_variance_ratio = float(eigenvalues[top].clip(min=0).sum() / total) if total > 0 else 0.0
+        self.components = components.astype(np.float32)
+        self.mean = self.mean.astype(np.float32)
+        self._version = None
+
+        logger.info(
+            f"Fitted PCA {self.input_dimension} -> {self.n_components} dims "
+            f"({self.explained_variance_ratio:.3f} variance retained)"
+        )
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Reduce vectors and scale them to unit length
+
+        Args:
+            vectors: One vector or a 2-D matrix of row vectors
+
+        Returns:
+            float32 array with the same leading shape and ``n_components`` columns
+        """
+        if not self.fitted:
+            raise ValueError("PCA reducer is not fitted")
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        single = vectors.ndim == 1
+        matrix = np.atleast_2d(vectors)
+
+        if self.method == "truncate":
+            reduced = matrix[:, :self.n_components].copy()
+        else:
+            reduced = (matrix - self.mean) @ self.components.T
+
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        reduced /= norms
+
+        return reduced[0] if single else reduced
+
+    def save(self, path: str):
+        """Persist the reducer to an .npz file"""
+        meta = {
+            "method": self.method,
+            "n_components": self.n_components,
+            "input_dimension": self.input_dimension,
+            "explained_variance_ratio": self.explained_variance_ratio,
+            "version": self.version
+        }
+        arrays = {"meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)}
+        if self.components is not None:
+            arrays["mean"] = self.mean
+            arrays["components"] = self.components
+
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        logger.info(f"Saved reducer {self.version} to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "DimensionReducer":
+        """Load a reducer written by ``save``"""
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode())
+            reducer = cls(meta["n_components"], meta["method"])
+            reducer.input_dimension = meta["input_dimension"]
+            reducer.explained_variance_ratio = meta["explained_variance_ratio"]
+            if "components" in data:
+                reducer.mean = data["mean"]
+                reducer.components = data["components"]
+
+        if reducer.version != meta["version"]:
+            raise ValueError(f"Reducer file {path} is corrupt: version mismatch")
+        return reducer
+
+def reduction_report(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    dimensions: Iterable[int] = (256, 384, 512),
+    k: int = 10,
+    method: str = "pca"
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k of reduced embeddings against full-dimension search
+
+    Args:
+        corpus: 2-D corpus matrix (the reducer is fitted on it)
+        queries: 2-D matrix with one query per row
+        dimensions: Target dimensions to evaluate
+        k: Number of neighbours per query
+        method: "pca" or "truncate"
+
+    Returns:
+        One row per dimension with recall, retained variance, bytes per
+        vector and mean query latency
+    """
+    corpus = np.asarray(corpus, dtype=np.float32)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    k = min(k, len(corpus))
+
+    def top_k(matrix: np.ndarray, qs: np.ndarray) -> np.ndarray:
+        scores = qs @ matrix.T
+        return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+    unit = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    unit_queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    truth = top_k(unit, unit_queries)
+
+    report = []
+    for dimension in dimensions:
+        if dimension > corpus.shape[1]:
+            continue
+
+        reducer = DimensionReducer(dimension, method).fit(corpus)
+        reduced = reducer.transform(corpus)
+
+        start = time.perf_counter()
+        found = top_k(reduced, reducer.transform(queries))
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        hits = sum(len(set(a) & set(b)) for a, b in zip(truth.tolist(), found.tolist()))
+        report.append({
+            "dimension": dimension,
+            "method": method,
+            "recall": hits / (len(queries) * k),
+            "explained_variance_ratio": reducer.explained_variance_ratio,
+            "bytes_per_vector": dimension * 4,
+            "mean_latency_ms": latency_ms
+        })
+
+    return report
@@ -0,0 +1,175 @@
+"""
+Background re-embedding after an embedding model change
+Fills in the new embedding version batch by batch while queries keep using
+the active one, then switches versions atomically
+"""
+
+from concurrent.futures import Executor
+from typing import Callable, Optional, Dict, Any
+import asyncio
+import functools
+import logging
+import time
+
+from .chunking import repo_summary_text
+from .embeddings import EmbeddingService
+from ..storage.db import RuvScanDB
+
+logger = logging.getLogger(__name__)
+
+def needs_reembedding(db: RuvScanDB, service: EmbeddingService) -> bool:
+    """True when the database serves embeddings from a different model version"""
+    active = db.get_active_embedding_version()
+    return active is not None and active != service.embedding_version
+
+class ReembeddingJob:
+    """
+    Re-embeds every repo with ``service`` under its ``embedding_version``
+
+    New vectors are dual-written to ``repo_embeddings`` next to the active
+    version, so search keeps serving the old model until every repo has
+    been covered; the switch then happens in one transaction. Repos added
+    while the job runs are picked up by later batches. README chunks lose
+    their old-version embeddings at the switch and are re-embedded
+    afterwards. Running it again after a crash resumes where it stopped.
+
+    Database calls run on ``executor`` (the default executor when None),
+    so reads, dual-writes and the final matrix rebuild never block the
+    event loop serving queries.
+
+    Args:
+        db: Database manager
+        service: Embedding service for the new model
+        batch_size: Repos embedded per provider batch
+        pause_seconds: Sleep between batches to leave provider quota for queries
+        on_complete: Called with the new version after the switch
+        executor: Executor for database calls (e.g. ``AsyncRuvScanDB.executor``)
+    """
+
+    def __init__(
+        self,
+        db: RuvScanDB,
+        service: EmbeddingService,
+        batch_size: int = 100,
+        pause_seconds: float = 0.0,
+        on_complete: Optional[Callable[[str], None]] = None,
+        executor: Optional[Executor] = None
+    ):
+        self.db = db
+        self.executor = executor
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.pause_seconds = pause_seconds
+        self.on_complete = on_complete
+
+        self.version = service.embedding_version
+        self.embedded = 0
+        self.chunks_embedded = 0
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _db(self, func: Callable[..., Any], *args) -> Any:
+        """Run a database call on the executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def run(self) -> int:
+        """
+        Embed all missing repos and activate the new version
+
+        Returns:
+            Number of repos embedded by this run
+        """
+        self.started_at = time.time()
+        logger.info(f"Re-embedding repos with version {self.version}")
+
+        try:
+            while True:
+                repos = await self._db(self.db.get_repos_missing_version, self.version, self.batch_size)
+                if not repos:
+                    break
+
+                embeddings = await self.service.embed_batch(
+                    [repo_summary_text(repo) for repo in repos]
+                )
+                await self._db(
+                    self.db.put_version_embeddings,
+                    self.version,
+                    [(repo['id'], embedding) for repo, embedding in zip(repos, embeddings)]
+                )
+                self.embedded += len(repos)
+
+                done, total = await self._db(self.db.get_embedding_version_progress, self.version)
+                logger.info(f"Re-embedding {self.version}: {done}/{total} repos")
+
+                if self.pause_seconds:
+                    await asyncio.sleep(self.pause_seconds)
+
+            if await self._db(self.db.get_active_embedding_version) != self.version:
+                await self._db(self.db.activate_embedding_version, self.version)
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Re-embedding to {self.version} failed: {e}")
+            raise
+
+        self.completed_at = time.time()
+        logger.info(
+            f"Activated embedding version {self.version} after "
+            f"{self.completed_at - self.started_at:.1f}s"
+        )
+
+        if self.on_complete:
+            self.on_complete(self.version)
+
+        await self._reembed_chunks()
+        return self.embedded
+
+    async def _reembed_chunks(self):
+        """Embed README chunks cleared by the version switch"""
+        try:
+            while True:
+                chunks = await self._db(self.db.get_chunks_missing_embedding, self.batch_size)
+                if not chunks:
+                    break
+
+                embeddings = await self.service.embed_batch([content for _, content in chunks])
+                await self._db(
+                    self.db.put_chunk_embeddings,
+                    self.version,
+                    [(chunk_id, embedding) for (chunk_id, _), embedding in zip(chunks, embeddings)]
+                )
+                self.chunks_embedded += len(chunks)
+
+                if self.pause_seconds:
+                    await asyncio.sleep(self.pause_seconds)
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Re-embedding README chunks to {self.version} failed: {e}")
+            raise
+
+        if self.chunks_embedded:
+            logger.info(f"Re-embedded {self.chunks_embedded} README chunks with version {self.version}")
+
+    def start(self) -> asyncio.Task:
+        """Run the job as a background task on the current event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def progress(self) -> Dict[str, Any]:
+        """Coverage of the new version and job state"""
+        done, total = await self._db(self.db.get_embedding_version_progress, self.version)
+        return {
+            "version": self.version,
+            "active_version": await self._db(self.db.get_active_embedding_version),
+            "done": done,
+            "total": total,
+            "percent": 100.0 * done / total if total else 100.0,
+            "embedded_this_run": self.embedded,
+            "chunks_embedded_this_run": self.chunks_embedded,
+            "running": self._task is not None and not self._task.done(),
+            "completed": self.completed_at is not None,
+            "error": self.error
+        }
@@ -231,7 +231,7 @@ class SAFLAAgent:
         card = {
             "repo": repo_data['full_name'],
             "capabilities": capabilities,
-            "summary": repo_data.get('description', 'No description'),
+            "summary": repo_data.get('description') or 'No description',
             "outside_box_reasoning": reasoning_result['outside_box_reasoning'],
             "integration_hint": reasoning_result['integration_hint'],
             "relevance_score": similarity_score,
@@ -245,8 +245,8 @@ class SAFLAAgent:
         """Infer capabilities from repo data"""
         capabilities = []
 
-        description = (repo_data.get('description', '') + ' ' +
-                      repo_data.get('readme', '')[:500]).lower()
+        description = ((repo_data.get('description') or '') + ' ' +
+                      (repo_data.get('readme') or '')[:500]).lower()
 
         capability_keywords = {
             "solver": ["solve", "solver", "solution"],
@@ -265,8 +265,8 @@ class SAFLAAgent:
 
     def _infer_complexity(self, repo_data: Dict[str, Any]) -> Optional[str]:
         """Infer runtime complexity from repo data"""
-        text = (repo_data.get('description', '') + ' ' +
-               repo_data.get('readme', '')[:500]).lower()
+        text = ((repo_data.get('description') or '') + ' ' +
+               (repo_data.get('readme') or '')[:500]).lower()
 
         complexity_patterns = [
             ("O(log n)", ["o(log", "sublinear", "logarithmic"]),
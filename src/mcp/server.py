@@ -3,13 +3,23 @@ RuvScan MCP Server
 Main FastAPI orchestrator for sublinear-intelligence scanning
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
+import asyncio
 import logging
+import os
 import uvicorn
 
+from .config import load_config, setting
+from .endpoints import query
+from .reasoning.chunking import repo_summary_text
+from .reasoning.reembedding import ReembeddingJob, needs_reembedding
+from .storage.db import RuvScanDB
+from .storage.async_db import AsyncRuvScanDB
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,11 +27,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+config = load_config()
+
+# Database behind /query and /cards; set at startup, cards are empty while unset
+repo_db: Optional[AsyncRuvScanDB] = None
+
+def open_database(config: Dict[str, Any]) -> AsyncRuvScanDB:
+    """Open the configured SQLite database behind the async facade"""
+    path = setting(config, "database.sqlite.path", "data/ruvscan.db")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    db = RuvScanDB(
+        path,
+        embedding_dtype=setting(config, "database.sqlite.embedding_dtype", "float32"),
+        read_pool_size=setting(config, "database.sqlite.read_pool_size", 4),
+        mmap_size=setting(config, "database.sqlite.mmap_size", 256 * 1024 * 1024),
+        cache_size_kb=setting(config, "database.sqlite.cache_size_kb", 64 * 1024)
+    )
+    logger.info(f"Opened database {path}")
+    return AsyncRuvScanDB(db)
+
+async def cancel(task: asyncio.Task):
+    """Cancel a background task and wait for it to stop"""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Background task failed: {e}")
+
+async def fit_local_embedder(db: AsyncRuvScanDB) -> bool:
+    """
+    Fit an unfitted local embedder on the stored repos and save it
+
+    Runs before ``start_reembedding``: the fitted model is a new embedding
+    version, so the corpus is then re-embedded with it in the background.
+
+    Returns:
+        True when a model was fitted
+    """
+    service = query.embedding_service
+    if not setting(config, "llm.fit_local_embedder", False) or not service.is_local or service.client.fitted:
+        return False
+
+    repos = await db.get_repo_documents()
+    if len(repos) < 2:
+        logger.warning("Local embedder is not fitted and there are too few repos to fit it on")
+        return False
+
+    loop = asyncio.get_running_loop()
+    texts = await loop.run_in_executor(None, lambda: [repo_summary_text(repo) for repo in repos])
+    await loop.run_in_executor(None, service.fit_local, texts)
+    logger.info(f"Fitted local embedder on {len(texts)} repos ({service.embedding_version})")
+    return True
+
+async def start_reembedding(db: AsyncRuvScanDB) -> Optional[asyncio.Task]:
+    """
+    Re-embed the corpus in the background when the configured embedding
+    version differs from the database's active version
+
+    Queries use an embedder matching the active version until the job
+    switches versions, then the configured one.
+    """
+    target = query.embedding_service
+    active = await db.get_active_embedding_version()
+    if active is None:
+        return None
+    if not await db.run(needs_reembedding, db.db, target):
+        # A finished switch may still owe README chunk embeddings
+        if not await db.get_chunks_missing_embedding(1):
+            return None
+
+    logger.info(f"Re-embedding from version {active} to {target.embedding_version}")
+    query.set_embedding_service(query.serving_embedding_service(active, target))
+
+    def switch(version: str):
+        query.set_embedding_service(target)
+
+    job = ReembeddingJob(
+        db.db, target,
+        batch_size=setting(config, "llm.reembedding.batch_size", 100),
+        pause_seconds=setting(config, "llm.reembedding.pause_seconds", 0.5),
+        on_complete=switch,
+        executor=db.executor
+    )
+    return job.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared database at startup and close it on shutdown"""
+    global repo_db
+
+    repo_db = open_database(config)
+    query.repo_db = repo_db
+    if query.embedding_cache is not None:
+        query.embedding_cache.db = repo_db.db
+
+    # Duplicate cards from older versions are removed while the server runs
+    compaction = asyncio.create_task(repo_db.compact_leverage_cards(
+        batch_size=setting(config, "database.sqlite.card_compaction_batch", 1000),
+        pause_seconds=setting(config, "database.sqlite.card_compaction_pause", 0.05)
+    ))
+    await fit_local_embedder(repo_db)
+    target = query.embedding_service
+    reembedding = await start_reembedding(repo_db)
+    try:
+        yield
+    finally:
+        await cancel(compaction)
+        if reembedding is not None:
+            await cancel(reembedding)
+        query.set_embedding_service(target)
+        db, repo_db = repo_db, None
+        query.repo_db = None
+        if query.embedding_cache is not None:
+            query.embedding_cache.db = None
+        for cache in (query.ann_cache, query.quantized_cache, query.chunk_cache):
+            cache.reset()
+        await db.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="RuvScan MCP Server",
     description="Sublinear-intelligence scanning for GitHub repositories",
-    version="0.5.0"
+    version="0.5.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -40,28 +173,11 @@ class ScanRequest(BaseModel):
     source_name: str = Field(..., description="Name of org/user or topic keyword")
     limit: Optional[int] = Field(50, description="Max repos to scan")
 
-class QueryRequest(BaseModel):
-    """Request to query for leverage"""
-    intent: str = Field(..., description="User's intent or problem statement")
-    max_results: Optional[int] = Field(10, description="Max leverage cards to return")
-    min_score: Optional[float] = Field(0.7, description="Minimum relevance score")
-
 class CompareRequest(BaseModel):
     """Request to compare two repositories"""
     repo_a: str = Field(..., description="First repo (org/name)")
     repo_b: str = Field(..., description="Second repo (org/name)")
 
-class LeverageCard(BaseModel):
-    """Schema for leverage card response"""
-    repo: str
-    capabilities: List[str]
-    summary: str
-    outside_box_reasoning: str
-    integration_hint: str
-    relevance_score: float
-    runtime_complexity: Optional[str] = None
-    cached: bool = False
-
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -98,59 +214,45 @@ async def scan_repos(request: ScanRequest):
         logger.error(f"Scan error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/query", response_model=List[LeverageCard])
-async def query_leverage(request: QueryRequest):
-    """
-    Query for leverage cards based on user intent
-
-    Uses sublinear similarity and SAFLA reasoning to find relevant repos
-    """
-    logger.info(f"Querying intent: {request.intent[:100]}...")
-
-    try:
-        # TODO: Generate embedding for intent
-        # TODO: Call Rust sublinear engine for similarity
-        # TODO: Apply SAFLA reasoning for outside-the-box insights
-        # TODO: Return ranked leverage cards
-
-        # Placeholder response
-        return [
-            LeverageCard(
-                repo="ruvnet/sublinear-time-solver",
-                capabilities=["O(log n) solving", "WASM acceleration", "MCP integration"],
-                summary="TRUE O(log n) matrix solver with consciousness exploration",
-                outside_box_reasoning="Could accelerate context similarity search by replacing vector comparisons with sublinear clustering",
-                integration_hint="Use as MCP tool via npx sublinear-time-solver mcp",
-                relevance_score=0.92,
-                runtime_complexity="O(log n)",
-                cached=False
-            )
-        ]
-    except Exception as e:
-        logger.error(f"Query error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+# Leverage discovery (embedding, sublinear similarity, BM25 fusion, SAFLA)
+app.include_router(query.router)
 
 @app.get("/cards")
 async def get_cards(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
     min_score: float = 0.0,
-    cached_only: bool = False
+    cached_only: bool = False,
+    repo: Optional[str] = None,
+    intent: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     List or filter saved leverage cards
+
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the next page;
+    ``total`` counts every card matching the filters.
     """
     logger.info(f"Fetching cards: limit={limit}, min_score={min_score}")
 
+    cards, next_cursor, total = [], None, 0
     try:
-        # TODO: Query database for leverage cards
-        # TODO: Apply filters
-        # TODO: Return results
+        if repo_db is not None:
+            (cards, next_cursor), total = await asyncio.gather(
+                repo_db.get_leverage_cards_page(
+                    limit, min_score, cached_only,
+                    repo=repo, query_intent=intent, cursor=cursor
+                ),
+                repo_db.count_leverage_cards(min_score, cached_only, repo=repo, query_intent=intent)
+            )
 
         return {
-            "cards": [],
-            "total": 0,
-            "limit": limit
+            "cards": cards,
+            "total": total,
+            "limit": limit,
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Cards fetch error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,8 @@
 """Storage layer for RuvScan"""
 
 from .db import RuvScanDB
+from .async_db import AsyncRuvScanDB
+from .vector_store import EmbeddingMatrixStore
 from .models import (
     Repository,
     LeverageCard,
@@ -12,6 +14,8 @@ from .models import (
 
 __all__ = [
     'RuvScanDB',
+    'AsyncRuvScanDB',
+    'EmbeddingMatrixStore',
     'Repository',
     'LeverageCard',
     'FACTCacheEntry',
@@ -0,0 +1,98 @@
+"""
+Async access to RuvScanDB
+Runs database calls on a dedicated thread pool so handlers never block the event loop
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
+import functools
+import logging
+
+from .db import RuvScanDB
+
+logger = logging.getLogger(__name__)
+
+class AsyncRuvScanDB:
+    """
+    Awaitable facade over ``RuvScanDB``
+
+    Every public method of the wrapped database is available as a
+    coroutine with the same signature (``await db.get_repo(name)``). Calls
+    run on a private executor sized to the read pool plus the writer, so
+    a slow disk read only holds up its own request and the default
+    executor stays free for other work.
+
+    Args:
+        db: Database to wrap
+        max_workers: Executor threads (defaults to ``read_pool_size + 1``)
+    """
+
+    def __init__(self, db: RuvScanDB, max_workers: Optional[int] = None):
+        self.db = db
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or db.read_pool_size + 1,
+            thread_name_prefix="ruvscan-db"
+        )
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` on the database executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            raise AttributeError(f"{name} is not a RuvScanDB method")
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return method
+
+    async def get_repos(self, full_names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Batched ``get_repo``: one query for many names"""
+        return await self.run(self.db.get_repos, full_names)
+
+    async def get_fact_cache_many(self, prompts: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Batched ``get_fact_cache``, results aligned with ``prompts``"""
+        return await self.run(self.db.get_fact_cache_many, prompts)
+
+    async def compact_leverage_cards(self, batch_size: int = 1000, pause_seconds: float = 0.0) -> int:
+        """
+        Remove duplicate leverage cards left by older versions
+
+        Runs ``compact_leverage_cards_step`` until no duplicates remain,
+        releasing the writer between batches so ingest and card writes
+        interleave. Meant to run as a background task
+        (``asyncio.create_task(db.compact_leverage_cards())``).
+
+        Args:
+            batch_size: (repo, intent) pairs compacted per step
+            pause_seconds: Sleep between steps
+
+        Returns:
+            Number of cards deleted
+        """
+        deleted = 0
+        while True:
+            removed, done = await self.run(self.db.compact_leverage_cards_step, batch_size)
+            deleted += removed
+            if done:
+                break
+            if pause_seconds:
+                await asyncio.sleep(pause_seconds)
+
+        if deleted:
+            logger.info(f"Compacted {deleted} duplicate leverage cards")
+        return deleted
+
+    async def close(self):
+        """Wait for queued calls, then close the database"""
+        await self.run(lambda: None)
+        self.executor.shutdown(wait=True)
+        self.db.close()
@@ -5,26 +5,335 @@ Handles SQLite storage for repos, leverage cards, and FACT cache
 
 import sqlite3
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Iterable, Tuple, Iterator
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import quote
+import base64
+import functools
 import hashlib
 import logging
+import os
+import queue
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+from .vector_store import EmbeddingMatrixStore, MATRIX_SUFFIXES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# Upserts use multiple ON CONFLICT clauses and RETURNING; cold columns are dropped
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Columns of the narrow (hot) repos row; READMEs and embeddings live in side tables
+REPO_COLUMNS = (
+    "id, name, org, full_name, description, topics, sublinear_hash, stars, "
+    "language, embedding_version, last_scan, created_at"
+)
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    """
+    Compress text for cold storage
+
+    Uses zstd when the ``zstandard`` package is installed, zlib otherwise.
+
+    Returns:
+        (codec, payload)
+    """
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=6).compress(data)
+    return 'zlib', zlib.compress(data, 6)
+
+def decompress_text(codec: str, payload: bytes) -> str:
+    """Inverse of ``compress_text``"""
+    if codec == 'zlib':
+        return zlib.decompress(payload).decode('utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("README stored with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    if codec == 'none':
+        return payload.decode('utf-8')
+    raise ValueError(f"Unknown README codec: {codec}")
+
+# bm25() column weights for repos_fts: name, description, topics, readme
+FTS_WEIGHTS = "10.0, 5.0, 5.0, 1.0"
+
+_FTS_TERM = re.compile(r"\w+", re.UNICODE)
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word becomes a quoted term so user input cannot inject FTS
+    syntax (AND, NEAR, column filters, unbalanced quotes).
+    """
+    terms = dict.fromkeys(term.lower() for term in _FTS_TERM.findall(text))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+def encode_cursor(card: Dict[str, Any]) -> str:
+    """Opaque page cursor positioned after ``card``"""
+    key = [card['relevance_score'], card['created_at'], card['id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[float, str, int]:
+    """
+    Inverse of ``encode_cursor``
+
+    Raises:
+        ValueError: The cursor was not produced by ``encode_cursor``
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, created_at, card_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), str(created_at), int(card_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+_WHITESPACE = re.compile(r"\s+")
+
+def intent_hash(intent: Optional[str]) -> str:
+    """
+    Dedup key of a query intent
+
+    SHA256 of the NFC-normalized, case-folded intent with whitespace
+    collapsed, so "Find a cache" and "find  a CACHE " share one card per
+    repo. Cards without an intent hash as the empty string.
+    """
+    text = _WHITESPACE.sub(" ", unicodedata.normalize("NFC", intent or "")).strip().casefold()
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _writes(method):
+    """Serialize a method on the writer connection"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class RuvScanDB:
-    """SQLite database manager for RuvScan"""
+    """
+    SQLite database manager for RuvScan
+
+    File databases run in WAL mode: writes go through one writer connection
+    (``conn``, serialized by a lock) while reads borrow read-only
+    connections from a pool of ``read_pool_size``, so readers on other
+    threads never wait for an ingest transaction.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/ruvscan.db",
+        vector_store_path: Optional[str] = None,
+        embedding_dtype: str = "float32",
+        read_pool_size: int = 4,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size_kb: int = 64 * 1024
+    ):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"RuvScan needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer, "
+                f"Python is linked against {sqlite3.sqlite_version}"
+            )
 
-    def __init__(self, db_path: str = "data/ruvscan.db"):
         self.db_path = db_path
         self.conn = None
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self._write_lock = threading.RLock()
         self._init_db()
 
+        # In-memory databases are private to their connection
+        self.read_pool_size = max(1, read_pool_size)
+        self._readers: Optional[queue.Queue] = None if db_path == ":memory:" else queue.Queue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self.embedding_dtype = self._check_embedding_dtype(embedding_dtype)
+
+        # Contiguous copy of the active embeddings for zero-copy query scans.
+        # Each activation writes a new generation (<base>.<n>) and the
+        # 'embedding_store' setting names the one in use.
+        if vector_store_path is None and db_path != ":memory:":
+            vector_store_path = os.path.splitext(db_path)[0] + ".vectors"
+        self.vector_store_base = vector_store_path
+        self.vector_store_path = self._store_generation_path(self._get_setting('embedding_store'))
+        self.vectors = EmbeddingMatrixStore(self.vector_store_path, dtype=self.embedding_dtype.name)
+
+        # README chunk embeddings of the active version, keyed by readme_chunks.id
+        self.chunk_vectors = EmbeddingMatrixStore(
+            self._chunk_store_path(self.vector_store_path), dtype=self.embedding_dtype.name
+        )
+        # (chunk store, revision, owning repo id per row), see ``_chunk_owners``
+        self._chunk_owner_cache: Optional[Tuple[EmbeddingMatrixStore, int, np.ndarray]] = None
+        if len(self.chunk_vectors) == 0 and self._has_chunk_embeddings():
+            self.rebuild_chunk_matrix()
+        if len(self.vectors) == 0 and self._has_embeddings():
+            logger.info("Embedding matrix missing, rebuilding from repo_embeddings")
+            self.rebuild_embedding_matrix()
+
     def _init_db(self):
         """Initialize database connection and create tables"""
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self._configure(self.conn)
+        if self.db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            # Durable at each checkpoint; a crash can only lose the last commits
+            self.conn.execute("PRAGMA synchronous = NORMAL")
         self._create_tables()
+        self._migrate()
+
+    def _configure(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._configure(conn)
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, opening one while the pool is below size"""
+        if self._readers is None:
+            yield self.conn
+            return
+
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._reader_lock:
+                if self._reader_count < self.read_pool_size:
+                    self._reader_count += 1
+                    conn = self._connect_reader()
+            if conn is None:
+                conn = self._readers.get()
+
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _migrate(self):
+        """Bring databases created by older versions up to the current schema"""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA table_info(repos)")
+        columns = {row['name'] for row in cursor.fetchall()}
+
+        if 'embedding_version' not in columns:
+            cursor.execute("ALTER TABLE repos ADD COLUMN embedding_version TEXT")
+            self.conn.commit()
+            logger.info("Added repos.embedding_version column")
+
+        if 'embedding' in columns or 'readme' in columns:
+            self._move_cold_columns(columns)
+
+        cursor.execute("PRAGMA table_info(readme_chunks)")
+        if 'embedding_version' not in {row['name'] for row in cursor.fetchall()}:
+            # Chunks embedded before versioning belong to the active version
+            with self.conn:
+                cursor.execute("ALTER TABLE readme_chunks ADD COLUMN embedding_version TEXT")
+                cursor.execute(
+                    "UPDATE readme_chunks SET embedding_version = ? WHERE embedding IS NOT NULL",
+                    (self._get_setting('embedding_version'),)
+                )
+            logger.info("Added readme_chunks.embedding_version column")
+
+        self._ensure_fts()
+        self._migrate_cards()
+
+    def _move_cold_columns(self, columns: set):
+        """Move README and embedding columns of an old repos table into the side tables"""
+        # The previous FTS index read repos.readme through triggers
+        for trigger in ("repos_fts_insert", "repos_fts_delete", "repos_fts_update"):
+            self.conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+        with self.conn:
+            if 'embedding' in columns:
+                has_embeddings = self.conn.execute(
+                    "SELECT 1 FROM repos WHERE embedding IS NOT NULL LIMIT 1"
+                ).fetchone() is not None
+
+                # Embeddings stored before versioning become the "legacy" version
+                version = self._get_setting('embedding_version')
+                if version is None and has_embeddings:
+                    version = 'legacy'
+                    self._set_setting('embedding_version', version)
+                    logger.info("Tagged existing embeddings as version 'legacy'")
+
+                if has_embeddings:
+                    self.conn.execute("""
+                        UPDATE repos SET embedding_version = ? WHERE embedding IS NOT NULL
+                    """, (version,))
+                    self.conn.execute("""
+                        INSERT OR IGNORE INTO repo_embeddings (repo_id, version, embedding)
+                        SELECT id, ?, embedding FROM repos WHERE embedding IS NOT NULL
+                    """, (version,))
+
+            if 'readme' in columns:
+                rows = self.conn.execute(
+                    "SELECT id, readme FROM repos WHERE readme IS NOT NULL"
+                ).fetchall()
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO repo_readmes (repo_id, codec, size, content) VALUES (?, ?, ?, ?)",
+                    [self._readme_row(row['id'], row['readme']) for row in rows]
+                )
+
+        for column in ('readme', 'embedding'):
+            if column in columns:
+                self.conn.execute(f"ALTER TABLE repos DROP COLUMN {column}")
+        self.conn.commit()
+        logger.info("Moved READMEs and embeddings out of repos; VACUUM reclaims the space")
+
+    def _check_embedding_dtype(self, dtype: str) -> np.dtype:
+        """Pin the BLOB dtype on first use; reopening with another dtype is an error"""
+        if dtype not in EmbeddingMatrixStore.SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM settings WHERE key = 'embedding_dtype'")
+        row = cursor.fetchone()
+
+        if row is None:
+            stored = 'float32' if self._has_embeddings() else dtype
+            cursor.execute(
+                "INSERT INTO settings (key, value) VALUES ('embedding_dtype', ?)", (stored,)
+            )
+            self.conn.commit()
+        else:
+            stored = row['value']
+
+        if stored != dtype:
+            raise ValueError(
+                f"Database stores {stored} embeddings, requested {dtype}; "
+                f"re-embed or open with embedding_dtype='{stored}'"
+            )
+        return np.dtype(dtype)
+
+    def _has_chunk_embeddings(self) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM readme_chunks WHERE embedding IS NOT NULL LIMIT 1")
+        return cursor.fetchone() is not None
+
+    def _has_embeddings(self) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM repo_embeddings LIMIT 1")
+        return cursor.fetchone() is not None
 
     def _create_tables(self):
         """Create database schema"""
@@ -39,17 +348,27 @@ class RuvScanDB:
                 full_name TEXT UNIQUE NOT NULL,
                 description TEXT,
                 topics TEXT,
-                readme TEXT,
-                embedding BLOB,
                 sublinear_hash TEXT,
                 stars INTEGER DEFAULT 0,
                 language TEXT,
+                embedding_version TEXT,
                 last_scan TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(org, name)
             )
         """)
 
+        # Compressed READMEs, read only when a caller asks for them
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS repo_readmes (
+                repo_id INTEGER PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content BLOB NOT NULL,
+                FOREIGN KEY (repo_id) REFERENCES repos(id)
+            )
+        """)
+
         # Leverage cards table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS leverage_cards (
@@ -62,6 +381,7 @@ class RuvScanDB:
                 relevance_score REAL NOT NULL,
                 runtime_complexity TEXT,
                 query_intent TEXT,
+                intent_hash TEXT,
                 cached BOOLEAN DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (repo_id) REFERENCES repos(id)
@@ -81,59 +401,1059 @@ class RuvScanDB:
             )
         """)
 
+        # README chunks for multi-vector search
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS readme_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                repo_id INTEGER NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                embedding BLOB,
+                embedding_version TEXT,
+                UNIQUE(repo_id, chunk_index),
+                FOREIGN KEY (repo_id) REFERENCES repos(id)
+            )
+        """)
+
+        # Embeddings per model version; settings.embedding_version names the active one
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS repo_embeddings (
+                repo_id INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (repo_id, version)
+            )
+        """)
+
+        # Database-wide settings
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+        # Embedding cache, content-addressed by normalized text hash
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (provider, model, text_hash)
+            ) WITHOUT ROWID
+        """)
+
         # Create indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_repos_org ON repos(org)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_repos_full_name ON repos(full_name)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cards_repo ON leverage_cards(repo_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cards_score ON leverage_cards(relevance_score)")
+        # Card listing order (score, created_at, id), globally and per repo/intent, for keyset paging
+        cursor.execute("DROP INDEX IF EXISTS idx_cards_repo")
+        cursor.execute("DROP INDEX IF EXISTS idx_cards_score")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cards_page
+            ON leverage_cards(relevance_score DESC, created_at DESC, id DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cards_repo_page
+            ON leverage_cards(repo_id, relevance_score DESC, created_at DESC, id DESC)
+        """)
+        # Intent paging index and the (repo_id, intent_hash) key are created by _migrate_cards
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_fact_hash ON fact_cache(hash)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_repo ON readme_chunks(repo_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_repo_embeddings_version ON repo_embeddings(version)")
 
         self.conn.commit()
         logger.info("Database tables created successfully")
 
-    def add_repo(self, repo_data: Dict[str, Any]) -> int:
-        """Add or update repository"""
+    def _migrate_cards(self):
+        """Backfill intent hashes and key leverage cards by (repo_id, intent_hash)"""
         cursor = self.conn.cursor()
+        cursor.execute("PRAGMA table_info(leverage_cards)")
+        columns = {row['name'] for row in cursor.fetchall()}
+
+        with self.conn:
+            if 'intent_hash' not in columns:
+                self.conn.execute("ALTER TABLE leverage_cards ADD COLUMN intent_hash TEXT")
+                logger.info("Added leverage_cards.intent_hash column")
+
+            rows = self.conn.execute(
+                "SELECT id, query_intent FROM leverage_cards WHERE intent_hash IS NULL"
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE leverage_cards SET intent_hash = ? WHERE id = ?",
+                [(intent_hash(row['query_intent']), row['id']) for row in rows]
+            )
+
+            # The intent filter matches normalized intents, so it pages on the hash
+            self.conn.execute("DROP INDEX IF EXISTS idx_cards_intent_page")
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cards_intent_hash_page
+                ON leverage_cards(intent_hash, relevance_score DESC, created_at DESC, id DESC)
+            """)
+
+        self._cards_keyed = self._ensure_card_key()
+
+    def _ensure_card_key(self) -> bool:
+        """
+        Create the unique (repo_id, intent_hash) card key
+
+        Returns:
+            False when duplicate cards from older versions still block it
+        """
+        try:
+            with self.conn:
+                self.conn.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_cards_key
+                    ON leverage_cards(repo_id, intent_hash)
+                """)
+            return True
+        except sqlite3.IntegrityError:
+            logger.warning(
+                "Duplicate leverage cards found; cards are appended until "
+                "compact_leverage_cards_step has removed them"
+            )
+            return False
+
+    def _ensure_fts(self):
+        """
+        Contentless full-text index over repo text
+
+        The README is stored compressed, so the index keeps no copy of the
+        text and is maintained by the write path rather than triggers.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'repos_fts'")
+        row = cursor.fetchone()
+
+        if row is not None and "content=''" in row['sql']:
+            return
+        if row is not None:
+            # Replace the external-content index of older databases
+            cursor.execute("DROP TABLE repos_fts")
 
         cursor.execute("""
-            INSERT OR REPLACE INTO repos
-            (name, org, full_name, description, topics, readme, stars, language, last_scan)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            repo_data.get('name'),
-            repo_data.get('org'),
-            repo_data.get('full_name'),
-            repo_data.get('description'),
-            json.dumps(repo_data.get('topics', [])),
-            repo_data.get('readme'),
-            repo_data.get('stars', 0),
-            repo_data.get('language'),
-            datetime.utcnow()
-        ))
+            CREATE VIRTUAL TABLE repos_fts USING fts5(
+                name, description, topics, readme,
+                content='',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
 
+        cursor.execute("SELECT id FROM repos")
+        repo_ids = [r['id'] for r in cursor.fetchall()]
+        for start in range(0, len(repo_ids), 500):
+            self._fts_insert(cursor, self._fts_rows(cursor, repo_ids[start:start + 500]))
         self.conn.commit()
-        return cursor.lastrowid
+        logger.info(f"Built full-text index over {len(repo_ids)} repos")
+
+    def _fts_rows(self, cursor: sqlite3.Cursor, repo_ids: Sequence[int]) -> List[tuple]:
+        """Indexed values of repos as currently stored"""
+        if not repo_ids:
+            return []
+
+        placeholders = ",".join("?" * len(repo_ids))
+        cursor.execute(f"""
+            SELECT r.id, r.name, r.description, r.topics, m.codec, m.content
+            FROM repos r LEFT JOIN repo_readmes m ON m.repo_id = r.id
+            WHERE r.id IN ({placeholders})
+        """, list(repo_ids))
+
+        return [
+            (
+                row['id'], row['name'], row['description'], row['topics'],
+                decompress_text(row['codec'], row['content']) if row['codec'] else None
+            )
+            for row in cursor.fetchall()
+        ]
 
-    def get_repo(self, full_name: str) -> Optional[Dict[str, Any]]:
-        """Get repository by full name"""
+    @staticmethod
+    def _fts_insert(cursor: sqlite3.Cursor, rows: List[tuple]):
+        cursor.executemany(
+            "INSERT INTO repos_fts (rowid, name, description, topics, readme) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    @staticmethod
+    def _fts_delete(cursor: sqlite3.Cursor, rows: List[tuple]):
+        # Contentless tables need the originally indexed values to remove a row
+        cursor.executemany("""
+            INSERT INTO repos_fts (repos_fts, rowid, name, description, topics, readme)
+            VALUES ('delete', ?, ?, ?, ?, ?)
+        """, rows)
+
+    @staticmethod
+    def _readme_row(repo_id: int, readme: str) -> tuple:
+        codec, payload = compress_text(readme)
+        return repo_id, codec, len(readme.encode('utf-8')), payload
+
+    def _get_setting(self, key: str) -> Optional[str]:
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM repos WHERE full_name = ?", (full_name,))
+        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
         row = cursor.fetchone()
+        return row['value'] if row else None
 
-        if row:
-            return dict(row)
-        return None
+    def _set_setting(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    def _store_generation_path(self, generation: Optional[str]) -> Optional[str]:
+        """Matrix file base of an embedding store generation (None: the original file)"""
+        if self.vector_store_base is None or generation is None:
+            return self.vector_store_base
+        return f"{self.vector_store_base}.{generation}"
+
+    @staticmethod
+    def _chunk_store_path(path: Optional[str]) -> Optional[str]:
+        return f"{path}.chunks" if path else None
+
+    @classmethod
+    def _remove_store_files(cls, path: Optional[str]):
+        if path is None:
+            return
+        for base in (path, cls._chunk_store_path(path)):
+            for suffix in (*MATRIX_SUFFIXES.values(), ".ids", ".json"):
+                if os.path.exists(base + suffix):
+                    os.remove(base + suffix)
+
+    def get_active_embedding_version(self) -> Optional[str]:
+        """Embedding version served to queries (None until the first embedding is stored)"""
+        return self._get_setting('embedding_version')
+
+    def add_repo(self, repo_data: Dict[str, Any]) -> int:
+        """
+        Add or update repository
+
+        An ``embedding`` is stored as the active embedding version; pass
+        ``embedding_version`` to tag it (it becomes the active version
+        when the database has none yet). The tag is required while a
+        re-embedding is in progress.
+        """
+        return self.add_repos_bulk([repo_data])[0]
+
+    @_writes
+    def add_repos_bulk(self, repos: Iterable[Dict[str, Any]], batch_size: int = 500) -> List[int]:
+        """
+        Upsert many repositories, one transaction per batch
+
+        Rows are updated in place on ``full_name`` conflicts, so repo ids
+        (and the leverage cards and chunks pointing at them) stay stable.
+
+        Args:
+            repos: Repository data dictionaries (see ``add_repo``)
+            batch_size: Repos written per transaction
+
+        Returns:
+            Repo ids in input order
+        """
+        batch_size = max(1, batch_size)
+        ids: List[int] = []
+        batch: List[Dict[str, Any]] = []
+
+        for repo_data in repos:
+            batch.append(repo_data)
+            if len(batch) >= batch_size:
+                ids.extend(self._upsert_repo_batch(batch))
+                batch = []
+        if batch:
+            ids.extend(self._upsert_repo_batch(batch))
+
+        return ids
+
+    def _embedding_version_for(self, repo_data: Dict[str, Any]) -> str:
+        version = self.get_active_embedding_version()
+        if 'embedding_version' not in repo_data:
+            # Untagged vectors are assumed to be active-version vectors, which
+            # is a guess once the ingest model may already be the new one
+            target = self._get_setting('embedding_migration')
+            if target is not None:
+                raise ValueError(
+                    f"Re-embedding from {version} to {target} is in progress; "
+                    f"pass embedding_version with each embedding"
+                )
+        if version is None:
+            version = repo_data.get('embedding_version') or "default"
+            self._set_setting('embedding_version', version)
+            # Chunks embedded before the first repo embedding share its model
+            self.conn.execute(
+                "UPDATE readme_chunks SET embedding_version = ? WHERE embedding IS NOT NULL AND embedding_version IS NULL",
+                (version,)
+            )
+        elif repo_data.get('embedding_version', version) != version:
+            raise ValueError(
+                f"Embedding version {repo_data['embedding_version']} is not the active "
+                f"version {version}; use put_version_embeddings for migrations"
+            )
+        return version
+
+    def _upsert_repo_batch(self, batch: List[Dict[str, Any]]) -> List[int]:
+        rows = []
+        embeddings: Dict[str, Tuple[np.ndarray, str]] = {}
+        readmes: Dict[str, Optional[str]] = {}
+        now = datetime.utcnow()
+
+        for repo_data in batch:
+            embedding = repo_data.get('embedding')
+            version = None
+            if embedding is not None:
+                embedding = np.asarray(embedding, dtype=self.embedding_dtype)
+                version = self._embedding_version_for(repo_data)
+                embeddings[repo_data.get('full_name')] = (embedding, version)
+            else:
+                embeddings.pop(repo_data.get('full_name'), None)
+            readmes[repo_data.get('full_name')] = repo_data.get('readme')
+
+            rows.append((
+                repo_data.get('name'),
+                repo_data.get('org'),
+                repo_data.get('full_name'),
+                repo_data.get('description'),
+                json.dumps(repo_data.get('topics', [])),
+                version,
+                repo_data.get('stars', 0),
+                repo_data.get('language'),
+                now
+            ))
+
+        full_names = list(dict.fromkeys(row[2] for row in rows))
+        placeholders = ",".join("?" * len(full_names))
+
+        with self.conn:
+            cursor = self.conn.cursor()
+
+            cursor.execute(
+                f"SELECT id FROM repos WHERE full_name IN ({placeholders})", full_names
+            )
+            self._fts_delete(cursor, self._fts_rows(cursor, [row['id'] for row in cursor.fetchall()]))
+
+            cursor.executemany("""
+                INSERT INTO repos
+                (name, org, full_name, description, topics, embedding_version,
+                 stars, language, last_scan)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(full_name) DO UPDATE SET
+                    name = excluded.name,
+                    org = excluded.org,
+                    description = excluded.description,
+                    topics = excluded.topics,
+                    embedding_version = excluded.embedding_version,
+                    stars = excluded.stars,
+                    language = excluded.language,
+                    last_scan = excluded.last_scan
+            """, rows)
+
+            cursor.execute(
+                f"SELECT id, full_name FROM repos WHERE full_name IN ({placeholders})",
+                full_names
+            )
+            id_by_name = {row['full_name']: row['id'] for row in cursor.fetchall()}
+
+            cursor.executemany(
+                "DELETE FROM repo_readmes WHERE repo_id = ?",
+                [(id_by_name[name],) for name, readme in readmes.items() if readme is None]
+            )
+            cursor.executemany("""
+                INSERT INTO repo_readmes (repo_id, codec, size, content) VALUES (?, ?, ?, ?)
+                ON CONFLICT(repo_id) DO UPDATE SET
+                    codec = excluded.codec,
+                    size = excluded.size,
+                    content = excluded.content
+            """, [
+                self._readme_row(id_by_name[name], readme)
+                for name, readme in readmes.items() if readme is not None
+            ])
+
+            self._fts_insert(cursor, self._fts_rows(cursor, list(id_by_name.values())))
+
+            # Re-ingested content invalidates every stored version of the embedding
+            cursor.executemany(
+                "DELETE FROM repo_embeddings WHERE repo_id = ?",
+                [(id_by_name[name],) for name in full_names]
+            )
+            cursor.executemany(
+                "INSERT INTO repo_embeddings (repo_id, version, embedding) VALUES (?, ?, ?)",
+                [
+                    (id_by_name[name], version, embedding.tobytes())
+                    for name, (embedding, version) in embeddings.items()
+                ]
+            )
+
+        self.vectors.upsert_many(
+            (id_by_name[name], embedding) for name, (embedding, _) in embeddings.items()
+        )
+        for name in full_names:
+            if name not in embeddings:
+                self.vectors.remove(id_by_name[name])
+
+        return [id_by_name[row[2]] for row in rows]
+
+    @_writes
+    def delete_repos(self, full_names: Sequence[str]) -> int:
+        """
+        Delete repositories with their README, embeddings, chunks and cards
+
+        Args:
+            full_names: Repository full names
+
+        Returns:
+            Number of repos deleted
+        """
+        names = list(dict.fromkeys(full_names))
+        if not names:
+            return 0
+
+        placeholders = ",".join("?" * len(names))
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT id FROM repos WHERE full_name IN ({placeholders})", names)
+            repo_ids = [row['id'] for row in cursor.fetchall()]
+            if not repo_ids:
+                return 0
+
+            self._fts_delete(cursor, self._fts_rows(cursor, repo_ids))
+            cursor.execute(
+                f"SELECT id FROM readme_chunks WHERE repo_id IN ({','.join('?' * len(repo_ids))})",
+                repo_ids
+            )
+            chunk_ids = [row['id'] for row in cursor.fetchall()]
+
+            id_params = [(repo_id,) for repo_id in repo_ids]
+            for table, column in (
+                ("repo_readmes", "repo_id"),
+                ("repo_embeddings", "repo_id"),
+                ("readme_chunks", "repo_id"),
+                ("leverage_cards", "repo_id"),
+                ("repos", "id")
+            ):
+                cursor.executemany(f"DELETE FROM {table} WHERE {column} = ?", id_params)
+
+        for repo_id in repo_ids:
+            self.vectors.remove(repo_id)
+        for chunk_id in chunk_ids:
+            self.chunk_vectors.remove(chunk_id)
+
+        return len(repo_ids)
+
+    def get_repo(
+        self,
+        full_name: str,
+        include_readme: bool = False,
+        include_embedding: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get repository by full name
+
+        Only the narrow metadata row is read unless the README (decompressed)
+        or the active embedding are requested.
+        """
+        with self._reader() as conn:
+            row = conn.execute(
+                f"SELECT {REPO_COLUMNS} FROM repos WHERE full_name = ?", (full_name,)
+            ).fetchone()
+            if not row:
+                return None
+
+            repo = dict(row)
+            if include_readme:
+                repo['readme'] = self._load_readmes(conn, [repo['id']]).get(repo['id'])
+            if include_embedding:
+                repo['embedding'] = self._load_embeddings(conn, [repo['id']]).get(repo['id'])
+
+        return repo
+
+    def get_repos(self, full_names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata of many repositories by full name
+
+        Args:
+            full_names: Repository full names
+
+        Returns:
+            Mapping of full name to repo row for the names that exist
+        """
+        found = {}
+        names = list(dict.fromkeys(full_names))
+
+        with self._reader() as conn:
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT {REPO_COLUMNS} FROM repos WHERE full_name IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((row['full_name'], dict(row)) for row in rows)
+
+        return found
 
-    def add_leverage_card(self, card_data: Dict[str, Any]) -> int:
-        """Add leverage card"""
+    def get_repos_by_id(self, repo_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get metadata of many repositories by id, e.g. search results
+
+        Args:
+            repo_ids: Repository ids
+
+        Returns:
+            Mapping of id to repo row for the ids that exist
+        """
+        found = {}
+        ids = [int(repo_id) for repo_id in dict.fromkeys(repo_ids)]
+
+        with self._reader() as conn:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT {REPO_COLUMNS} FROM repos WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((row['id'], dict(row)) for row in rows)
+
+        return found
+
+    def get_readmes(self, repo_ids: Sequence[int]) -> Dict[int, str]:
+        """Decompressed READMEs of the given repos (repos without one are absent)"""
+        with self._reader() as conn:
+            return self._load_readmes(conn, repo_ids)
+
+    def get_readme_storage(self) -> Dict[str, int]:
+        """Raw and compressed README bytes"""
+        with self._reader() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(content)), 0)
+                FROM repo_readmes
+            """).fetchone()
+        return {"readmes": row[0], "raw_bytes": row[1], "stored_bytes": row[2]}
+
+    @staticmethod
+    def _load_readmes(conn: sqlite3.Connection, repo_ids: Sequence[int]) -> Dict[int, str]:
+        found = {}
+        ids = list(dict.fromkeys(repo_ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT repo_id, codec, content FROM repo_readmes "
+                f"WHERE repo_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            found.update((row['repo_id'], decompress_text(row['codec'], row['content'])) for row in rows)
+        return found
+
+    def _load_embeddings(self, conn: sqlite3.Connection, repo_ids: Sequence[int]) -> Dict[int, np.ndarray]:
+        version = conn.execute(
+            "SELECT value FROM settings WHERE key = 'embedding_version'"
+        ).fetchone()
+        if version is None:
+            return {}
+
+        found = {}
+        ids = list(dict.fromkeys(repo_ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT repo_id, embedding FROM repo_embeddings "
+                f"WHERE version = ? AND repo_id IN ({','.join('?' * len(chunk))})",
+                [version[0], *chunk]
+            ).fetchall()
+            found.update(
+                (row['repo_id'], np.frombuffer(row['embedding'], dtype=self.embedding_dtype))
+                for row in rows
+            )
+        return found
+
+    def search_repos_text(self, query: str, limit: int = 2000) -> List[Tuple[int, float]]:
+        """
+        BM25-ranked lexical candidate search
+
+        Any query term may match (terms are OR-ed), and name, description
+        and topic hits weigh more than README hits.
+
+        Args:
+            query: Free text, e.g. a query intent
+            limit: Maximum candidates
+
+        Returns:
+            List of (repo_id, score) tuples, best first (higher is better)
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+
+        with self._reader() as conn:
+            rows = conn.execute(f"""
+                SELECT rowid, bm25(repos_fts, {FTS_WEIGHTS}) AS rank
+                FROM repos_fts
+                WHERE repos_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            """, (match, limit)).fetchall()
+
+        # bm25() is lower-is-better
+        return [(row[0], -row[1]) for row in rows]
+
+    def get_candidate_embeddings(self, repo_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Embeddings of a candidate subset, e.g. from ``search_repos_text``
+
+        Args:
+            repo_ids: Candidate repo ids
+
+        Returns:
+            (ids, matrix) for the candidates that have an embedding
+        """
+        return self.vectors.take(repo_ids)
+
+    def get_embedding_matrix(self, mmap: bool = True):
+        """
+        Get all repo embeddings as one matrix in the storage dtype
+
+        Args:
+            mmap: Memory-map the matrix file instead of reading it
+
+        Returns:
+            (repo_ids, matrix) tuple; rows with repo id -1 are retired
+        """
+        return self.vectors.load(mmap=mmap)
+
+    def get_embedding_matrix_revision(self) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Identity of the current embedding matrix contents
+
+        Returns:
+            (active version, store path, write revision); changes whenever
+            ``get_embedding_matrix`` could return different rows
+        """
+        return self.get_active_embedding_version(), self.vector_store_path, self.vectors.revision
+
+    def get_embedding_matrix_changes(self, revision: int) -> Optional[np.ndarray]:
+        """
+        Matrix rows written since a revision from ``get_embedding_matrix_revision``
+
+        Returns:
+            Row positions to re-read, or None when the whole matrix has to be
+            re-read (the change log no longer covers ``revision``)
+        """
+        return self.vectors.changes_since(revision)
+
+    @_writes
+    def rebuild_embedding_matrix(self) -> int:
+        """Rebuild the matrix file from the active version in ``repo_embeddings``"""
+        self.vectors.rebuild(self._version_embeddings(self.get_active_embedding_version()))
+        return len(self.vectors)
+
+    def _version_embeddings(self, version: Optional[str]) -> List[Tuple[int, np.ndarray]]:
         cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT repo_id, embedding FROM repo_embeddings WHERE version = ? ORDER BY repo_id",
+            (version,)
+        )
+        return [
+            (row['repo_id'], np.frombuffer(row['embedding'], dtype=self.embedding_dtype))
+            for row in cursor.fetchall()
+        ]
+
+    def get_repos_missing_version(self, version: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Repos that have no embedding for ``version`` yet, oldest id first"""
+        with self._reader() as conn:
+            rows = conn.execute("""
+                SELECT r.id, r.name, r.org, r.full_name, r.description, r.topics
+                FROM repos r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM repo_embeddings e WHERE e.repo_id = r.id AND e.version = ?
+                )
+                ORDER BY r.id
+                LIMIT ?
+            """, (version, limit)).fetchall()
+            return self._repo_documents(conn, rows)
+
+    def get_repo_documents(self, limit: int = 50000) -> List[Dict[str, Any]]:
+        """Repos with topics and README, oldest id first, e.g. to fit the local embedder"""
+        with self._reader() as conn:
+            rows = conn.execute("""
+                SELECT id, name, org, full_name, description, topics
+                FROM repos ORDER BY id LIMIT ?
+            """, (limit,)).fetchall()
+            return self._repo_documents(conn, rows)
+
+    def _repo_documents(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        readmes = self._load_readmes(conn, [row['id'] for row in rows])
+
+        repos = []
+        for row in rows:
+            repo = dict(row)
+            repo['topics'] = json.loads(repo['topics']) if repo.get('topics') else []
+            repo['readme'] = readmes.get(repo['id'])
+            repos.append(repo)
+        return repos
+
+    @_writes
+    def put_version_embeddings(self, version: str, items: Iterable[Tuple[int, np.ndarray]]) -> int:
+        """
+        Dual-write embeddings for a (not yet active) version
+
+        Vectors of the active version are served at once: the repos are
+        tagged with it in the same transaction and the matrix is updated.
+
+        Returns:
+            Number of embeddings stored (ids of deleted repos are skipped)
+        """
+        vectors = [(repo_id, np.asarray(vector, dtype=self.embedding_dtype)) for repo_id, vector in items]
+        active = version == self.get_active_embedding_version()
+
+        stored = []
+        with self.conn:
+            for repo_id, vector in vectors:
+                cursor = self.conn.execute("""
+                    INSERT OR REPLACE INTO repo_embeddings (repo_id, version, embedding)
+                    SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM repos WHERE id = ?)
+                """, (repo_id, version, vector.tobytes(), repo_id))
+                if cursor.rowcount:
+                    stored.append((repo_id, vector))
+
+            if active:
+                self.conn.executemany(
+                    "UPDATE repos SET embedding_version = ? WHERE id = ?",
+                    [(version, repo_id) for repo_id, _ in stored]
+                )
+            else:
+                self._set_setting('embedding_migration', version)
+
+        if active:
+            self.vectors.upsert_many(stored)
+        return len(stored)
+
+    def get_embedding_version_progress(self, version: str) -> Tuple[int, int]:
+        """(repos embedded with ``version``, total repos)"""
+        with self._reader() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+            done = conn.execute("""
+                SELECT COUNT(*) FROM repo_embeddings e
+                JOIN repos r ON r.id = e.repo_id
+                WHERE e.version = ?
+            """, (version,)).fetchone()[0]
+        return done, total
+
+    @_writes
+    def activate_embedding_version(self, version: str):
+        """
+        Make ``version`` the embedding version served to queries
+
+        The new matrix is written to a fresh store generation first; the
+        version and the pointer to that generation then switch together in
+        one transaction. A failed rebuild leaves the old version active and
+        the live matrix untouched, and a crash before the commit reopens on
+        the old generation.
+
+        README chunk embeddings of other versions are cleared in the same
+        transaction (their text is kept); ``get_chunks_missing_embedding``
+        lists them for re-embedding.
+
+        Raises:
+            ValueError: Some repos have no embedding for ``version``
+        """
+        done, total = self.get_embedding_version_progress(version)
+        if done < total:
+            raise ValueError(f"Version {version} covers {done}/{total} repos")
+
+        items = self._version_embeddings(version)
+
+        generation = str(int(self._get_setting('embedding_store') or 0) + 1)
+        path = self._store_generation_path(generation)
+        self._remove_store_files(path)  # left by an activation that crashed
+        staged = EmbeddingMatrixStore(path, dtype=self.embedding_dtype.name)
+        staged.rebuild(items)
+        staged_chunks = EmbeddingMatrixStore(self._chunk_store_path(path), dtype=self.embedding_dtype.name)
+        staged_chunks.rebuild(self._version_chunk_embeddings(version))
+
+        with self.conn:
+            self.conn.execute("UPDATE repos SET embedding_version = ?", (version,))
+            self.conn.execute("""
+                UPDATE readme_chunks SET embedding = NULL, embedding_version = NULL
+                WHERE embedding_version IS NOT ?
+            """, (version,))
+            self._set_setting('embedding_version', version)
+            self._set_setting('embedding_store', generation)
+            self.conn.execute("DELETE FROM settings WHERE key = 'embedding_migration'")
+
+        retired, self.vector_store_path = self.vector_store_path, path
+        self.vectors, self.chunk_vectors = staged, staged_chunks
+        # Open memory maps of the old matrix stay valid after unlinking
+        self._remove_store_files(retired)
+
+        logger.info(f"Activated embedding version {version} ({len(items)} vectors)")
+
+    @_writes
+    def drop_embedding_version(self, version: str) -> int:
+        """Delete stored embeddings of an inactive version"""
+        if version == self.get_active_embedding_version():
+            raise ValueError(f"Cannot drop the active embedding version {version}")
+
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM repo_embeddings WHERE version = ?", (version,))
+        deleted = cursor.rowcount
+        cursor.execute("DELETE FROM settings WHERE key = 'embedding_migration' AND value = ?", (version,))
+        self.conn.commit()
+        return deleted
+
+    def _chunk_version_for(self, version: Optional[str]) -> Optional[str]:
+        active = self.get_active_embedding_version()
+        if version is not None and active is not None and version != active:
+            raise ValueError(
+                f"Chunk embeddings must use the active version {active}, got {version}; "
+                f"chunks are re-embedded after activate_embedding_version"
+            )
+        return version or active
+
+    @_writes
+    def set_repo_chunks(
+        self,
+        repo_id: int,
+        chunks: List[str],
+        embeddings: Sequence[np.ndarray],
+        version: Optional[str] = None
+    ) -> List[int]:
+        """
+        Replace a repo's README chunks and their embeddings
+
+        Args:
+            repo_id: Repo the chunks belong to
+            chunks: Chunk texts in document order
+            embeddings: One embedding per chunk
+            version: Embedding version of ``embeddings`` (defaults to the active one)
+
+        Returns:
+            Chunk ids in document order
+
+        Raises:
+            ValueError: ``version`` is not the active version
+        """
+        if len(chunks) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks")
+        version = self._chunk_version_for(version)
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM readme_chunks WHERE repo_id = ?", (repo_id,))
+        old_ids = [row['id'] for row in cursor.fetchall()]
+
+        cursor.execute("DELETE FROM readme_chunks WHERE repo_id = ?", (repo_id,))
+        vectors = [np.asarray(embedding, dtype=self.embedding_dtype) for embedding in embeddings]
+        chunk_ids = []
+        for index, (content, vector) in enumerate(zip(chunks, vectors)):
+            cursor.execute("""
+                INSERT INTO readme_chunks (repo_id, chunk_index, content, embedding, embedding_version)
+                VALUES (?, ?, ?, ?, ?)
+            """, (repo_id, index, content, vector.tobytes(), version))
+            chunk_ids.append(cursor.lastrowid)
+
+        self.conn.commit()
+
+        for chunk_id in old_ids:
+            self.chunk_vectors.remove(chunk_id)
+        for chunk_id, vector in zip(chunk_ids, vectors):
+            self.chunk_vectors.upsert(chunk_id, vector)
+
+        return chunk_ids
+
+    def get_chunks_missing_embedding(self, limit: int = 100) -> List[Tuple[int, str]]:
+        """(chunk id, text) of README chunks without an embedding, e.g. after a version switch"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT id, content FROM readme_chunks WHERE embedding IS NULL ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(row['id'], row['content']) for row in rows]
+
+    @_writes
+    def put_chunk_embeddings(self, version: str, items: Iterable[Tuple[int, np.ndarray]]) -> int:
+        """
+        Store embeddings for existing README chunks
+
+        Args:
+            version: Embedding version of the vectors; must be the active one
+            items: (chunk id, embedding) pairs
+
+        Returns:
+            Number of chunks updated
+        """
+        version = self._chunk_version_for(version)
+        vectors = [(chunk_id, np.asarray(vector, dtype=self.embedding_dtype)) for chunk_id, vector in items]
+
+        updated = []
+        with self.conn:
+            for chunk_id, vector in vectors:
+                cursor = self.conn.execute(
+                    "UPDATE readme_chunks SET embedding = ?, embedding_version = ? WHERE id = ?",
+                    (vector.tobytes(), version, chunk_id)
+                )
+                if cursor.rowcount:
+                    updated.append((chunk_id, vector))
 
+        self.chunk_vectors.upsert_many(updated)
+        return len(updated)
+
+    def get_chunk_matrix(self, mmap: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get all README chunk embeddings with their repo back-references
+
+        Args:
+            mmap: Memory-map the matrix file instead of reading it
+
+        Returns:
+            (repo_ids, matrix) for live chunks; ``repo_ids[i]`` owns ``matrix[i]``
+        """
+        store = self.chunk_vectors
+        revision = store.revision
+        chunk_ids, matrix = store.load(mmap=mmap)
+
+        owners = self._chunk_owners(store, revision, chunk_ids)
+        live = owners != -1
+        return owners[live], matrix if live.all() else matrix[live]
+
+    def _chunk_owners(self, store: EmbeddingMatrixStore, revision: int, chunk_ids: np.ndarray) -> np.ndarray:
+        """
+        Owning repo id of each chunk matrix row (-1 for retired rows)
+
+        The owners are kept with the chunk store they were read for, so only
+        rows written since the last call are looked up in ``readme_chunks``.
+        """
+        cached = self._chunk_owner_cache
+        rows = None
+        if cached is not None and cached[0] is store:
+            rows = store.changes_since(cached[1])
+
+        owners = np.full(len(chunk_ids), -1, dtype=np.int64)
+        if rows is None:
+            rows = np.arange(len(chunk_ids))
+        else:
+            kept = min(len(cached[2]), len(chunk_ids))
+            owners[:kept] = cached[2][:kept]
+            # Rows appended since the cached revision are not in the log yet
+            # when the load raced a write; re-read everything past the cache
+            rows = np.union1d(rows[rows < len(chunk_ids)], np.arange(kept, len(chunk_ids)))
+
+        wanted = chunk_ids[rows]
+        lookup = {}
+        ids = [int(chunk_id) for chunk_id in wanted if chunk_id != -1]
+        if ids:
+            with self._reader() as conn:
+                for start in range(0, len(ids), 900):
+                    batch = ids[start:start + 900]
+                    lookup.update(conn.execute(
+                        f"SELECT id, repo_id FROM readme_chunks WHERE embedding IS NOT NULL "
+                        f"AND id IN ({','.join('?' * len(batch))})",
+                        batch
+                    ).fetchall())
+        owners[rows] = [lookup.get(int(chunk_id), -1) for chunk_id in wanted]
+
+        self._chunk_owner_cache = (store, revision, owners)
+        return owners.copy()
+
+    def get_chunk_matrix_revision(self) -> Tuple[Optional[str], Optional[str], int]:
+        """(active version, store path, write revision) of the chunk matrix; see ``get_embedding_matrix_revision``"""
+        return self.get_active_embedding_version(), self.vector_store_path, self.chunk_vectors.revision
+
+    @_writes
+    def rebuild_chunk_matrix(self) -> int:
+        """Rebuild the chunk matrix file from the embedding BLOBs in ``readme_chunks``"""
+        self.chunk_vectors.rebuild(self._version_chunk_embeddings(self.get_active_embedding_version()))
+        return len(self.chunk_vectors)
+
+    def _version_chunk_embeddings(self, version: Optional[str]) -> List[Tuple[int, np.ndarray]]:
+        cursor = self.conn.cursor()
         cursor.execute("""
-            INSERT INTO leverage_cards
-            (repo_id, capabilities, summary, reasoning, integration_hint,
-             relevance_score, runtime_complexity, query_intent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+            SELECT id, embedding FROM readme_chunks
+            WHERE embedding IS NOT NULL AND embedding_version IS ?
+            ORDER BY id
+        """, (version,))
+        return [
+            (row['id'], np.frombuffer(row['embedding'], dtype=self.embedding_dtype))
+            for row in cursor.fetchall()
+        ]
+
+    @_writes
+    def add_leverage_card(self, card_data: Dict[str, Any], keep: str = "best") -> int:
+        """
+        Add or replace the leverage card for a (repo, intent) pair
+
+        Each repo holds one card per normalized intent (see ``intent_hash``),
+        so regenerating a card replaces it instead of adding a row.
+
+        Args:
+            card_data: Card fields; an ``id`` updates (or creates) that card
+                and replaces any other card holding its (repo, intent) pair
+            keep: "best" keeps the higher-scoring card (ties go to the new
+                one), "latest" always replaces
+
+        Returns:
+            Id of the card now stored for the pair
+        """
+        row = self._card_row(card_data)
+        upsert = self._card_upsert(keep)
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.executemany(self._CARD_DISPLACE, self._displaced([row]))
+            cursor.execute(upsert + " RETURNING id", row)
+            stored = cursor.fetchone()
+            if stored is None:
+                # The existing card scored higher and was kept
+                cursor.execute(
+                    "SELECT id FROM leverage_cards WHERE repo_id = ? AND intent_hash = ?",
+                    (row[1], row[-1])
+                )
+                stored = cursor.fetchone()
+
+        return stored['id']
+
+    _CARD_INSERT = """
+        INSERT INTO leverage_cards
+        (id, repo_id, capabilities, summary, reasoning, integration_hint,
+         relevance_score, runtime_complexity, query_intent, intent_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _CARD_SET = """
+        repo_id = excluded.repo_id,
+        capabilities = excluded.capabilities,
+        summary = excluded.summary,
+        reasoning = excluded.reasoning,
+        integration_hint = excluded.integration_hint,
+        relevance_score = excluded.relevance_score,
+        runtime_complexity = excluded.runtime_complexity,
+        query_intent = excluded.query_intent,
+        intent_hash = excluded.intent_hash
+    """
+
+    # An explicit id claims its (repo, intent) pair from whichever card holds it
+    _CARD_DISPLACE = """
+        DELETE FROM leverage_cards
+        WHERE repo_id = ? AND intent_hash = ? AND id != ?
+    """
+
+    @staticmethod
+    def _displaced(rows: List[tuple]) -> List[tuple]:
+        return [(row[1], row[-1], row[0]) for row in rows if row[0] is not None]
+
+    def _card_upsert(self, keep: str) -> str:
+        if keep not in ("best", "latest"):
+            raise ValueError(f"Unknown card keep policy: {keep}")
+
+        sql = self._CARD_INSERT + f" ON CONFLICT(id) DO UPDATE SET {self._CARD_SET}"
+        if not self._cards_keyed:
+            # Duplicates from older versions still pending compaction
+            return sql
+
+        sql += (
+            f" ON CONFLICT(repo_id, intent_hash) DO UPDATE SET {self._CARD_SET},"
+            " created_at = CURRENT_TIMESTAMP"
+        )
+        if keep == "best":
+            sql += " WHERE excluded.relevance_score >= leverage_cards.relevance_score"
+        return sql
+
+    @staticmethod
+    def _card_row(card_data: Dict[str, Any]) -> tuple:
+        return (
+            card_data.get('id'),
             card_data.get('repo_id'),
             json.dumps(card_data.get('capabilities', [])),
             card_data.get('summary'),
@@ -141,40 +1461,197 @@ class RuvScanDB:
             card_data.get('integration_hint'),
             card_data.get('relevance_score'),
             card_data.get('runtime_complexity'),
-            card_data.get('query_intent')
-        ))
+            card_data.get('query_intent'),
+            intent_hash(card_data.get('query_intent'))
+        )
 
-        self.conn.commit()
-        return cursor.lastrowid
+    @_writes
+    def add_cards_bulk(
+        self,
+        cards: Iterable[Dict[str, Any]],
+        batch_size: int = 500,
+        keep: str = "best"
+    ) -> int:
+        """
+        Upsert many leverage cards, one transaction per batch
+
+        Cards carrying an ``id`` update (or create) that card and replace
+        any other card for their (repo, intent) pair; the others replace the
+        card for their pair per ``keep``.
+
+        Args:
+            cards: Card data dictionaries (see ``add_leverage_card``)
+            batch_size: Cards written per transaction
+            keep: "best" or "latest" (see ``add_leverage_card``)
+
+        Returns:
+            Number of cards processed
+        """
+        batch_size = max(1, batch_size)
+        upsert = self._card_upsert(keep)
+        written = 0
+        batch = []
+
+        for card_data in cards:
+            batch.append(self._card_row(card_data))
+            if len(batch) >= batch_size:
+                with self.conn:
+                    self.conn.executemany(self._CARD_DISPLACE, self._displaced(batch))
+                    self.conn.executemany(upsert, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            with self.conn:
+                self.conn.executemany(self._CARD_DISPLACE, self._displaced(batch))
+                self.conn.executemany(upsert, batch)
+            written += len(batch)
+
+        return written
+
+    @_writes
+    def compact_leverage_cards_step(self, batch_size: int = 1000) -> Tuple[int, bool]:
+        """
+        Delete one batch of duplicate leverage cards
+
+        For up to ``batch_size`` (repo, intent) pairs holding several cards,
+        keeps the best one (highest score, then newest) and deletes the
+        rest. Once no duplicates remain the unique (repo_id, intent_hash)
+        key is created and card writes become upserts.
+
+        Args:
+            batch_size: (repo, intent) pairs compacted per call
+
+        Returns:
+            (cards deleted, True when no duplicates remain)
+        """
+        if self._cards_keyed:
+            return 0, True
+
+        groups = self.conn.execute("""
+            SELECT repo_id, intent_hash FROM leverage_cards
+            GROUP BY repo_id, intent_hash
+            HAVING COUNT(*) > 1
+            LIMIT ?
+        """, (max(1, batch_size),)).fetchall()
+
+        with self.conn:
+            cursor = self.conn.executemany("""
+                DELETE FROM leverage_cards
+                WHERE repo_id = ? AND intent_hash = ? AND id != (
+                    SELECT id FROM leverage_cards
+                    WHERE repo_id = ? AND intent_hash = ?
+                    ORDER BY relevance_score DESC, created_at DESC, id DESC
+                    LIMIT 1
+                )
+            """, [(repo_id, key, repo_id, key) for repo_id, key in groups])
+            deleted = max(0, cursor.rowcount)
+
+        if len(groups) < max(1, batch_size):
+            self._cards_keyed = self._ensure_card_key()
+            if self._cards_keyed:
+                logger.info("Leverage cards compacted; (repo_id, intent_hash) key created")
+
+        return deleted, self._cards_keyed
 
     def get_leverage_cards(
         self,
         limit: int = 50,
         min_score: float = 0.0,
-        cached_only: bool = False
+        cached_only: bool = False,
+        repo: Optional[str] = None,
+        query_intent: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get leverage cards with filters"""
-        cursor = self.conn.cursor()
+        cards, _ = self.get_leverage_cards_page(
+            limit, min_score, cached_only, repo=repo, query_intent=query_intent
+        )
+        return cards
 
-        query = """
+    def get_leverage_cards_page(
+        self,
+        limit: int = 50,
+        min_score: float = 0.0,
+        cached_only: bool = False,
+        repo: Optional[str] = None,
+        query_intent: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of leverage cards, best first
+
+        Pages are keyset-paginated on (relevance_score, created_at, id), so
+        every page is an index range scan regardless of depth.
+
+        Args:
+            limit: Cards per page
+            min_score: Minimum relevance score
+            cached_only: Only cards served from cache
+            repo: Only cards for this repo full name
+            query_intent: Only cards generated for this intent (normalized)
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            (cards, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: Invalid cursor
+        """
+        where, params = self._card_filters(min_score, cached_only, repo, query_intent)
+        query = f"""
             SELECT lc.*, r.full_name as repo
             FROM leverage_cards lc
             JOIN repos r ON lc.repo_id = r.id
-            WHERE lc.relevance_score >= ?
+            WHERE {where}
         """
-        params = [min_score]
 
-        if cached_only:
-            query += " AND lc.cached = 1"
+        if cursor is not None:
+            query += " AND (lc.relevance_score, lc.created_at, lc.id) < (?, ?, ?)"
+            params.extend(decode_cursor(cursor))
 
-        query += " ORDER BY lc.relevance_score DESC, lc.created_at DESC LIMIT ?"
-        params.append(limit)
+        # One extra row tells whether another page exists
+        query += " ORDER BY lc.relevance_score DESC, lc.created_at DESC, lc.id DESC LIMIT ?"
+        params.append(limit + 1)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        with self._reader() as conn:
+            rows = conn.execute(query, params).fetchall()
 
-        return [dict(row) for row in rows]
+        cards = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(cards[-1]) if len(rows) > limit and cards else None
+        return cards, next_cursor
 
+    def count_leverage_cards(
+        self,
+        min_score: float = 0.0,
+        cached_only: bool = False,
+        repo: Optional[str] = None,
+        query_intent: Optional[str] = None
+    ) -> int:
+        """Number of leverage cards matching the ``get_leverage_cards_page`` filters"""
+        where, params = self._card_filters(min_score, cached_only, repo, query_intent)
+        with self._reader() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM leverage_cards lc WHERE {where}", params).fetchone()[0]
+
+    @staticmethod
+    def _card_filters(
+        min_score: float,
+        cached_only: bool,
+        repo: Optional[str],
+        query_intent: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        where = "lc.relevance_score >= ?"
+        params: List[Any] = [min_score]
+
+        if cached_only:
+            where += " AND lc.cached = 1"
+        if repo is not None:
+            where += " AND lc.repo_id = (SELECT id FROM repos WHERE full_name = ?)"
+            params.append(repo)
+        if query_intent is not None:
+            where += " AND lc.intent_hash = ?"
+            params.append(intent_hash(query_intent))
+        return where, params
+
+    @_writes
     def add_fact_cache(self, prompt: str, response: str, metadata: Optional[Dict] = None) -> str:
         """Add entry to FACT cache"""
         # Generate deterministic hash
@@ -199,9 +1676,8 @@ class RuvScanDB:
         """Get cached response from FACT"""
         cache_hash = hashlib.sha256(prompt.encode()).hexdigest()
 
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM fact_cache WHERE hash = ?", (cache_hash,))
-        row = cursor.fetchone()
+        with self._reader() as conn:
+            row = conn.execute("SELECT * FROM fact_cache WHERE hash = ?", (cache_hash,)).fetchone()
 
         if row:
             result = dict(row)
@@ -210,7 +1686,92 @@ class RuvScanDB:
             return result
         return None
 
+    def get_fact_cache_many(self, prompts: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get cached FACT responses for many prompts, aligned with ``prompts``"""
+        hashes = [hashlib.sha256(prompt.encode()).hexdigest() for prompt in prompts]
+        distinct = list(dict.fromkeys(hashes))
+        found = {}
+
+        with self._reader() as conn:
+            for start in range(0, len(distinct), 500):
+                chunk = distinct[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT * FROM fact_cache WHERE hash IN ({placeholders})", chunk
+                ).fetchall()
+
+                for row in rows:
+                    result = dict(row)
+                    if result.get('metadata'):
+                        result['metadata'] = json.loads(result['metadata'])
+                    found[result['hash']] = result
+
+        return [found.get(cache_hash) for cache_hash in hashes]
+
+    def get_cached_embeddings(
+        self,
+        provider: str,
+        model: str,
+        text_hashes: Sequence[str]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings by text hash
+
+        Args:
+            provider: Embedding provider name
+            model: Model identifier
+            text_hashes: SHA256 hashes of normalized texts
+
+        Returns:
+            Mapping of text hash to float32 embedding for the hits
+        """
+        found = {}
+
+        with self._reader() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(text_hashes), 500):
+                chunk = list(text_hashes[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"""
+                    SELECT text_hash, embedding FROM embedding_cache
+                    WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})
+                """, [provider, model, *chunk]).fetchall()
+
+                for row in rows:
+                    found[row['text_hash']] = np.frombuffer(row['embedding'], dtype=np.float32)
+
+        return found
+
+    @_writes
+    def add_cached_embeddings(
+        self,
+        provider: str,
+        model: str,
+        entries: Iterable[Tuple[str, np.ndarray]]
+    ) -> int:
+        """Store (text_hash, embedding) pairs in the embedding cache"""
+        rows = [
+            (provider, model, text_hash, len(vector), np.asarray(vector, dtype=np.float32).tobytes())
+            for text_hash, vector in entries
+        ]
+
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO embedding_cache
+            (provider, model, text_hash, dimension, embedding)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+        self.conn.commit()
+        return len(rows)
+
     def close(self):
-        """Close database connection"""
+        """Close the writer and pooled reader connections"""
+        if self._readers is not None:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
         if self.conn:
             self.conn.close()
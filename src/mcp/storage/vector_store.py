@@ -0,0 +1,347 @@
+"""
+Embedding matrix store for RuvScan
+Keeps repo embeddings in a contiguous float32 file that can be memory-mapped
+"""
+
+import json
+import os
+import threading
+from typing import Optional, Dict, List, Tuple, Iterable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Row id written over retired rows until the next compaction
+TOMBSTONE_ID = -1
+
+# Changed rows remembered for ``changes_since``; older changes are forgotten
+MAX_LOGGED_CHANGES = 100000
+
+# Matrix file extension per store dtype
+MATRIX_SUFFIXES = {"float32": ".f32", "float16": ".f16"}
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+class EmbeddingMatrixStore:
+    """
+    Persistent embedding matrix with a repo-id map
+
+    Rows are stored as float32 (default) or float16, which halves the file
+    and the memory-mapped working set. Rows are scaled to unit length on
+    write (only cosine is ever computed over them), so scans can skip the
+    per-query normalization pass.
+
+    Layout on disk (``base_path`` without extension):
+        <base>.f32   - row-major matrix, one row per embedding (.f16 for float16)
+        <base>.ids   - int64 repo id for each row (-1 marks a retired row)
+        <base>.json  - metadata (dimension, dtype, unit)
+
+    When ``base_path`` is None the matrix is kept in memory only, which is
+    what ``RuvScanDB(":memory:")`` uses.
+
+    ``revision`` is bumped by every write, so derived structures (such as
+    an ANN index over the matrix) can tell when they are stale, and
+    ``changes_since`` tells them which rows to re-read.
+    """
+
+    SUPPORTED_DTYPES = ("float32", "float16")
+
+    def __init__(
+        self,
+        base_path: Optional[str] = None,
+        dimension: Optional[int] = None,
+        dtype: str = "float32"
+    ):
+        if dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+
+        self.base_path = base_path
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._rows: Dict[int, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, dimension or 0), dtype=self.dtype)
+        self.revision = 0
+        # (revision, rows) per write, for incremental consumers
+        self._changes: List[Tuple[int, np.ndarray]] = []
+        self._logged = 0
+        self._changes_floor = 0
+
+        if self.base_path:
+            self._open()
+
+    @property
+    def matrix_path(self) -> str:
+        return f"{self.base_path}{MATRIX_SUFFIXES[self.dtype.name]}"
+
+    @property
+    def ids_path(self) -> str:
+        return f"{self.base_path}.ids"
+
+    @property
+    def meta_path(self) -> str:
+        return f"{self.base_path}.json"
+
+    def _open(self):
+        """Load metadata and the row-id map from disk"""
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if self.dimension and meta['dimension'] != self.dimension:
+                raise ValueError(
+                    f"Embedding store dimension {meta['dimension']} does not match "
+                    f"requested dimension {self.dimension}"
+                )
+            self.dimension = meta['dimension']
+            if meta.get('dtype', 'float32') != self.dtype.name:
+                raise ValueError(
+                    f"Embedding store dtype {meta.get('dtype')} does not match "
+                    f"requested dtype {self.dtype.name}"
+                )
+
+            # float16 matrices used to be written with the float32 extension
+            legacy = f"{self.base_path}{MATRIX_SUFFIXES['float32']}"
+            if legacy != self.matrix_path and os.path.exists(legacy) and not os.path.exists(self.matrix_path):
+                os.replace(legacy, self.matrix_path)
+                logger.info(f"Renamed embedding matrix {legacy} to {self.matrix_path}")
+
+            if not meta.get('unit'):
+                self._normalize_file()
+
+        if os.path.exists(self.ids_path):
+            ids = np.fromfile(self.ids_path, dtype=np.int64)
+            self._rows = {
+                int(repo_id): row
+                for row, repo_id in enumerate(ids)
+                if repo_id != TOMBSTONE_ID
+            }
+            logger.info(f"Opened embedding store with {len(self._rows)} vectors")
+
+    def _write_meta(self):
+        directory = os.path.dirname(self.meta_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.meta_path, 'w') as f:
+            json.dump({"dimension": self.dimension, "dtype": self.dtype.name, "unit": True}, f)
+
+    def _normalize_file(self, block: int = 65536):
+        """Scale the rows of a store written before rows were kept unit length"""
+        if os.path.exists(self.matrix_path) and os.path.getsize(self.matrix_path) and self.dimension:
+            matrix = np.memmap(self.matrix_path, dtype=self.dtype, mode='r+').reshape(-1, self.dimension)
+            for start in range(0, len(matrix), block):
+                matrix[start:start + block] = _unit_rows(matrix[start:start + block])
+            matrix.flush()
+            del matrix
+            logger.info(f"Normalized the rows of embedding store {self.matrix_path}")
+        self._write_meta()
+
+    def _coerce(self, vector: np.ndarray) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float64).reshape(-1)
+        norm = np.linalg.norm(vec)
+        vec = np.ascontiguousarray(vec / norm if norm > 0 else vec, dtype=self.dtype)
+
+        if self.dimension is None:
+            self.dimension = vec.shape[0]
+            self._matrix = np.empty((0, self.dimension), dtype=self.dtype)
+            if self.base_path:
+                self._write_meta()
+        elif vec.shape[0] != self.dimension:
+            raise ValueError(
+                f"Embedding has dimension {vec.shape[0]}, store expects {self.dimension}"
+            )
+
+        return vec
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, repo_id: int) -> bool:
+        return repo_id in self._rows
+
+    def upsert(self, repo_id: int, vector: np.ndarray):
+        """Insert or overwrite the embedding for a repo"""
+        self.upsert_many([(repo_id, vector)])
+
+    def upsert_many(self, items: Iterable[Tuple[int, np.ndarray]]):
+        """Insert or overwrite many embeddings with one append per file"""
+        with self._lock:
+            updates: Dict[int, np.ndarray] = {}
+            for repo_id, vector in items:
+                updates[int(repo_id)] = self._coerce(vector)
+            if not updates:
+                return
+
+            appended = [repo_id for repo_id in updates if repo_id not in self._rows]
+            overwritten = sorted(
+                (self._rows[repo_id], vec) for repo_id, vec in updates.items() if repo_id in self._rows
+            )
+
+            if self.base_path:
+                if overwritten:
+                    with open(self.matrix_path, 'r+b') as f:
+                        for row, vec in overwritten:
+                            f.seek(row * self.dimension * vec.itemsize)
+                            f.write(vec.tobytes())
+                if appended:
+                    first = os.path.getsize(self.ids_path) // 8 if os.path.exists(self.ids_path) else 0
+                    with open(self.matrix_path, 'ab') as f:
+                        f.write(np.stack([updates[repo_id] for repo_id in appended]).tobytes())
+                    with open(self.ids_path, 'ab') as f:
+                        f.write(np.asarray(appended, dtype=np.int64).tobytes())
+            else:
+                for row, vec in overwritten:
+                    self._matrix[row] = vec
+                first = len(self._ids)
+                if appended:
+                    self._ids = np.concatenate([self._ids, np.asarray(appended, dtype=np.int64)])
+                    self._matrix = np.vstack([self._matrix, np.stack([updates[r] for r in appended])])
+
+            rows = [row for row, _ in overwritten]
+            for offset, repo_id in enumerate(appended):
+                self._rows[repo_id] = first + offset
+                rows.append(first + offset)
+            self.revision += 1
+            self._log_changes(rows)
+
+    def remove(self, repo_id: int) -> bool:
+        """Retire a repo's row; the space is reclaimed by ``compact``"""
+        with self._lock:
+            row = self._rows.pop(repo_id, None)
+            if row is None:
+                return False
+
+            if self.base_path:
+                with open(self.ids_path, 'r+b') as f:
+                    f.seek(row * 8)
+                    f.write(np.int64(TOMBSTONE_ID).tobytes())
+                with open(self.matrix_path, 'r+b') as f:
+                    f.seek(row * self.dimension * self.dtype.itemsize)
+                    f.write(np.zeros(self.dimension, dtype=self.dtype).tobytes())
+            else:
+                self._ids[row] = TOMBSTONE_ID
+                self._matrix[row] = 0.0
+
+            self.revision += 1
+            self._log_changes([row])
+            return True
+
+    def _log_changes(self, rows: List[int]):
+        """Record the rows written at the current revision (caller holds the lock)"""
+        self._changes.append((self.revision, np.asarray(rows, dtype=np.int64)))
+        self._logged += len(rows)
+        while self._logged > MAX_LOGGED_CHANGES and self._changes:
+            revision, dropped = self._changes.pop(0)
+            self._logged -= len(dropped)
+            self._changes_floor = revision
+
+    def changes_since(self, revision: int) -> Optional[np.ndarray]:
+        """
+        Rows written after ``revision``
+
+        Args:
+            revision: A ``revision`` value read earlier from this store
+
+        Returns:
+            Sorted row positions (retired rows included), or None when the
+            log no longer reaches back that far (or the store was rebuilt)
+            and the whole matrix has to be re-read
+        """
+        with self._lock:
+            if revision < self._changes_floor or revision > self.revision:
+                return None
+            rows = [changed for written, changed in self._changes if written > revision]
+
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(rows))
+
+    def load(self, mmap: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Load the embedding matrix
+
+        Args:
+            mmap: Memory-map the matrix file read-only instead of reading it
+
+        Returns:
+            (ids, matrix) where ``ids[i]`` is the repo id of ``matrix[i]``.
+            Retired rows carry id -1 and a zero vector.
+        """
+        with self._lock:
+            if not self.base_path:
+                return self._ids.copy(), self._matrix.copy()
+
+            dimension = self.dimension or 0
+            if not os.path.exists(self.ids_path) or dimension == 0:
+                return np.empty(0, dtype=np.int64), np.empty((0, dimension), dtype=self.dtype)
+
+            ids = np.fromfile(self.ids_path, dtype=np.int64)
+            if len(ids) == 0:
+                return ids, np.empty((0, dimension), dtype=self.dtype)
+
+            if mmap:
+                matrix = np.memmap(
+                    self.matrix_path,
+                    dtype=self.dtype,
+                    mode='r',
+                    shape=(len(ids), dimension)
+                )
+            else:
+                matrix = np.fromfile(self.matrix_path, dtype=self.dtype).reshape(len(ids), dimension)
+
+            return ids, matrix
+
+    def take(self, repo_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows for a subset of repos
+
+        Args:
+            repo_ids: Repo ids; unknown ids are skipped
+
+        Returns:
+            (ids, matrix) in the order of ``repo_ids``, copied out of the store
+        """
+        with self._lock:
+            pairs = [(int(r), self._rows[int(r)]) for r in repo_ids if int(r) in self._rows]
+            ids = np.array([repo_id for repo_id, _ in pairs], dtype=np.int64)
+            rows = np.array([row for _, row in pairs], dtype=np.int64)
+
+        if len(rows) == 0:
+            return ids, np.empty((0, self.dimension or 0), dtype=self.dtype)
+
+        _, matrix = self.load(mmap=True)
+        return ids, np.asarray(matrix[rows])
+
+    def rebuild(self, items: Iterable[Tuple[int, np.ndarray]]):
+        """Replace the store contents with (repo_id, vector) pairs"""
+        with self._lock:
+            self._rows = {}
+            self._ids = np.empty(0, dtype=np.int64)
+            self._matrix = np.empty((0, self.dimension or 0), dtype=self.dtype)
+            self.revision += 1
+            # Row positions are reassigned, so older changes no longer apply
+            self._changes, self._logged = [], 0
+            self._changes_floor = self.revision
+            if self.base_path:
+                for path in (self.matrix_path, self.ids_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+        for repo_id, vector in items:
+            self.upsert(repo_id, vector)
+
+        logger.info(f"Rebuilt embedding store with {len(self._rows)} vectors")
+
+    def compact(self):
+        """Rewrite the matrix without retired rows"""
+        ids, matrix = self.load(mmap=False)
+        live = ids != TOMBSTONE_ID
+        if live.all():
+            return
+
+        self.rebuild(zip(ids[live].tolist(), matrix[live]))
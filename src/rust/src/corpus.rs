@@ -0,0 +1,314 @@
+/*!
+Named corpora kept resident in engine memory
+Lets clients upload a corpus once and query it by name
+*/
+
+use std::collections::HashMap;
+use std::sync::Arc;
+
+use ndarray::{s, Array1, Array2, ArrayView2};
+use thiserror::Error;
+
+use crate::sublinear::{
+    batch_sublinear_similarity, cached_projection, normalize_rows, rank_projected, JLProjection
+};
+
+/// Errors raised while mutating a corpus
+#[derive(Debug, Error)]
+pub enum CorpusError {
+    #[error("vector {id} has dimension {got}, corpus expects {expected}")]
+    DimensionMismatch { id: i64, expected: usize, got: usize },
+    #[error("got {ids} ids for {rows} vectors")]
+    LengthMismatch { ids: usize, rows: usize },
+    #[error("{rows} projected rows have dimension {got}, corpus expects {expected}")]
+    ProjectionMismatch { rows: usize, expected: usize, got: usize },
+}
+
+/// Corpus of vectors addressed by caller-assigned ids
+///
+/// Vectors are JL-projected once on ingest and kept projected, so a query
+/// at the corpus distortion costs one small projection plus k-dimensional
+/// dot products.
+pub struct Corpus {
+    pub dimension: usize,
+    pub distortion: f64,
+    ids: Vec<i64>,
+    rows: HashMap<i64, usize>,
+    matrix: Array2<f64>,
+    projection: Arc<JLProjection>,
+    projected: Array2<f64>,
+}
+
+impl std::fmt::Debug for Corpus {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        f.debug_struct("Corpus")
+            .field("dimension", &self.dimension)
+            .field("distortion", &self.distortion)
+            .field("size", &self.ids.len())
+            .field("target_dimension", &self.projection.target_dimension)
+            .finish()
+    }
+}
+
+impl Corpus {
+    /// Create an empty corpus of the given dimension
+    pub fn new(dimension: usize, distortion: f64) -> Self {
+        let projection = cached_projection(dimension, distortion);
+        let target_dimension = projection.target_dimension;
+
+        Self {
+            dimension,
+            distortion,
+            ids: Vec::new(),
+            rows: HashMap::new(),
+            matrix: Array2::zeros((0, dimension)),
+            projection,
+            projected: Array2::zeros((0, target_dimension)),
+        }
+    }
+
+    pub fn len(&self) -> usize {
+        self.ids.len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.ids.is_empty()
+    }
+
+    /// Id of the vector stored at `row`
+    pub fn id(&self, row: usize) -> i64 {
+        self.ids[row]
+    }
+
+    /// Corpus matrix, one vector per row
+    pub fn matrix(&self) -> &Array2<f64> {
+        &self.matrix
+    }
+
+    /// Check a vector can be stored without mutating the corpus
+    pub fn validate(&self, id: i64, vector: &[f64]) -> Result<(), CorpusError> {
+        if vector.len() != self.dimension {
+            return Err(CorpusError::DimensionMismatch {
+                id,
+                expected: self.dimension,
+                got: vector.len(),
+            });
+        }
+        Ok(())
+    }
+
+    /// Insert a vector or overwrite the existing vector for `id`
+    pub fn upsert(&mut self, id: i64, vector: &[f64]) -> Result<(), CorpusError> {
+        self.validate(id, vector)?;
+        let row = ArrayView2::from_shape((1, vector.len()), vector)
+            .expect("single row matches its own length");
+        self.upsert_batch(&[id], row)
+    }
+
+    /// Shared projection used for this corpus' projected rows
+    pub fn projection(&self) -> Arc<JLProjection> {
+        Arc::clone(&self.projection)
+    }
+
+    /// Project and normalize row vectors with `projection`
+    ///
+    /// Needs no access to the corpus itself, so callers can run the GEMM
+    /// before taking any lock and hand the result to [`Corpus::splice`].
+    pub fn project_batch(projection: &JLProjection, vectors: ArrayView2<f64>) -> Array2<f64> {
+        let mut projected = projection.project_rows(vectors);
+        normalize_rows(&mut projected);
+        projected
+    }
+
+    /// Insert or overwrite a batch of row vectors, projecting them in one GEMM
+    pub fn upsert_batch(&mut self, ids: &[i64], vectors: ArrayView2<f64>) -> Result<(), CorpusError> {
+        self.check_batch(ids, vectors)?;
+        let projected = Self::project_batch(&self.projection, vectors);
+        self.splice(ids, vectors, projected.view())
+    }
+
+    /// Insert or overwrite rows already projected with [`Corpus::projection`]
+    pub fn splice(
+        &mut self,
+        ids: &[i64],
+        vectors: ArrayView2<f64>,
+        projected: ArrayView2<f64>,
+    ) -> Result<(), CorpusError> {
+        self.check_batch(ids, vectors)?;
+        if projected.nrows() != ids.len() || projected.ncols() != self.projection.target_dimension {
+            return Err(CorpusError::ProjectionMismatch {
+                rows: projected.nrows(),
+                expected: self.projection.target_dimension,
+                got: projected.ncols(),
+            });
+        }
+
+        for (offset, &id) in ids.iter().enumerate() {
+            let vector = vectors.row(offset);
+            let projected_row = projected.row(offset);
+
+            match self.rows.get(&id) {
+                Some(&row) => {
+                    self.matrix.row_mut(row).assign(&vector);
+                    self.projected.row_mut(row).assign(&projected_row);
+                }
+                None => {
+                    self.matrix
+                        .push_row(vector)
+                        .expect("row length was validated against corpus dimension");
+                    self.projected
+                        .push_row(projected_row)
+                        .expect("projected row matches target dimension");
+                    self.rows.insert(id, self.ids.len());
+                    self.ids.push(id);
+                }
+            }
+        }
+
+        Ok(())
+    }
+
+    /// Remove the vectors for `ids`, returning how many were stored
+    ///
+    /// Each freed row is filled with the last row, so the remaining rows
+    /// are compacted with one copy of the matrices. Unknown ids are ignored.
+    pub fn remove(&mut self, ids: &[i64]) -> usize {
+        let mut removed = 0;
+        for id in ids {
+            let row = match self.rows.remove(id) {
+                Some(row) => row,
+                None => continue,
+            };
+            let last = self.ids.len() - 1;
+            if row != last {
+                let moved = self.ids[last];
+                let vector = self.matrix.row(last).to_owned();
+                let projected = self.projected.row(last).to_owned();
+                self.matrix.row_mut(row).assign(&vector);
+                self.projected.row_mut(row).assign(&projected);
+                self.rows.insert(moved, row);
+            }
+            self.ids.swap_remove(row);
+            removed += 1;
+        }
+
+        if removed > 0 {
+            let size = self.ids.len();
+            self.matrix = self.matrix.slice(s![..size, ..]).to_owned();
+            self.projected = self.projected.slice(s![..size, ..]).to_owned();
+        }
+        removed
+    }
+
+    fn check_batch(&self, ids: &[i64], vectors: ArrayView2<f64>) -> Result<(), CorpusError> {
+        if ids.len() != vectors.nrows() {
+            return Err(CorpusError::LengthMismatch { ids: ids.len(), rows: vectors.nrows() });
+        }
+        if let Some(&id) = ids.first() {
+            if vectors.ncols() != self.dimension {
+                return Err(CorpusError::DimensionMismatch {
+                    id,
+                    expected: self.dimension,
+                    got: vectors.ncols(),
+                });
+            }
+        }
+        Ok(())
+    }
+
+    /// Similarity of `query` against every vector, sorted descending
+    ///
+    /// A `distortion` of zero or the corpus distortion uses the pre-projected
+    /// corpus; any other value projects the corpus for this call only.
+    pub fn query(&self, query: &Array1<f64>, distortion: f64) -> Vec<(usize, f64)> {
+        if distortion <= 0.0 || distortion.to_bits() == self.distortion.to_bits() {
+            rank_projected(&self.projection.project(query), self.projected.view())
+        } else {
+            batch_sublinear_similarity(query, &self.matrix, distortion)
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use ndarray::array;
+
+    #[test]
+    fn test_upsert_appends_and_overwrites() {
+        let mut corpus = Corpus::new(3, 0.5);
+        corpus.upsert(10, &[1.0, 0.0, 0.0]).unwrap();
+        corpus.upsert(20, &[0.0, 1.0, 0.0]).unwrap();
+        corpus.upsert(10, &[0.0, 0.0, 1.0]).unwrap();
+
+        assert_eq!(corpus.len(), 2);
+        assert_eq!(corpus.id(0), 10);
+        assert_eq!(corpus.matrix().row(0), array![0.0, 0.0, 1.0]);
+    }
+
+    #[test]
+    fn test_remove_compacts_rows() {
+        let mut corpus = Corpus::new(3, 0.5);
+        corpus.upsert(10, &[1.0, 0.0, 0.0]).unwrap();
+        corpus.upsert(20, &[0.0, 1.0, 0.0]).unwrap();
+        corpus.upsert(30, &[0.0, 0.0, 1.0]).unwrap();
+
+        assert_eq!(corpus.remove(&[10, 99]), 1);
+        assert_eq!(corpus.len(), 2);
+        assert_eq!(corpus.id(0), 30);
+        assert_eq!(corpus.matrix().row(0), array![0.0, 0.0, 1.0]);
+
+        let best = corpus.query(&array![0.0, 0.0, 1.0], 0.5)[0].0;
+        assert_eq!(corpus.id(best), 30);
+
+        corpus.upsert(30, &[1.0, 1.0, 0.0]).unwrap();
+        corpus.upsert(40, &[1.0, 0.0, 0.0]).unwrap();
+        assert_eq!(corpus.len(), 3);
+        assert_eq!(corpus.remove(&[20, 30, 40]), 3);
+        assert!(corpus.is_empty());
+    }
+
+    #[test]
+    fn test_dimension_mismatch() {
+        let mut corpus = Corpus::new(3, 0.5);
+        assert!(corpus.upsert(1, &[1.0, 2.0]).is_err());
+        assert!(corpus.is_empty());
+    }
+
+    #[test]
+    fn test_query_matches_unprojected_path() {
+        let vectors = array![
+            [1.0, 0.2, 0.0, 0.5, 0.0, 1.0, 0.3, 0.0],
+            [0.0, 1.0, 0.7, 0.0, 0.2, 0.0, 0.0, 1.0],
+            [0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5]
+        ];
+        let mut corpus = Corpus::new(8, 0.5);
+        corpus.upsert_batch(&[1, 2, 3], vectors.view()).unwrap();
+
+        let query = vectors.row(1).to_owned();
+        let resident = corpus.query(&query, 0.5);
+        let shipped = batch_sublinear_similarity(&query, &vectors, 0.5);
+
+        assert_eq!(resident.len(), shipped.len());
+        for ((idx_a, a), (idx_b, b)) in resident.iter().zip(shipped.iter()) {
+            assert_eq!(idx_a, idx_b);
+            assert!((a - b).abs() < 1e-9);
+        }
+        assert_eq!(corpus.id(resident[0].0), 2);
+    }
+
+    #[test]
+    fn test_splice_matches_upsert_batch() {
+        let vectors = array![[1.0, 0.0, 2.0, 0.0], [0.0, 3.0, 0.0, 1.0]];
+        let mut upserted = Corpus::new(4, 0.5);
+        upserted.upsert_batch(&[1, 2], vectors.view()).unwrap();
+
+        let mut spliced = Corpus::new(4, 0.5);
+        let projected = Corpus::project_batch(&spliced.projection(), vectors.view());
+        spliced.splice(&[1, 2], vectors.view(), projected.view()).unwrap();
+
+        let query = vectors.row(0).to_owned();
+        assert_eq!(upserted.query(&query, 0.5), spliced.query(&query, 0.5));
+        assert!(spliced.splice(&[3], vectors.row(0).insert_axis(ndarray::Axis(0)), vectors.view()).is_err());
+    }
+}
@@ -2,13 +2,22 @@
 gRPC Service Implementation for Sublinear Engine
 */
 
-use tonic::{Request, Response, Status};
+use std::collections::HashMap;
+use std::sync::Arc;
+
+use tokio::sync::RwLock;
+use tonic::{Request, Response, Status, Streaming};
 use tracing::{info, warn};
 
+use crate::corpus::Corpus;
+use crate::packed::{self, Encoding};
 use crate::sublinear::{
-    sublinear_similarity, batch_sublinear_similarity, cosine_similarity, JLProjection
+    sublinear_similarity, batch_sublinear_similarity, cached_projection, cosine_similarity, JLProjection
 };
 
+/// Projection distortion for corpora loaded without one
+const DEFAULT_CORPUS_DISTORTION: f64 = 0.5;
+
 // Include generated proto code from OUT_DIR (set by build.rs)
 pub mod sublinear_proto {
     include!(concat!(env!("OUT_DIR"), "/ruvscan.sublinear.rs"));
@@ -20,13 +29,17 @@ use sublinear_proto::{
     CompareRequest, CompareResponse,
     MatrixRequest, MatrixAnalysis,
     SolveRequest, SolveResponse,
-    Vector,
+    CorpusChunk, CorpusInfo, CorpusQueryRequest, CorpusRef, CorpusRemoveRequest,
+    PackedVectors, Vector,
 };
 
-use ndarray::Array1;
+use ndarray::{Array1, Array2};
 
 #[derive(Debug, Default)]
-pub struct SublinearServiceImpl;
+pub struct SublinearServiceImpl {
+    /// Named corpora uploaded with LoadCorpus / UpsertCorpus
+    corpora: Arc<RwLock<HashMap<String, Corpus>>>,
+}
 
 #[tonic::async_trait]
 impl SublinearService for SublinearServiceImpl {
@@ -36,30 +49,33 @@ impl SublinearService for SublinearServiceImpl {
     ) -> Result<Response<SimilarityResponse>, Status> {
         let req = request.into_inner();
 
-        info!("Computing similarity for query against {} vectors", req.corpus.len());
-
         let start_time = std::time::Instant::now();
 
         // Convert query to Array1
-        let query_vec = Array1::from_vec(req.query.unwrap().values);
+        let query_vec = query_vector(req.query, req.packed_query.as_ref())?;
+        let dim = query_vec.len();
 
-        // Convert corpus to Array2
-        let corpus_vecs: Vec<Array1<f64>> = req.corpus
-            .into_iter()
-            .map(|v| Array1::from_vec(v.values))
-            .collect();
+        // Packed corpora decode straight into the corpus matrix
+        let corpus_matrix = match req.packed_corpus.as_ref() {
+            Some(packed_corpus) => decode_packed(packed_corpus)?,
+            None => {
+                let corpus_len = req.corpus.len();
+                let mut corpus_data = Vec::with_capacity(corpus_len * dim);
+                for vec in &req.corpus {
+                    corpus_data.extend_from_slice(&vec.values);
+                }
+                Array2::from_shape_vec((corpus_len, dim), corpus_data)
+                    .map_err(|e| Status::invalid_argument(format!("Matrix creation error: {}", e)))?
+            }
+        };
 
-        // Build corpus matrix
-        let corpus_len = corpus_vecs.len();
-        let dim = query_vec.len();
-        let mut corpus_data = Vec::with_capacity(corpus_len * dim);
-        for vec in corpus_vecs {
-            corpus_data.extend_from_slice(vec.as_slice().unwrap());
+        if corpus_matrix.ncols() != dim {
+            return Err(Status::invalid_argument(format!(
+                "Corpus has dimension {}, query has {}", corpus_matrix.ncols(), dim
+            )));
         }
-        let corpus_matrix = ndarray::Array2::from_shape_vec(
-            (corpus_len, dim),
-            corpus_data
-        ).map_err(|e| Status::internal(format!("Matrix creation error: {}", e)))?;
+
+        info!("Computing similarity for query against {} vectors", corpus_matrix.nrows());
 
         // Compute batch similarity
         let distortion = req.distortion;
@@ -73,6 +89,7 @@ impl SublinearService for SublinearServiceImpl {
             .map(|(idx, score)| SimilarityMatch {
                 index: idx as i32,
                 score,
+                id: idx as i64,
             })
             .collect();
 
@@ -100,8 +117,19 @@ impl SublinearService for SublinearServiceImpl {
         let start_time = std::time::Instant::now();
 
         // Convert vectors
-        let vec_a = Array1::from_vec(req.vec_a.unwrap().values);
-        let vec_b = Array1::from_vec(req.vec_b.unwrap().values);
+        let (vec_a, vec_b) = match req.packed.as_ref() {
+            Some(packed_pair) => {
+                let pair = decode_packed(packed_pair)?;
+                if pair.nrows() != 2 {
+                    return Err(Status::invalid_argument("Packed comparison needs exactly 2 vectors"));
+                }
+                (pair.row(0).to_owned(), pair.row(1).to_owned())
+            }
+            None => (
+                Array1::from_vec(req.vec_a.ok_or_else(|| Status::invalid_argument("vec_a is required"))?.values),
+                Array1::from_vec(req.vec_b.ok_or_else(|| Status::invalid_argument("vec_b is required"))?.values),
+            ),
+        };
 
         // Compute similarity
         let distortion = req.distortion;
@@ -192,6 +220,319 @@ impl SublinearService for SublinearServiceImpl {
             converged: true,
         }))
     }
+
+    async fn load_corpus(
+        &self,
+        request: Request<Streaming<CorpusChunk>>,
+    ) -> Result<Response<CorpusInfo>, Status> {
+        let batch = receive_corpus(request.into_inner()).await?;
+
+        // Build and project off-lock so queries keep using the previous corpus until the swap
+        let mut corpus = Corpus::new(batch.dimension()?, batch.distortion);
+        apply_batch(&mut corpus, &batch)?;
+
+        let info = corpus_info(&batch.name, &corpus);
+        self.corpora.write().await.insert(batch.name, corpus);
+
+        info!("Loaded corpus '{}' with {} vectors of dimension {}", info.name, info.size, info.dimension);
+
+        Ok(Response::new(info))
+    }
+
+    async fn upsert_corpus(
+        &self,
+        request: Request<Streaming<CorpusChunk>>,
+    ) -> Result<Response<CorpusInfo>, Status> {
+        let batch = receive_corpus(request.into_inner()).await?;
+        let dimension = batch.dimension()?;
+        let matrix = batch_matrix(&batch, dimension)?;
+
+        // Project off-lock with the resident corpus' projection (or the one a new corpus will get)
+        let projection = match self.corpora.read().await.get(&batch.name) {
+            Some(corpus) => {
+                check_corpus_dimension(corpus, dimension)?;
+                corpus.projection()
+            }
+            None => cached_projection(dimension, batch.distortion),
+        };
+        let projected = Corpus::project_batch(&projection, matrix);
+
+        // The write lock only covers splicing the projected rows in
+        let mut corpora = self.corpora.write().await;
+        let info = match corpora.get_mut(&batch.name) {
+            Some(corpus) => {
+                splice_batch(corpus, &batch.ids, matrix, &projection, &projected)?;
+                corpus_info(&batch.name, corpus)
+            }
+            None => {
+                // Registered only once its first batch has been applied
+                let mut corpus = Corpus::new(dimension, batch.distortion);
+                splice_batch(&mut corpus, &batch.ids, matrix, &projection, &projected)?;
+                let info = corpus_info(&batch.name, &corpus);
+                corpora.insert(batch.name.clone(), corpus);
+                info
+            }
+        };
+        drop(corpora);
+
+        let upserted = batch.ids.len();
+        info!("Upserted {} vectors into corpus '{}' (size {})", upserted, info.name, info.size);
+
+        Ok(Response::new(info))
+    }
+
+    async fn query_corpus(
+        &self,
+        request: Request<CorpusQueryRequest>,
+    ) -> Result<Response<SimilarityResponse>, Status> {
+        let req = request.into_inner();
+        let query_vec = query_vector(req.query, req.packed_query.as_ref())?;
+
+        let start_time = std::time::Instant::now();
+
+        let corpora = self.corpora.read().await;
+        let corpus = corpora.get(&req.corpus)
+            .ok_or_else(|| Status::not_found(format!("Corpus '{}' is not loaded", req.corpus)))?;
+
+        if query_vec.len() != corpus.dimension {
+            return Err(Status::invalid_argument(format!(
+                "Query has dimension {}, corpus '{}' expects {}",
+                query_vec.len(), req.corpus, corpus.dimension
+            )));
+        }
+
+        info!("Querying corpus '{}' with {} vectors", req.corpus, corpus.len());
+
+        let results = corpus.query(&query_vec, req.distortion);
+
+        let max_results = if req.max_results > 0 { req.max_results as usize } else { results.len() };
+        let matches: Vec<SimilarityMatch> = results
+            .into_iter()
+            .take(max_results)
+            .map(|(idx, score)| SimilarityMatch {
+                index: idx as i32,
+                score,
+                id: corpus.id(idx),
+            })
+            .collect();
+
+        let elapsed = start_time.elapsed();
+
+        info!("Computed {} matches in {:?}", matches.len(), elapsed);
+
+        Ok(Response::new(SimilarityResponse {
+            matches,
+            complexity: format!("O(log {})", corpus.dimension),
+            computation_time_ms: elapsed.as_millis() as f64,
+            dimension_reduction_ratio: 0,
+        }))
+    }
+
+    async fn drop_corpus(
+        &self,
+        request: Request<CorpusRef>,
+    ) -> Result<Response<CorpusInfo>, Status> {
+        let name = request.into_inner().name;
+
+        let corpus = self.corpora.write().await.remove(&name)
+            .ok_or_else(|| Status::not_found(format!("Corpus '{}' is not loaded", name)))?;
+
+        info!("Dropped corpus '{}'", name);
+
+        Ok(Response::new(corpus_info(&name, &corpus)))
+    }
+
+    async fn remove_from_corpus(
+        &self,
+        request: Request<CorpusRemoveRequest>,
+    ) -> Result<Response<CorpusInfo>, Status> {
+        let req = request.into_inner();
+
+        let mut corpora = self.corpora.write().await;
+        let corpus = corpora.get_mut(&req.corpus)
+            .ok_or_else(|| Status::not_found(format!("Corpus '{}' is not loaded", req.corpus)))?;
+        let removed = corpus.remove(&req.ids);
+        let info = corpus_info(&req.corpus, corpus);
+        drop(corpora);
+
+        info!("Removed {} vectors from corpus '{}' (size {})", removed, info.name, info.size);
+
+        Ok(Response::new(info))
+    }
+}
+
+// Vector decoding helpers
+fn decode_packed(packed_vectors: &PackedVectors) -> Result<Array2<f64>, Status> {
+    let encoding = Encoding::from_proto(packed_vectors.encoding)
+        .map_err(|e| Status::invalid_argument(e.to_string()))?;
+
+    packed::decode_matrix(
+        encoding,
+        packed_vectors.dimension.max(0) as usize,
+        packed_vectors.count.max(0) as usize,
+        &packed_vectors.data,
+    )
+    .map_err(|e| Status::invalid_argument(e.to_string()))
+}
+
+fn query_vector(query: Option<Vector>, packed_query: Option<&PackedVectors>) -> Result<Array1<f64>, Status> {
+    if let Some(packed_query) = packed_query {
+        let matrix = decode_packed(packed_query)?;
+        if matrix.nrows() != 1 {
+            return Err(Status::invalid_argument("Packed query must contain exactly 1 vector"));
+        }
+        let dimension = matrix.ncols();
+        return matrix
+            .into_shape(dimension)
+            .map_err(|e| Status::internal(format!("Query reshape error: {}", e)));
+    }
+
+    query
+        .map(|vector| Array1::from_vec(vector.values))
+        .ok_or_else(|| Status::invalid_argument("Query vector is required"))
+}
+
+// Corpus helpers
+
+/// Vectors received from a LoadCorpus / UpsertCorpus stream, row-major
+struct CorpusBatch {
+    name: String,
+    distortion: f64,
+    dimension: Option<usize>,
+    ids: Vec<i64>,
+    data: Vec<f64>,
+}
+
+impl CorpusBatch {
+    fn dimension(&self) -> Result<usize, Status> {
+        self.dimension
+            .filter(|&dimension| dimension > 0)
+            .ok_or_else(|| Status::invalid_argument("Corpus must start with a non-empty vector"))
+    }
+
+    fn check_dimension(&mut self, id: i64, dimension: usize) -> Result<(), Status> {
+        match self.dimension {
+            None => {
+                self.dimension = Some(dimension);
+                Ok(())
+            }
+            Some(expected) if expected == dimension => Ok(()),
+            Some(expected) => Err(Status::invalid_argument(format!(
+                "vector {} has dimension {}, corpus expects {}", id, dimension, expected
+            ))),
+        }
+    }
+}
+
+async fn receive_corpus(mut stream: Streaming<CorpusChunk>) -> Result<CorpusBatch, Status> {
+    let mut batch = CorpusBatch {
+        name: String::new(),
+        distortion: 0.0,
+        dimension: None,
+        ids: Vec::new(),
+        data: Vec::new(),
+    };
+
+    while let Some(chunk) = stream.message().await? {
+        if batch.name.is_empty() {
+            batch.name = chunk.name;
+            batch.distortion = chunk.distortion;
+        }
+
+        for item in chunk.vectors {
+            let vector = item.vector
+                .ok_or_else(|| Status::invalid_argument(format!("Vector {} has no values", item.id)))?;
+            batch.check_dimension(item.id, vector.values.len())?;
+            batch.ids.push(item.id);
+            batch.data.extend_from_slice(&vector.values);
+        }
+
+        if let Some(packed_vectors) = chunk.packed {
+            let encoding = Encoding::from_proto(packed_vectors.encoding)
+                .map_err(|e| Status::invalid_argument(e.to_string()))?;
+            let dimension = packed_vectors.dimension.max(0) as usize;
+            let count = packed_vectors.count.max(0) as usize;
+
+            packed::validate(encoding, dimension, count, &packed_vectors.data)
+                .map_err(|e| Status::invalid_argument(e.to_string()))?;
+            if chunk.ids.len() != count {
+                return Err(Status::invalid_argument(format!(
+                    "Packed chunk has {} ids for {} vectors", chunk.ids.len(), count
+                )));
+            }
+            if let Some(&first_id) = chunk.ids.first() {
+                batch.check_dimension(first_id, dimension)?;
+            }
+
+            // Decode in place at the end of the staging buffer
+            let start = batch.data.len();
+            batch.data.resize(start + count * dimension, 0.0);
+            packed::decode_into(encoding, &packed_vectors.data, &mut batch.data[start..]);
+            batch.ids.extend_from_slice(&chunk.ids);
+        }
+    }
+
+    if batch.name.is_empty() {
+        return Err(Status::invalid_argument("Corpus name is required"));
+    }
+    if batch.distortion <= 0.0 {
+        batch.distortion = DEFAULT_CORPUS_DISTORTION;
+    }
+
+    Ok(batch)
+}
+
+fn batch_matrix(batch: &CorpusBatch, dimension: usize) -> Result<ndarray::ArrayView2<'_, f64>, Status> {
+    ndarray::ArrayView2::from_shape((batch.ids.len(), dimension), &batch.data)
+        .map_err(|e| Status::internal(format!("Matrix creation error: {}", e)))
+}
+
+fn check_corpus_dimension(corpus: &Corpus, dimension: usize) -> Result<(), Status> {
+    if dimension != corpus.dimension {
+        return Err(Status::invalid_argument(format!(
+            "Vectors have dimension {}, corpus expects {}", dimension, corpus.dimension
+        )));
+    }
+    Ok(())
+}
+
+fn apply_batch(corpus: &mut Corpus, batch: &CorpusBatch) -> Result<(), Status> {
+    let dimension = batch.dimension()?;
+    check_corpus_dimension(corpus, dimension)?;
+    let matrix = batch_matrix(batch, dimension)?;
+
+    // Projected once here, not per query
+    corpus.upsert_batch(&batch.ids, matrix)
+        .map_err(|e| Status::invalid_argument(e.to_string()))
+}
+
+/// Splice rows projected outside the lock into `corpus`
+///
+/// If the corpus was replaced with a different projection while the batch
+/// was being projected, the rows are re-projected against the new one.
+fn splice_batch(
+    corpus: &mut Corpus,
+    ids: &[i64],
+    matrix: ndarray::ArrayView2<f64>,
+    projection: &Arc<JLProjection>,
+    projected: &Array2<f64>,
+) -> Result<(), Status> {
+    check_corpus_dimension(corpus, matrix.ncols())?;
+
+    let result = if Arc::ptr_eq(&corpus.projection(), projection) {
+        corpus.splice(ids, matrix, projected.view())
+    } else {
+        corpus.upsert_batch(ids, matrix)
+    };
+    result.map_err(|e| Status::invalid_argument(e.to_string()))
+}
+
+fn corpus_info(name: &str, corpus: &Corpus) -> CorpusInfo {
+    CorpusInfo {
+        name: name.to_string(),
+        size: corpus.len() as i32,
+        dimension: corpus.dimension as i32,
+    }
 }
 
 // Helper functions
@@ -4,10 +4,15 @@
 //! computation using Johnson-Lindenstrauss projection.
 
 pub mod sublinear;
+pub mod corpus;
+pub mod packed;
 pub mod grpc_service;
 
 // Re-export main types for convenience
-pub use sublinear::{JLProjection, batch_sublinear_similarity, sublinear_similarity, cosine_similarity};
+pub use sublinear::{
+    JLProjection, batch_sublinear_similarity, cached_projection, sublinear_similarity, cosine_similarity
+};
+pub use corpus::Corpus;
 pub use grpc_service::SublinearServiceImpl;
 
 /// Library version
@@ -10,6 +10,8 @@ use std::net::SocketAddr;
 use std::io::Write;
 
 mod sublinear;
+mod corpus;
+mod packed;
 mod grpc_service;
 
 use grpc_service::sublinear_proto::sublinear_service_server::SublinearServiceServer;
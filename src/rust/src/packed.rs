@@ -0,0 +1,152 @@
+/*!
+Packed vector decoding
+Raw little-endian float32 / float16 buffers from the `PackedVectors` message
+*/
+
+use ndarray::Array2;
+use thiserror::Error;
+
+/// Element encoding of a packed buffer (mirrors `PackedVectors.Encoding`)
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum Encoding {
+    Float32,
+    Float16,
+}
+
+impl Encoding {
+    /// Map the proto enum value
+    pub fn from_proto(value: i32) -> Result<Self, PackedError> {
+        match value {
+            0 => Ok(Encoding::Float32),
+            1 => Ok(Encoding::Float16),
+            other => Err(PackedError::UnknownEncoding(other)),
+        }
+    }
+
+    /// Bytes per element
+    pub fn width(self) -> usize {
+        match self {
+            Encoding::Float32 => 4,
+            Encoding::Float16 => 2,
+        }
+    }
+}
+
+/// Errors raised while decoding a packed buffer
+#[derive(Debug, Error)]
+pub enum PackedError {
+    #[error("unknown vector encoding {0}")]
+    UnknownEncoding(i32),
+    #[error("packed data has {got} bytes, expected {expected} for {count} x {dimension} vectors")]
+    Length { got: usize, expected: usize, count: usize, dimension: usize },
+}
+
+/// Check a buffer holds exactly `count` vectors of `dimension` elements
+pub fn validate(encoding: Encoding, dimension: usize, count: usize, data: &[u8]) -> Result<(), PackedError> {
+    let expected = dimension * count * encoding.width();
+    if data.len() != expected {
+        return Err(PackedError::Length { got: data.len(), expected, count, dimension });
+    }
+    Ok(())
+}
+
+/// Decode elements straight into `out`, which must hold `data.len() / width` values
+pub fn decode_into(encoding: Encoding, data: &[u8], out: &mut [f64]) {
+    match encoding {
+        Encoding::Float32 => {
+            for (dst, src) in out.iter_mut().zip(data.chunks_exact(4)) {
+                *dst = f32::from_le_bytes([src[0], src[1], src[2], src[3]]) as f64;
+            }
+        }
+        Encoding::Float16 => {
+            for (dst, src) in out.iter_mut().zip(data.chunks_exact(2)) {
+                *dst = f16_to_f32(u16::from_le_bytes([src[0], src[1]])) as f64;
+            }
+        }
+    }
+}
+
+/// Decode a packed buffer into a (count x dimension) matrix
+///
+/// The matrix is the only allocation; elements are converted in place
+/// without intermediate per-vector buffers.
+pub fn decode_matrix(
+    encoding: Encoding,
+    dimension: usize,
+    count: usize,
+    data: &[u8],
+) -> Result<Array2<f64>, PackedError> {
+    validate(encoding, dimension, count, data)?;
+
+    let mut matrix = Array2::<f64>::zeros((count, dimension));
+    decode_into(
+        encoding,
+        data,
+        matrix.as_slice_mut().expect("freshly allocated matrix is contiguous"),
+    );
+
+    Ok(matrix)
+}
+
+/// IEEE 754 binary16 to binary32
+fn f16_to_f32(bits: u16) -> f32 {
+    let sign = ((bits >> 15) as u32) << 31;
+    let exponent = ((bits >> 10) & 0x1f) as u32;
+    let mantissa = (bits & 0x3ff) as u32;
+
+    let bits32 = match exponent {
+        0 if mantissa == 0 => sign,
+        0 => {
+            // Subnormal: renormalize the mantissa
+            let mut exponent32: u32 = 127 - 15 + 1;
+            let mut mantissa = mantissa;
+            while mantissa & 0x400 == 0 {
+                mantissa <<= 1;
+                exponent32 -= 1;
+            }
+            sign | (exponent32 << 23) | ((mantissa & 0x3ff) << 13)
+        }
+        0x1f => sign | 0x7f80_0000 | (mantissa << 13),
+        _ => sign | ((exponent + 127 - 15) << 23) | (mantissa << 13),
+    };
+
+    f32::from_bits(bits32)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_decode_float32() {
+        let values = [1.5f32, -2.0, 0.25, 8.0];
+        let data: Vec<u8> = values.iter().flat_map(|v| v.to_le_bytes()).collect();
+
+        let matrix = decode_matrix(Encoding::Float32, 2, 2, &data).unwrap();
+
+        assert_eq!(matrix[[0, 0]], 1.5);
+        assert_eq!(matrix[[1, 1]], 8.0);
+    }
+
+    #[test]
+    fn test_decode_float16() {
+        // 1.0, -2.0, 0.5, 65504 (max), 2^-24 (min subnormal), +inf
+        let halves: [u16; 6] = [0x3c00, 0xc000, 0x3800, 0x7bff, 0x0001, 0x7c00];
+        let data: Vec<u8> = halves.iter().flat_map(|v| v.to_le_bytes()).collect();
+
+        let matrix = decode_matrix(Encoding::Float16, 6, 1, &data).unwrap();
+
+        assert_eq!(matrix[[0, 0]], 1.0);
+        assert_eq!(matrix[[0, 1]], -2.0);
+        assert_eq!(matrix[[0, 2]], 0.5);
+        assert_eq!(matrix[[0, 3]], 65504.0);
+        assert_eq!(matrix[[0, 4]], 2f64.powi(-24));
+        assert!(matrix[[0, 5]].is_infinite());
+    }
+
+    #[test]
+    fn test_length_mismatch() {
+        assert!(decode_matrix(Encoding::Float32, 3, 2, &[0u8; 20]).is_err());
+        assert!(Encoding::from_proto(7).is_err());
+    }
+}
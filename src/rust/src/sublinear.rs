@@ -3,10 +3,23 @@ Sublinear algorithms for TRUE O(log n) complexity
 Implements Johnson-Lindenstrauss dimension reduction
 */
 
-use ndarray::{Array1, Array2};
-use rand::Rng;
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex, OnceLock};
+
+use ndarray::{Array1, Array2, ArrayView2, Axis};
+use ndarray::linalg::general_mat_mul;
+use ndarray::parallel::prelude::*;
+use rand::SeedableRng;
+use rand_chacha::ChaCha8Rng;
 use rand_distr::{Distribution, Normal};
 
+/// Base seed for projection matrices; mixed with (dimension, distortion)
+/// so every process derives the same matrix for the same parameters
+pub const PROJECTION_SEED: u64 = 0x5275_7653_6361_6e00;
+
+/// Rows per block when projecting a corpus in parallel
+const PROJECTION_BLOCK_ROWS: usize = 1024;
+
 /// Johnson-Lindenstrauss dimension reduction
 /// Projects n-dimensional vectors to O(log n) dimensions
 pub struct JLProjection {
@@ -18,16 +31,24 @@ pub struct JLProjection {
 impl JLProjection {
     /// Create new JL projection
     ///
+    /// The matrix is seeded from (`source_dimension`, `distortion`), so the
+    /// same parameters always yield the same projection.
+    ///
     /// # Arguments
     /// * `source_dimension` - Original dimension n
     /// * `distortion` - Allowed distortion ε (0 < ε < 1)
     pub fn new(source_dimension: usize, distortion: f64) -> Self {
+        Self::with_seed(source_dimension, distortion, projection_seed(source_dimension, distortion))
+    }
+
+    /// Create JL projection from an explicit seed
+    pub fn with_seed(source_dimension: usize, distortion: f64, seed: u64) -> Self {
         // JL lemma: target dimension k = O(log n / ε²)
         let target_dimension = ((source_dimension as f64).ln() / (distortion * distortion)).ceil() as usize;
         let target_dimension = target_dimension.max(4); // Minimum 4 dimensions
 
-        // Create random Gaussian projection matrix
-        let mut rng = rand::thread_rng();
+        // Create seeded Gaussian projection matrix
+        let mut rng = ChaCha8Rng::seed_from_u64(seed);
         let normal = Normal::new(0.0, 1.0).unwrap();
 
         let projection_matrix = Array2::from_shape_fn(
@@ -51,6 +72,67 @@ impl JLProjection {
     pub fn project_batch(&self, vectors: &Array2<f64>) -> Array2<f64> {
         self.projection_matrix.dot(vectors)
     }
+
+    /// Project row vectors (n x d) to (n x k) with one GEMM per row block,
+    /// blocks running in parallel
+    pub fn project_rows(&self, rows: ArrayView2<f64>) -> Array2<f64> {
+        let projection_t = self.projection_matrix.t();
+        let mut projected = Array2::<f64>::zeros((rows.nrows(), self.target_dimension));
+
+        projected
+            .axis_chunks_iter_mut(Axis(0), PROJECTION_BLOCK_ROWS)
+            .into_par_iter()
+            .zip(rows.axis_chunks_iter(Axis(0), PROJECTION_BLOCK_ROWS).into_par_iter())
+            .for_each(|(mut out, block)| {
+                general_mat_mul(1.0, &block, &projection_t, 0.0, &mut out);
+            });
+
+        projected
+    }
+}
+
+fn projection_seed(source_dimension: usize, distortion: f64) -> u64 {
+    PROJECTION_SEED ^ (source_dimension as u64).rotate_left(32) ^ distortion.to_bits()
+}
+
+static PROJECTIONS: OnceLock<Mutex<HashMap<(usize, u64), Arc<JLProjection>>>> = OnceLock::new();
+
+/// Shared projection for (`source_dimension`, `distortion`), built on first use
+pub fn cached_projection(source_dimension: usize, distortion: f64) -> Arc<JLProjection> {
+    let cache = PROJECTIONS.get_or_init(|| Mutex::new(HashMap::new()));
+    let mut cache = cache.lock().unwrap();
+
+    cache
+        .entry((source_dimension, distortion.to_bits()))
+        .or_insert_with(|| Arc::new(JLProjection::new(source_dimension, distortion)))
+        .clone()
+}
+
+/// Scale rows to unit length in place; zero rows stay zero
+pub fn normalize_rows(matrix: &mut Array2<f64>) {
+    matrix
+        .axis_iter_mut(Axis(0))
+        .into_par_iter()
+        .for_each(|mut row| {
+            let norm = row.dot(&row).sqrt();
+            if norm > 0.0 {
+                row /= norm;
+            }
+        });
+}
+
+/// Rank pre-normalized projected rows against a projected query
+pub fn rank_projected(projected_query: &Array1<f64>, projected_corpus: ArrayView2<f64>) -> Vec<(usize, f64)> {
+    let norm = projected_query.dot(projected_query).sqrt();
+    if norm == 0.0 {
+        return (0..projected_corpus.nrows()).map(|idx| (idx, 0.0)).collect();
+    }
+
+    let scores = projected_corpus.dot(projected_query) / norm;
+
+    let mut similarities: Vec<(usize, f64)> = scores.iter().copied().enumerate().collect();
+    similarities.sort_by(|a, b| b.1.total_cmp(&a.1));
+    similarities
 }
 
 /// Compute cosine similarity between two vectors
@@ -74,8 +156,8 @@ pub fn sublinear_similarity(
 ) -> (f64, String) {
     let source_dim = vec_a.len();
 
-    // Create JL projection
-    let jl = JLProjection::new(source_dim, distortion);
+    // Reuse the cached JL projection
+    let jl = cached_projection(source_dim, distortion);
 
     // Project vectors
     let proj_a = jl.project(vec_a);
@@ -90,6 +172,9 @@ pub fn sublinear_similarity(
 }
 
 /// Batch similarity computation for multiple vectors
+///
+/// Callers that query the same corpus repeatedly should keep it projected
+/// (see `corpus::Corpus`) instead of paying the corpus projection per call.
 pub fn batch_sublinear_similarity(
     query: &Array1<f64>,
     corpus: &Array2<f64>,
@@ -97,27 +182,15 @@ pub fn batch_sublinear_similarity(
 ) -> Vec<(usize, f64)> {
     let source_dim = query.len();
 
-    // Create JL projection
-    let jl = JLProjection::new(source_dim, distortion);
+    // Reuse the cached JL projection
+    let jl = cached_projection(source_dim, distortion);
 
-    // Project query and corpus
+    // Project query, then the whole corpus in one parallel GEMM
     let proj_query = jl.project(query);
+    let mut proj_corpus = jl.project_rows(corpus.view());
+    normalize_rows(&mut proj_corpus);
 
-    // Compute similarities
-    let mut similarities: Vec<(usize, f64)> = corpus
-        .axis_iter(ndarray::Axis(0))
-        .enumerate()
-        .map(|(idx, vec)| {
-            let proj_vec = jl.project(&vec.to_owned());
-            let sim = cosine_similarity(&proj_query, &proj_vec);
-            (idx, sim)
-        })
-        .collect();
-
-    // Sort by similarity descending
-    similarities.sort_by(|a, b| b.1.partial_cmp(&a.1).unwrap());
-
-    similarities
+    rank_projected(&proj_query, proj_corpus.view())
 }
 
 #[cfg(test)]
@@ -145,6 +218,47 @@ mod tests {
         assert!((sim - 1.0).abs() < 1e-10); // Should be 1.0
     }
 
+    #[test]
+    fn test_projection_is_deterministic() {
+        let a = JLProjection::new(64, 0.5);
+        let b = JLProjection::new(64, 0.5);
+        assert_eq!(a.projection_matrix, b.projection_matrix);
+
+        let cached = cached_projection(64, 0.5);
+        assert!(Arc::ptr_eq(&cached, &cached_projection(64, 0.5)));
+    }
+
+    #[test]
+    fn test_project_rows_matches_per_row() {
+        let jl = JLProjection::new(50, 0.5);
+        let rows = Array2::from_shape_fn((3000, 50), |(i, j)| ((i * 7 + j) % 13) as f64 - 6.0);
+
+        let projected = jl.project_rows(rows.view());
+
+        for idx in [0, 1023, 1024, 2999] {
+            let expected = jl.project(&rows.row(idx).to_owned());
+            for (a, b) in projected.row(idx).iter().zip(expected.iter()) {
+                assert!((a - b).abs() < 1e-9);
+            }
+        }
+    }
+
+    #[test]
+    fn test_batch_similarity_is_deterministic() {
+        let query = array![1.0, 0.5, 0.0, 2.0, 1.0, 0.0];
+        let corpus = array![
+            [1.0, 0.5, 0.0, 2.0, 1.0, 0.0],
+            [0.0, 1.0, 3.0, 0.0, 0.0, 1.0],
+            [2.0, 1.0, 0.0, 4.0, 2.0, 0.1]
+        ];
+
+        let first = batch_sublinear_similarity(&query, &corpus, 0.5);
+        let second = batch_sublinear_similarity(&query, &corpus, 0.5);
+
+        assert_eq!(first, second);
+        assert!((first[0].1 - 1.0).abs() < 1e-9);
+    }
+
     #[test]
     fn test_sublinear_similarity() {
         let a = array![1.0, 2.0, 3.0, 4.0, 5.0];
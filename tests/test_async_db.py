@@ -0,0 +1,58 @@
+"""
+Tests for the async database facade
+"""
+
+import asyncio
+import threading
+import pytest
+import pytest_asyncio
+from src.mcp.storage.db import RuvScanDB
+from src.mcp.storage.async_db import AsyncRuvScanDB
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """Async facade over a file-backed database"""
+    database = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    yield database
+    await database.close()
+
+@pytest.mark.asyncio
+async def test_same_surface_as_sync_db(db):
+    """Sync methods are awaitable with unchanged signatures"""
+    repo_id = await db.add_repo({"name": "a", "org": "o", "full_name": "o/a"})
+    await db.add_leverage_card({"repo_id": repo_id, "summary": "s", "reasoning": "r", "relevance_score": 0.8})
+    await db.add_fact_cache("prompt", "response", {"k": 1})
+
+    assert (await db.get_repo("o/a"))["id"] == repo_id
+    assert len(await db.get_leverage_cards(min_score=0.5)) == 1
+    assert (await db.get_fact_cache("prompt"))["metadata"] == {"k": 1}
+
+    with pytest.raises(AttributeError):
+        db._reader
+
+@pytest.mark.asyncio
+async def test_batched_lookups(db):
+    """Multi-key lookups return hits only / results aligned with the input"""
+    await db.add_repos_bulk([{"name": n, "org": "o", "full_name": f"o/{n}"} for n in "abc"])
+    await db.add_fact_cache("p1", "r1")
+
+    repos = await db.get_repos(["o/a", "o/c", "o/missing"])
+    assert sorted(repos) == ["o/a", "o/c"]
+
+    facts = await db.get_fact_cache_many(["p1", "nope", "p1"])
+    assert [f and f["response"] for f in facts] == ["r1", None, "r1"]
+
+@pytest.mark.asyncio
+async def test_slow_call_does_not_block_loop(db):
+    """A blocked database call leaves the event loop free"""
+    release = threading.Event()
+    slow = asyncio.ensure_future(db.run(release.wait, 5))
+
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.001)
+        ticks += 1
+
+    assert ticks == 5 and not slow.done()
+    release.set()
+    assert await slow
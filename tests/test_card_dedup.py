@@ -0,0 +1,118 @@
+"""
+Tests for leverage card dedup by (repo, intent)
+"""
+
+import sqlite3
+import pytest
+from src.mcp.storage.db import RuvScanDB, intent_hash
+from src.mcp.storage.async_db import AsyncRuvScanDB
+
+def make_card(repo_id: int, score: float, intent: str = "find a cache", summary: str = "s") -> dict:
+    return {
+        "repo_id": repo_id,
+        "summary": summary,
+        "reasoning": "r",
+        "relevance_score": score,
+        "query_intent": intent
+    }
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with one repo"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    database.add_repo({"name": "a", "org": "o", "full_name": "o/a"})
+    yield database
+    database.close()
+
+def test_intent_hash_normalizes():
+    """Case and whitespace do not change the key"""
+    assert intent_hash("Find a  cache ") == intent_hash("find a cache")
+    assert intent_hash(None) == intent_hash("")
+    assert intent_hash("find a cache") != intent_hash("find a queue")
+
+def test_repeated_intent_keeps_one_card(db):
+    """Traffic on one intent leaves one card, the best scoring one"""
+    repo_id = db.get_repo("o/a")["id"]
+    first = db.add_leverage_card(make_card(repo_id, 0.7, summary="first"))
+    db.add_cards_bulk([make_card(repo_id, 0.5, "FIND a cache", summary="worse")] * 10)
+    best = db.add_leverage_card(make_card(repo_id, 0.9, summary="best"))
+    kept = db.add_leverage_card(make_card(repo_id, 0.6, summary="ignored"))
+
+    cards = db.get_leverage_cards(limit=100)
+    assert first == best == kept
+    assert [(c["summary"], c["relevance_score"]) for c in cards] == [("best", 0.9)]
+
+    db.add_leverage_card(make_card(repo_id, 0.2, summary="latest"), keep="latest")
+    assert [c["summary"] for c in db.get_leverage_cards(limit=100)] == ["latest"]
+
+    db.add_leverage_card(make_card(repo_id, 0.4, "other intent"))
+    assert len(db.get_leverage_cards(limit=100)) == 2
+
+    with pytest.raises(ValueError):
+        db.add_leverage_card(make_card(repo_id, 0.4), keep="oldest")
+
+def test_explicit_id_claims_intent(db):
+    """Editing a card onto an intent another card holds replaces that card"""
+    repo_id = db.get_repo("o/a")["id"]
+    cache = db.add_leverage_card(make_card(repo_id, 0.9, "find a cache"))
+    queue = db.add_leverage_card(make_card(repo_id, 0.5, "find a queue"))
+
+    edited = db.add_leverage_card({**make_card(repo_id, 0.6, "Find a cache", summary="edited"), "id": queue})
+    assert edited == queue
+    assert [(c["id"], c["summary"]) for c in db.get_leverage_cards(limit=100)] == [(queue, "edited")]
+
+    db.add_cards_bulk([{**make_card(repo_id, 0.3, "find a queue"), "id": cache}])
+    cards = db.get_leverage_cards(limit=100)
+    assert sorted(c["id"] for c in cards) == sorted([cache, queue])
+    assert {c["id"]: c["query_intent"] for c in cards}[cache] == "find a queue"
+
+@pytest.mark.asyncio
+async def test_legacy_duplicates_are_compacted(tmp_path):
+    """Duplicates from before the key are removed in the background, then upserts resume"""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE repos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, org TEXT NOT NULL, full_name TEXT UNIQUE NOT NULL,
+            description TEXT, topics TEXT, readme TEXT, embedding BLOB,
+            sublinear_hash TEXT, stars INTEGER DEFAULT 0, language TEXT,
+            last_scan TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE leverage_cards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, repo_id INTEGER NOT NULL,
+            capabilities TEXT NOT NULL, summary TEXT NOT NULL, reasoning TEXT NOT NULL,
+            integration_hint TEXT, relevance_score REAL NOT NULL, runtime_complexity TEXT,
+            query_intent TEXT, cached BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("INSERT INTO repos (name, org, full_name) VALUES ('a', 'o', 'o/a')")
+    conn.executemany(
+        "INSERT INTO leverage_cards (repo_id, capabilities, summary, reasoning, relevance_score, query_intent) "
+        "VALUES (1, '[]', ?, 'r', ?, ?)",
+        [(f"card {i}", i / 10, f"intent {i % 3}") for i in range(9)]
+    )
+    conn.commit()
+    conn.close()
+
+    database = RuvScanDB(path)
+    assert len(database.get_leverage_cards(limit=100)) == 9
+
+    # Writes still append until compaction finishes
+    database.add_leverage_card(make_card(1, 0.1, "intent 0"))
+    assert len(database.get_leverage_cards(limit=100)) == 10
+
+    async_db = AsyncRuvScanDB(database)
+    assert await async_db.compact_leverage_cards(batch_size=1) == 7
+
+    cards = database.get_leverage_cards(limit=100)
+    assert sorted(c["summary"] for c in cards) == ["card 6", "card 7", "card 8"]
+
+    database.add_leverage_card(make_card(1, 0.1, "Intent 2"))
+    assert len(database.get_leverage_cards(limit=100)) == 3
+    assert database.compact_leverage_cards_step() == (0, True)
+    await async_db.close()
@@ -0,0 +1,94 @@
+"""
+Tests for keyset pagination of leverage cards
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from src.mcp import server
+from src.mcp.storage.db import RuvScanDB
+from src.mcp.storage.async_db import AsyncRuvScanDB
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with 57 cards over three repos, with many tied scores"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    ids = database.add_repos_bulk([
+        {"name": n, "org": "o", "full_name": f"o/{n}"} for n in ("a", "b", "c")
+    ])
+    database.add_cards_bulk([
+        {
+            "repo_id": ids[i % 3],
+            "summary": f"card {i}",
+            "reasoning": "r",
+            "relevance_score": round(0.5 + (i % 5) / 10, 1),
+            "query_intent": f"intent {i // 3}"
+        }
+        for i in range(57)
+    ])
+    yield database
+    database.close()
+
+def walk(db, **filters):
+    cards, cursor = db.get_leverage_cards_page(limit=10, **filters)
+    pages = [cards]
+    while cursor:
+        cards, cursor = db.get_leverage_cards_page(limit=10, cursor=cursor, **filters)
+        pages.append(cards)
+    return pages
+
+def test_pages_cover_every_card_once_in_order(db):
+    """Walking the cursor visits each card exactly once in listing order"""
+    pages = walk(db)
+    seen = [card["id"] for page in pages for card in page]
+
+    assert [len(page) for page in pages] == [10] * 5 + [7]
+    assert seen == [card["id"] for card in db.get_leverage_cards(limit=100)]
+    assert len(set(seen)) == 57
+
+def test_filters_are_pushed_into_sql(db):
+    """Repo, intent and score filters apply across pages"""
+    cards = [card for page in walk(db, repo="o/a", min_score=0.6) for card in page]
+
+    assert cards
+    assert all(card["repo"] == "o/a" for card in cards)
+    assert all(card["relevance_score"] >= 0.6 for card in cards)
+
+    # Intents match after normalization
+    cards = [card for page in walk(db, query_intent="  INTENT   4") for card in page]
+    assert {card["repo"] for card in cards} == {"o/a", "o/b", "o/c"}
+    assert all(card["query_intent"] == "intent 4" for card in cards)
+    assert db.get_leverage_cards_page(repo="o/missing") == ([], None)
+
+def test_deep_pages_use_the_index(db):
+    """The page query is an index range scan without a sort step"""
+    plan = " ".join(
+        row[3] for row in db.conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT lc.* FROM leverage_cards lc JOIN repos r ON lc.repo_id = r.id
+            WHERE lc.relevance_score >= 0 AND (lc.relevance_score, lc.created_at, lc.id) < (0.9, 'z', 99)
+            ORDER BY lc.relevance_score DESC, lc.created_at DESC, lc.id DESC LIMIT 11
+        """)
+    )
+    assert "idx_cards_page" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_invalid_cursor(db):
+    """Garbage cursors are rejected"""
+    with pytest.raises(ValueError):
+        db.get_leverage_cards_page(cursor="not-a-cursor")
+
+def test_cards_endpoint_pages(db, monkeypatch):
+    """/cards returns next_cursor, the filtered total, and 400/422 for bad input"""
+    monkeypatch.setattr(server, "repo_db", AsyncRuvScanDB(db))
+    client = TestClient(server.app)
+
+    first = client.get("/cards", params={"limit": 20}).json()
+    second = client.get("/cards", params={"limit": 20, "cursor": first["next_cursor"]}).json()
+
+    assert len(first["cards"]) == 20 and len(second["cards"]) == 20
+    assert first["total"] == second["total"] == 57
+    assert client.get("/cards", params={"repo": "o/a"}).json()["total"] == 19
+    assert not {c["id"] for c in first["cards"]} & {c["id"] for c in second["cards"]}
+    assert client.get("/cards", params={"cursor": "bad"}).status_code == 400
+    assert client.get("/cards", params={"limit": -1}).status_code == 422
+    assert client.get("/cards", params={"limit": 501}).status_code == 422
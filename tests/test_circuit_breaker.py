@@ -0,0 +1,112 @@
+"""
+Tests for the circuit breaker guarding the Rust engine
+"""
+
+import pytest
+from src.mcp.bindings.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    """Clock the breaker reads instead of time.monotonic"""
+    return FakeClock()
+
+@pytest.fixture
+def breaker(clock):
+    """Breaker that opens after 3 failures and probes after 5 s"""
+    return CircuitBreaker("test", failure_threshold=3, slow_call_ms=100, reset_timeout=5.0, clock=clock)
+
+def test_opens_after_consecutive_failures(breaker):
+    """Failures below the threshold keep the circuit closed"""
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.metrics()["rejected"] == 1
+
+def test_success_resets_failure_count(breaker):
+    """Only consecutive failures count towards opening"""
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(5.0)
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+def test_slow_calls_count_as_failures(breaker):
+    """Calls over slow_call_ms trip the breaker like errors"""
+    for _ in range(3):
+        breaker.record_success(250.0)
+
+    assert breaker.state == OPEN
+    assert breaker.metrics()["slow_calls"] == 3
+
+def test_half_open_probe_recovers(breaker, clock):
+    """After reset_timeout one probe is let through and a success closes the circuit"""
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 5.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success(10.0)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+def test_half_open_failure_reopens(breaker, clock):
+    """A failed probe re-opens the circuit for another reset_timeout"""
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 5.0
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.metrics()["times_opened"] == 2
+    clock.now = 9.0
+    assert breaker.state == OPEN
+
+def test_late_success_does_not_close_open_circuit(breaker, clock):
+    """A call admitted before the circuit opened cannot close it on success"""
+    for _ in range(3):
+        breaker.record_failure()
+
+    breaker.record_success(10.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.metrics()["successes"] == 1
+
+    clock.now = 5.0
+    assert breaker.allow_request()
+    breaker.record_success(10.0)
+    assert breaker.state == CLOSED
+
+def test_query_client_uses_breaker_config():
+    """The /query engine client is built from the rust_engine config section"""
+    from src.mcp.endpoints.query import create_rust_client
+
+    client = create_rust_client({"rust_engine": {
+        "port": 50052,
+        "fallback_timeout": 1,
+        "circuit_breaker": {"failure_threshold": 2, "slow_call_ms": 250, "reset_timeout": 3, "half_open_max_calls": 2}
+    }})
+
+    assert client.port == 50052
+    assert client.fallback_timeout == 1
+    assert (client.breaker.failure_threshold, client.breaker.slow_call_ms) == (2, 250)
+    assert (client.breaker.reset_timeout, client.breaker.half_open_max_calls) == (3, 2)
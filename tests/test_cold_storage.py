@@ -0,0 +1,79 @@
+"""
+Tests for the hot/cold repo split and compressed README storage
+"""
+
+import sqlite3
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB, compress_text, decompress_text
+
+README = "## Install\n\npip install tool\n\n" + "Usage notes for the vector search tool. " * 400
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with one repo carrying a long README"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    database.add_repo({
+        "name": "tool", "org": "o", "full_name": "o/tool",
+        "readme": README, "embedding": np.arange(8, dtype=np.float32)
+    })
+    yield database
+    database.close()
+
+def test_codec_roundtrip():
+    """Compressed text decodes to the original"""
+    codec, payload = compress_text(README)
+    assert decompress_text(codec, payload) == README
+    assert len(payload) * 5 < len(README)
+
+def test_metadata_reads_skip_cold_columns(db):
+    """get_repo returns the narrow row; README and embedding load on request"""
+    repo = db.get_repo("o/tool")
+    assert "readme" not in repo and "embedding" not in repo
+
+    full = db.get_repo("o/tool", include_readme=True, include_embedding=True)
+    assert full["readme"] == README
+    assert np.array_equal(full["embedding"], np.arange(8))
+    assert db.get_readmes([repo["id"], 999]) == {repo["id"]: README}
+
+    columns = {row[1] for row in db.conn.execute("PRAGMA table_info(repos)")}
+    assert not {"readme", "embedding"} & columns
+
+def test_readme_is_compressed_and_replaced(db):
+    """READMEs are stored compressed; re-ingesting without one removes it"""
+    storage = db.get_readme_storage()
+    assert storage["readmes"] == 1
+    assert storage["stored_bytes"] * 5 < storage["raw_bytes"]
+
+    db.add_repo({"name": "tool", "org": "o", "full_name": "o/tool"})
+    assert db.get_repo("o/tool", include_readme=True)["readme"] is None
+    assert db.get_readme_storage()["readmes"] == 0
+
+def test_old_schema_is_migrated(tmp_path):
+    """READMEs and embeddings in an old repos table move to the side tables"""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE repos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, org TEXT NOT NULL, full_name TEXT UNIQUE NOT NULL,
+            description TEXT, topics TEXT, readme TEXT, embedding BLOB,
+            sublinear_hash TEXT, stars INTEGER DEFAULT 0, language TEXT,
+            last_scan TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "INSERT INTO repos (name, org, full_name, readme, embedding) VALUES ('a', 'o', 'o/a', ?, ?)",
+        (README, np.ones(4, dtype=np.float32).tobytes())
+    )
+    conn.commit()
+    conn.close()
+
+    database = RuvScanDB(path)
+    repo = database.get_repo("o/a", include_readme=True, include_embedding=True)
+
+    assert repo["readme"] == README
+    assert np.array_equal(repo["embedding"], np.ones(4))
+    assert len(database.search_repos_text("install")) == 1
+    assert len(database.vectors) == 1
+    database.close()
@@ -0,0 +1,76 @@
+"""
+Tests for bulk repo and leverage card upserts
+"""
+
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB
+
+@pytest.fixture
+def db(tmp_path):
+    """File-backed database"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    yield database
+    database.close()
+
+def make_repos(count: int, offset: int = 0):
+    return [
+        {
+            "name": f"repo{i}",
+            "org": "org",
+            "full_name": f"org/repo{i}",
+            "description": f"repo {i}",
+            "embedding": np.full(4, float(i))
+        }
+        for i in range(offset, offset + count)
+    ]
+
+def test_bulk_upsert_keeps_ids_and_card_links(db):
+    """Re-ingesting updates rows in place, so cards still join to their repo"""
+    ids = db.add_repos_bulk(make_repos(25), batch_size=10)
+    assert len(set(ids)) == 25
+
+    db.add_cards_bulk([
+        {"repo_id": ids[3], "summary": "s", "reasoning": "r", "relevance_score": 0.9}
+    ])
+
+    updated = make_repos(25)
+    updated[3]["description"] = "rewritten"
+    updated[3]["embedding"] = np.array([42.0, 0.0, 0.0, 0.0])
+    assert db.add_repos_bulk(updated, batch_size=7) == ids
+
+    cards = db.get_leverage_cards()
+    assert len(cards) == 1 and cards[0]["repo"] == "org/repo3"
+    assert db.get_repo("org/repo3")["description"] == "rewritten"
+
+    matrix_ids, matrix = db.get_embedding_matrix()
+    assert sorted(matrix_ids.tolist()) == sorted(ids)
+    assert np.allclose(matrix[matrix_ids.tolist().index(ids[3])], [1.0, 0.0, 0.0, 0.0])
+
+def test_bulk_upsert_clears_dropped_embeddings(db):
+    """A repo re-ingested without an embedding leaves the matrix"""
+    ids = db.add_repos_bulk(make_repos(3))
+    repo = make_repos(1, offset=1)[0]
+    del repo["embedding"]
+
+    db.add_repos_bulk([repo])
+
+    assert ids[1] not in db.vectors
+    assert len(db.vectors) == 2
+
+def test_cards_bulk_updates_by_id(db):
+    """Cards with an id are updated, others inserted"""
+    repo_id = db.add_repo(make_repos(1)[0])
+    cards = [
+        {"repo_id": repo_id, "summary": "old", "reasoning": "r", "relevance_score": 0.5, "query_intent": f"intent {i}"}
+        for i in range(5)
+    ]
+
+    assert db.add_cards_bulk(cards, batch_size=2) == 5
+    card_id = db.get_leverage_cards()[0]["id"]
+    card = next(c for c in cards if c["query_intent"] == db.get_leverage_cards()[0]["query_intent"])
+    db.add_cards_bulk([{**card, "id": card_id, "summary": "new"}])
+
+    cards = db.get_leverage_cards(limit=10)
+    assert len(cards) == 5
+    assert {c["summary"] for c in cards if c["id"] == card_id} == {"new"}
@@ -0,0 +1,83 @@
+"""
+Tests for WAL mode and the read connection pool
+"""
+
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB
+
+@pytest.fixture
+def db(tmp_path):
+    """File-backed database with a small read pool"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"), read_pool_size=2)
+    yield database
+    database.close()
+
+def test_wal_and_pragmas(db):
+    """The writer runs in WAL mode with relaxed sync"""
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+def test_readers_are_read_only_and_bounded(db):
+    """Pooled connections reject writes and never exceed the pool size"""
+    with db._reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM repos")
+
+    with db._reader(), db._reader():
+        pass
+    with db._reader():
+        pass
+    assert db._reader_count == 2
+
+def test_reads_proceed_during_write_transaction(db):
+    """A reader sees the last commit while the writer holds an open transaction"""
+    db.add_repo({"name": "a", "org": "o", "full_name": "o/a"})
+
+    with db._write_lock:
+        db.conn.execute("UPDATE repos SET description = 'pending' WHERE full_name = 'o/a'")
+        result = ThreadPoolExecutor(1).submit(db.get_repo, "o/a").result(timeout=5)
+        db.conn.rollback()
+
+    assert result["description"] is None
+
+def test_concurrent_reads_and_ingest(db):
+    """Threads reading cards and repos run alongside bulk ingestion"""
+    errors = []
+    done = threading.Event()
+
+    def ingest():
+        for start in range(0, 200, 20):
+            db.add_repos_bulk([
+                {"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": np.ones(4)}
+                for i in range(start, start + 20)
+            ])
+        done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                db.get_leverage_cards()
+                db.get_repo("o/r0")
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    ingest()
+    for thread in readers:
+        thread.join()
+
+    assert not errors
+    assert db.get_embedding_version_progress("default") == (200, 200)
+
+def test_memory_database_reads_through_writer():
+    """In-memory databases have no pool and read from the writer connection"""
+    database = RuvScanDB(":memory:")
+    database.add_repo({"name": "a", "org": "o", "full_name": "o/a"})
+    assert database.get_repo("o/a")["name"] == "a"
+    database.close()
@@ -0,0 +1,110 @@
+"""
+Tests for the content-addressed embedding cache
+"""
+
+import threading
+import pytest
+import numpy as np
+from src.mcp.reasoning.embeddings import EmbeddingService
+from src.mcp.reasoning.embedding_cache import EmbeddingCache, text_hash
+from src.mcp.storage.db import RuvScanDB
+
+class CountingEmbedder:
+    """Local embedder stand-in that counts texts sent to the provider"""
+
+    model_id = "counting"
+    dimension = 8
+
+    def __init__(self):
+        self.embedded = []
+
+    def transform(self, texts):
+        self.embedded.extend(texts)
+        return np.stack([np.full(self.dimension, len(text), dtype=np.float32) for text in texts])
+
+@pytest.fixture
+def db():
+    """In-memory database"""
+    database = RuvScanDB(":memory:")
+    yield database
+    database.close()
+
+@pytest.fixture
+def service(db):
+    """Local embedding service with a SQLite-backed cache"""
+    svc = EmbeddingService(provider="local", cache=EmbeddingCache(db, lru_size=4))
+    svc.client = CountingEmbedder()
+    return svc
+
+def test_text_hash_normalizes_whitespace():
+    """Whitespace-only differences share a cache key"""
+    assert text_hash("  fast\n\tsearch ") == text_hash("fast search")
+    assert text_hash("fast search") != text_hash("Fast search")
+
+@pytest.mark.asyncio
+async def test_batch_only_embeds_misses(service):
+    """Cached and duplicate texts never reach the provider"""
+    await service.embed_batch(["alpha", "beta"])
+    embeddings = await service.embed_batch(["alpha", "gamma", "gamma", "beta  "])
+
+    assert service.client.embedded == ["alpha", "beta", "gamma"]
+    assert len(embeddings) == 4
+    assert np.array_equal(embeddings[1], embeddings[2])
+
+@pytest.mark.asyncio
+async def test_embed_text_uses_cache(service):
+    """Single-text calls share the cache with batches"""
+    first = await service.embed_text("sublinear solver")
+    second = await service.embed_text("sublinear solver")
+
+    assert service.client.embedded == ["sublinear solver"]
+    assert np.array_equal(first, second)
+
+@pytest.mark.asyncio
+async def test_cache_persists_in_sqlite(db, service):
+    """A fresh LRU falls through to the embedding_cache table"""
+    await service.embed_batch(["alpha", "beta"])
+
+    cold = EmbeddingService(provider="local", cache=EmbeddingCache(db))
+    cold.client = CountingEmbedder()
+    embeddings = await cold.embed_batch(["alpha", "beta"])
+
+    assert cold.client.embedded == []
+    assert embeddings[0][0] == 5
+    assert cold.cache.get_stats()["hits"] == 2
+
+@pytest.mark.asyncio
+async def test_cache_is_scoped_by_model(db, service):
+    """Changing the model identity invalidates cached vectors"""
+    await service.embed_text("alpha")
+    service.client.model_id = "counting-v2"
+    await service.embed_text("alpha")
+
+    assert service.client.embedded == ["alpha", "alpha"]
+
+@pytest.mark.asyncio
+async def test_cache_database_calls_run_off_the_event_loop(db, service):
+    """SQLite lookups and writes run on executor threads, not the event loop thread"""
+    threads = []
+    for name in ("get_cached_embeddings", "add_cached_embeddings"):
+        method = getattr(db, name)
+
+        def recorded(*args, _method=method, **kwargs):
+            threads.append(threading.get_ident())
+            return _method(*args, **kwargs)
+
+        setattr(db, name, recorded)
+
+    await service.embed_text("alpha")
+    await service.embed_batch(["beta", "gamma"])
+
+    assert len(threads) == 4
+    assert threading.get_ident() not in threads
+
+def test_cache_is_built_from_config():
+    """llm.embedding_cache switches the cache off; llm.embedding_cache_lru sizes the LRU"""
+    from src.mcp.endpoints.query import create_embedding_cache
+
+    assert create_embedding_cache({"llm": {"embedding_cache": False}}) is None
+    cache = create_embedding_cache({"llm": {"embedding_cache": True, "embedding_cache_lru": 12}})
+    assert cache.lru_size == 12 and cache.db is None
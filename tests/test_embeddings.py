@@ -84,3 +84,108 @@ def test_get_dimension(embedding_service):
     """Test dimension getter"""
     dimension = embedding_service.get_dimension()
     assert dimension == 1536
+
+@pytest.fixture
+def readmes():
+    """Small corpus of repo descriptions"""
+    return [
+        "Fast vector similarity search with approximate nearest neighbour indexes",
+        "Nearest neighbour search over dense vectors using HNSW graphs",
+        "Web framework for building REST APIs in Python",
+        "Async HTTP server and REST API toolkit",
+        "Plotting and data visualization library for charts",
+        "Interactive charts and dashboards for data visualization",
+    ]
+
+@pytest.mark.asyncio
+async def test_local_embeddings_are_deterministic(embedding_service):
+    """Local provider returns the same vector for the same text"""
+    first = await embedding_service.embed_text("sublinear matrix solver")
+    second = await embedding_service.embed_text("sublinear matrix solver")
+
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first), 1.0)
+
+@pytest.mark.asyncio
+async def test_local_batch_matches_single(embedding_service, readmes):
+    """Batched and single embeddings agree"""
+    batch = await embedding_service.embed_batch(readmes)
+    single = await embedding_service.embed_text(readmes[2])
+
+    assert np.allclose(batch[2], single)
+
+@pytest.mark.asyncio
+async def test_local_transform_runs_off_the_event_loop(embedding_service, caplog):
+    """The CPU-bound local transform runs in an executor and warns once while unfitted"""
+    import threading
+    transform = embedding_service.client.transform
+    threads = []
+
+    def recording(texts):
+        threads.append(threading.current_thread())
+        return transform(texts)
+    embedding_service.client.transform = recording
+
+    await embedding_service.embed_text("sublinear matrix solver")
+    await embedding_service.embed_batch(["graph search", "stream processing"])
+
+    assert threads and threading.main_thread() not in threads
+    assert sum("not fitted" in record.message for record in caplog.records) == 1
+
+@pytest.mark.asyncio
+async def test_fitted_local_model_ranks_related_text(tmp_path, readmes):
+    """Fitted model places related descriptions closest and survives a save/load"""
+    path = str(tmp_path / "local.joblib")
+    service = EmbeddingService(provider="local", local_model_path=path)
+    service.fit_local(readmes)
+
+    corpus = np.stack(await service.embed_batch(readmes))
+    query = await service.embed_text("vector search with nearest neighbour graphs")
+    scores = corpus @ query
+    assert set(np.argsort(-scores)[:2]) == {0, 1}
+
+    reloaded = EmbeddingService(provider="local", local_model_path=path)
+    assert np.allclose(await reloaded.embed_text(readmes[0]), corpus[0], atol=1e-6)
+
+@pytest.mark.asyncio
+async def test_embed_repos_streams_in_order(embedding_service):
+    """Bulk pipeline yields (id, vector) per repo in input order, matching single embeds"""
+    repos = [
+        {"id": i, "name": f"repo{i}", "description": f"tool {i}", "readme": "text " * i}
+        for i in range(25)
+    ]
+
+    async def source():
+        for repo in repos:
+            yield repo
+
+    pairs = [pair async for pair in embedding_service.embed_repos(source(), batch_size=4, max_in_flight=2)]
+
+    assert [repo_id for repo_id, _ in pairs] == list(range(25))
+    expected = await embedding_service.embed_text(
+        "Repository: repo3\nDescription: tool 3\nREADME: " + "text " * 3
+    )
+    assert np.allclose(pairs[3][1], expected)
+
+@pytest.mark.asyncio
+async def test_embed_repos_backpressure(embedding_service):
+    """Repos are only read ahead by max_in_flight batches of the consumer"""
+    read = []
+
+    def source():
+        for i in range(1000):
+            read.append(i)
+            yield {"full_name": f"org/repo{i}", "name": f"repo{i}"}
+
+    stream = embedding_service.embed_repos(source(), batch_size=10, max_in_flight=2)
+    repo_id, _ = await stream.__anext__()
+    await stream.aclose()
+
+    assert repo_id == "org/repo0"
+    assert len(read) <= 30
+
+@pytest.mark.asyncio
+async def test_embed_repo_summary_rejects_running_loop(embedding_service):
+    """The blocking helper refuses to run inside an event loop"""
+    with pytest.raises(RuntimeError):
+        embedding_service.embed_repo_summary({"name": "repo"})
@@ -0,0 +1,74 @@
+"""
+Tests for the FTS5 lexical candidate search
+"""
+
+import sqlite3
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB, fts_query
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with a few described repos"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    database.add_repos_bulk([
+        {"name": "mcp-rs", "org": "o", "full_name": "o/mcp-rs",
+         "description": "MCP server for Rust", "topics": ["mcp", "rust"], "embedding": np.array([1.0, 1.0, 0.0, 0.0])},
+        {"name": "webkit", "org": "o", "full_name": "o/webkit",
+         "description": "Web toolkit", "readme": "Mentions rust once", "embedding": np.array([1.0, 0.0, 0.0, 0.0])},
+        {"name": "pyml", "org": "o", "full_name": "o/pyml",
+         "description": "Machine learning in Python", "embedding": np.full(4, 3.0)},
+    ])
+    yield database
+    database.close()
+
+def test_fts_query_escapes_syntax():
+    """Operators and quotes in user text become plain terms"""
+    assert fts_query('MCP "server" AND rust-lang') == '"mcp" OR "server" OR "and" OR "rust" OR "lang"'
+    assert fts_query("  ?! ") == ""
+
+def test_bm25_ranks_metadata_over_readme(db):
+    """Name/description/topic hits outrank README-only hits; non-matches are excluded"""
+    results = db.search_repos_text("MCP server for Rust")
+
+    ids = {name: db.get_repo(f"o/{name}")["id"] for name in ("mcp-rs", "webkit", "pyml")}
+    assert [repo_id for repo_id, _ in results] == [ids["mcp-rs"], ids["webkit"]]
+    assert results[0][1] > results[1][1] > 0
+
+def test_index_follows_updates_and_deletes(db):
+    """Upserts re-index changed text and deletes drop the row from the index"""
+    db.add_repo({"name": "pyml", "org": "o", "full_name": "o/pyml", "description": "Rust bindings"})
+    assert db.get_repo("o/pyml")["id"] in [r for r, _ in db.search_repos_text("bindings")]
+    assert db.search_repos_text("python") == []
+
+    assert db.delete_repos(["o/mcp-rs", "o/missing"]) == 1
+    assert db.search_repos_text("mcp") == []
+
+def test_candidate_embeddings(db):
+    """Vector scoring can be restricted to the lexical candidates"""
+    candidates = [repo_id for repo_id, _ in db.search_repos_text("rust")]
+    ids, matrix = db.get_candidate_embeddings(candidates + [999])
+
+    assert ids.tolist() == candidates
+    assert np.allclose(matrix[:, 0], [np.sqrt(0.5), 1.0])
+
+def test_existing_database_is_backfilled(tmp_path):
+    """Repos stored before the FTS table existed are indexed on open"""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE repos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, org TEXT NOT NULL, full_name TEXT UNIQUE NOT NULL,
+            description TEXT, topics TEXT, readme TEXT, embedding BLOB,
+            sublinear_hash TEXT, stars INTEGER DEFAULT 0, language TEXT,
+            last_scan TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("INSERT INTO repos (name, org, full_name, description) VALUES ('a', 'o', 'o/a', 'vector search')")
+    conn.commit()
+    conn.close()
+
+    database = RuvScanDB(path)
+    assert len(database.search_repos_text("vector")) == 1
+    database.close()
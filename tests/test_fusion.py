@@ -0,0 +1,112 @@
+"""
+Tests for hybrid lexical + vector rank fusion
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+from src.mcp.index.fusion import reciprocal_rank_fusion, hybrid_report
+from src.mcp.storage.db import RuvScanDB
+
+def test_rrf_rewards_agreement():
+    """Items ranked by both lists beat items ranked high by only one"""
+    vector = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    lexical = [("c", 12.0), ("d", 9.0)]
+
+    fused = reciprocal_rank_fusion([vector, lexical], k=60)
+
+    assert fused[0][0] == "c"
+    assert [item for item, _ in fused] == ["c", "a", "b", "d"]
+    assert np.isclose(fused[0][1], 1 / 63 + 1 / 61)
+
+def test_rrf_weights_and_limit():
+    """Weights shift the balance between lists; limit truncates"""
+    vector = [("a", 0.9), ("b", 0.8)]
+    lexical = [("b", 5.0), ("a", 4.0)]
+
+    assert reciprocal_rank_fusion([vector, lexical], weights=[2.0, 1.0])[0][0] == "a"
+    assert reciprocal_rank_fusion([vector, lexical], weights=[1.0, 2.0], limit=1) == [
+        ("b", 2.0 / 61 + 1.0 / 62)
+    ]
+
+def test_hybrid_report_against_vector_only(tmp_path):
+    """With noisy vectors, fusing BM25 recovers keyword matches"""
+    rng = np.random.default_rng(3)
+    db = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    topics = ["rust", "python", "graph", "vector", "stream", "cache", "wasm", "sql"]
+    repos = [
+        {"name": f"r{i}", "org": "o", "full_name": f"o/r{i}",
+         "description": f"{topics[i % 8]} toolkit", "embedding": rng.standard_normal(16)}
+        for i in range(80)
+    ]
+    ids = db.add_repos_bulk(repos)
+    vectors = {repo_id: repo["embedding"] for repo_id, repo in zip(ids, repos)}
+
+    def vector_search(query, k):
+        scores = sorted(((float(v @ query), i) for i, v in vectors.items()), reverse=True)
+        return [(i, s) for s, i in scores[:k]]
+
+    # Each query vector is a noisy copy of one relevant repo; the text names its topic
+    queries = []
+    for t, topic in enumerate(topics):
+        relevant = {ids[i] for i in range(80) if i % 8 == t}
+        target = vectors[ids[t]] + 3.0 * rng.standard_normal(16)
+        queries.append((f"{topic} tools", target, relevant))
+
+    report = {row["mode"]: row for row in hybrid_report(queries, vector_search, db.search_repos_text, k=10)}
+
+    assert report["hybrid"]["recall"] > report["vector"]["recall"]
+    assert report["hybrid"]["mrr"] >= report["vector"]["mrr"]
+    assert report["hybrid"]["mean_latency_ms"] >= 0
+    db.close()
+
+def test_endpoint_fusion_scores_lexical_hits():
+    """Lexical-only hits enter the fused list with their cosine similarity"""
+    from src.mcp.endpoints.query import fuse_rankings
+
+    repo_ids = np.array([10, 20, 30])
+    corpus = np.eye(3)
+    intent = np.array([1.0, 0.5, 0.0])
+
+    fused = fuse_rankings(repo_ids, corpus, intent, [(0, 0.89)], [(30, 7.0), (20, 3.0), (99, 1.0)], limit=3)
+
+    assert [row for row, _ in fused] == [0, 2, 1]
+    assert fused[0][1] == 0.89
+    assert np.isclose(fused[2][1], 0.5 / np.linalg.norm(intent))
+
+def test_fusion_respects_min_score():
+    """Lexical-only hits below min_score are dropped after fusion"""
+    from src.mcp.endpoints.query import fuse_rankings
+
+    corpus = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]])
+    fused = fuse_rankings([1, 2, 3], corpus, np.array([1.0, 0.0]), [(0, 1.0)], [(3, 9.0), (2, 5.0)], limit=3, min_score=0.5)
+
+    assert [row for row, _ in fused] == [0, 1]
+
+def test_query_endpoint_returns_lexical_hits(tmp_path, monkeypatch):
+    """A BM25-only match reaches /query results through fusion, subject to min_score"""
+    from src.mcp.endpoints import query
+    from src.mcp.server import app
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    db.add_repos_bulk([
+        {"name": "exact", "org": "o", "full_name": "o/exact", "description": "graph layout", "embedding": [1.0, 0.0, 0.0]},
+        {"name": "near", "org": "o", "full_name": "o/near", "description": "image codec", "embedding": [0.8, 0.6, 0.0]},
+        {"name": "words", "org": "o", "full_name": "o/words", "description": "sensor telemetry pipeline", "embedding": [0.6, 0.8, 0.0]},
+    ])
+
+    async def embed_text(text):
+        return np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+    monkeypatch.setattr(query.embedding_service, "embed_text", embed_text)
+    monkeypatch.setattr(query, "repo_db", AsyncRuvScanDB(db))
+    client = TestClient(app)
+
+    # Vector top-2 is exact, near; the lexical hit outranks near after fusion
+    cards = client.post("/query", json={"intent": "sensor telemetry", "max_results": 2, "min_score": 0.5}).json()
+    assert [card["repo"] for card in cards] == ["o/exact", "o/words"]
+
+    # At 0.7 the lexical hit (cosine 0.6) is filtered out
+    cards = client.post("/query", json={"intent": "sensor telemetry feeds", "max_results": 2, "min_score": 0.7}).json()
+    assert [card["repo"] for card in cards] == ["o/exact", "o/near"]
+    assert all(card["relevance_score"] >= 0.7 for card in cards)
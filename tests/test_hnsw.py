@@ -0,0 +1,206 @@
+"""
+Tests for the HNSW approximate nearest-neighbour index
+"""
+
+import pytest
+import numpy as np
+from src.mcp.index import HNSWIndex, recall_report, tune_ef_search
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Random corpus with a fixed seed"""
+    rng = np.random.default_rng(11)
+    return rng.standard_normal((500, 24)).astype(np.float32)
+
+@pytest.fixture(scope="module")
+def index(corpus):
+    """Index over the corpus labelled by row"""
+    return HNSWIndex.build(range(len(corpus)), corpus, M=8, ef_construction=64)
+
+def test_search_finds_self(index, corpus):
+    """A corpus vector is its own nearest neighbour"""
+    results = index.search(corpus[42], k=5)
+
+    assert len(results) == 5
+    assert results[0][0] == 42
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+def test_recall_against_exact(index):
+    """Recall@10 is high at the default ef"""
+    queries = np.random.default_rng(3).standard_normal((20, 24))
+    report = recall_report(index, queries, k=10, ef_values=(64,))
+
+    assert report[0]["ef"] is None
+    assert report[1]["recall"] >= 0.9
+    assert report[1]["mean_latency_ms"] > 0
+
+def test_delete_and_reinsert(corpus):
+    """Deleted labels are never returned and can be inserted again"""
+    index = HNSWIndex.build(range(100), corpus[:100], M=8, ef_construction=32)
+
+    assert index.delete(7)
+    assert 7 not in index
+    assert all(label != 7 for label, _ in index.search(corpus[7], k=10))
+
+    index.insert(7, corpus[7])
+    assert index.search(corpus[7], k=1)[0][0] == 7
+    assert len(index) == 100
+
+def test_save_and_load(tmp_path, index, corpus):
+    """Persisted index returns identical results"""
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = HNSWIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.search(corpus[5], k=10) == index.search(corpus[5], k=10)
+
+def test_update_applies_only_changed_rows(corpus):
+    """Unchanged rows are skipped, moved and retired rows reach the graph"""
+    index = HNSWIndex.build(range(100), corpus[:100], M=8, ef_construction=32)
+
+    assert index.update(range(100), corpus[:100]) == 0
+
+    changed = corpus[:101].copy()
+    changed[7] = corpus[300]
+    live = np.ones(101, dtype=bool)
+    live[9] = False
+    assert index.update(range(101), changed, live=live) == 3
+
+    assert index.search(corpus[300], k=1)[0][0] == 7
+    assert 9 not in index and 100 in index
+    assert index.deleted_count == 2
+    assert index.update(range(101), changed, live=live, max_changes=0) == 0
+    changed[:10] = corpus[400:410]
+    assert index.update(range(101), changed, live=live, max_changes=5) is None
+    assert index.search(corpus[300], k=1)[0][0] == 7
+
+def test_tune_ef_search_reaches_the_recall_floor(corpus):
+    """ef_search is raised until sampled recall meets the floor"""
+    index = HNSWIndex.build(range(len(corpus)), corpus, M=4, ef_construction=16, ef_search=10)
+    result = tune_ef_search(index, min_recall=0.95, max_ef=256, sample=50)
+
+    assert result["recall"] >= 0.95
+    assert index.recall == result["recall"]
+    assert index.ef_search == result["ef"] > 10
+
+def test_store_reports_rows_changed_since_a_revision(tmp_path):
+    """The change log covers writes after a revision and is reset by a rebuild"""
+    from src.mcp.storage.vector_store import EmbeddingMatrixStore
+
+    store = EmbeddingMatrixStore(str(tmp_path / "matrix"))
+    store.upsert_many([(1, np.ones(4)), (2, np.ones(4))])
+    revision = store.revision
+    store.upsert_many([(2, np.zeros(4)), (3, np.ones(4))])
+    store.remove(1)
+
+    assert store.changes_since(revision).tolist() == [0, 1, 2]
+    assert store.changes_since(store.revision).tolist() == []
+    assert store.changes_since(store.revision + 1) is None
+
+    store.rebuild([(3, np.ones(4))])
+    assert store.changes_since(revision) is None
+
+def _ann_settings(monkeypatch, query, tmp_path, build_process=False):
+    monkeypatch.setattr(query, "ANN_MIN_CORPUS_SIZE", 10)
+    monkeypatch.setattr(query, "ANN_INDEX_PATH", str(tmp_path / "ruvscan.hnsw.npz"))
+    monkeypatch.setattr(query, "ANN_BUILD_PROCESS", build_process)
+    monkeypatch.setattr(query, "ANN_PARAMS", {"M": 8, "ef_construction": 64, "ef_search": 32})
+
+def test_persisted_index_is_synced_instead_of_rebuilt(tmp_path, corpus, monkeypatch):
+    """The index at index.path is loaded and only the changed rows applied"""
+    from src.mcp.endpoints import query
+
+    _ann_settings(monkeypatch, query, tmp_path)
+    ids = np.arange(100)
+    built = query.build_ann_index(ids, corpus[:100])
+    assert len(built) == 100 and built.recall >= query.ANN_MIN_RECALL
+
+    def no_build(*args, **kwargs):
+        raise AssertionError("index rebuilt although only a few rows changed")
+
+    monkeypatch.setattr(HNSWIndex, "build", no_build)
+    changed = corpus[:100].copy()
+    changed[7] = corpus[300]
+    ids[9] = -1
+    loaded = query.build_ann_index(ids, changed)
+    assert loaded.search(corpus[300], k=1)[0][0] == 7
+    assert 9 not in loaded and len(loaded) == 99
+
+def test_full_build_runs_in_a_worker_process(tmp_path, corpus, monkeypatch):
+    """With index.build_process the graph is built and tuned in a spawned process"""
+    from src.mcp.endpoints import query
+
+    _ann_settings(monkeypatch, query, tmp_path, build_process=True)
+    ids = np.arange(200)
+    ids[3] = -1
+    index = query.build_ann_index(ids, corpus[:200])
+
+    assert len(index) == 199 and 3 not in index
+    assert index.recall is not None
+    assert index.search(corpus[42], k=1)[0][0] == 42
+
+@pytest.mark.asyncio
+async def test_ann_index_refreshes_off_the_request_path(tmp_path, monkeypatch):
+    """Queries scan exactly while the index builds, and writes are applied as deltas"""
+    from src.mcp.endpoints import query
+    from src.mcp.storage.db import RuvScanDB
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    rng = np.random.default_rng(5)
+    await db.add_repos_bulk([
+        {"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": rng.standard_normal(8)}
+        for i in range(40)
+    ])
+    monkeypatch.setattr(query, "repo_db", db)
+    _ann_settings(monkeypatch, query, tmp_path)
+    cache = query.CorpusIndexCache(
+        query.build_ann_index,
+        update=query.update_ann_index,
+        usable=lambda index: index.recall >= query.ANN_MIN_RECALL
+    )
+    monkeypatch.setattr(query, "ann_cache", cache)
+
+    _, matrix = await db.get_embedding_matrix()
+    assert await query.get_corpus_index(matrix) is None
+    await cache.refresh_task
+    first = await query.get_corpus_index(matrix)
+    assert first is not None and len(first) == 40
+
+    def no_build(*args, **kwargs):
+        raise AssertionError("index rebuilt for a single write")
+
+    monkeypatch.setattr(query, "build_ann_index", no_build)
+    cache.build = no_build
+    await db.add_repo({"name": "r40", "org": "o", "full_name": "o/r40", "embedding": rng.standard_normal(8)})
+    ids, matrix = await db.get_embedding_matrix()
+
+    # The index keeps serving while the delta is applied, to the same object
+    assert await query.get_corpus_index(matrix) is first
+    await cache.refresh_task
+    assert await query.get_corpus_index(matrix) is first
+    assert len(first) == 41 and first.search(matrix[40], k=1)[0][0] == 40
+
+    # An index below the recall floor is not served
+    first.recall = 0.5
+    assert await query.get_corpus_index(matrix) is None
+    await db.close()
+
+@pytest.mark.asyncio
+async def test_index_hits_are_rescored_against_the_current_rows(monkeypatch):
+    """A stale index score is replaced by the cosine of the current row"""
+    from src.mcp.endpoints import query
+
+    corpus = np.eye(4, dtype=np.float32)
+    stale = HNSWIndex.build(range(4), corpus, M=4, ef_construction=8)
+    current = corpus.copy()
+    current[0] = [0.6, 0.8, 0.0, 0.0]
+
+    async def index(corpus_embeddings):
+        return stale
+
+    monkeypatch.setattr(query, "get_corpus_index", index)
+    results = await query.vector_candidates(np.array([1.0, 0.0, 0.0, 0.0]), current, 2)
+
+    assert results[0] == (0, pytest.approx(0.6))
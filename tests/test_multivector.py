@@ -0,0 +1,168 @@
+"""
+Tests for README chunking and multi-vector repo scoring
+"""
+
+import pytest
+import numpy as np
+from src.mcp.reasoning.chunking import chunk_text, chunk_repo
+from src.mcp.reasoning.embeddings import EmbeddingService
+from src.mcp.index.multivector import ChunkIndex, segment_top_mean
+from src.mcp.storage.db import RuvScanDB
+
+def test_chunk_text_respects_token_bound():
+    """Long paragraphs are windowed with overlap; short ones are packed"""
+    words = [f"w{i}" for i in range(100)]
+    text = "intro line\n\n" + " ".join(words) + "\n\nshort tail"
+
+    chunks = chunk_text(text, max_tokens=40, overlap=10)
+
+    assert all(len(chunk.split()) <= 40 for chunk in chunks)
+    assert chunks[0] == "intro line"
+    assert chunks[1].split()[-10:] == chunks[2].split()[:10]
+    assert chunks[-2].endswith("w99")
+    assert chunks[-1] == "short tail"
+    assert chunk_text("   ") == []
+
+def test_chunk_repo_covers_whole_readme():
+    """Text past the first 1000 characters still lands in a chunk"""
+    repo = {"name": "solver", "description": "Matrix tools", "readme": "x " * 800 + "gpu kernels"}
+
+    chunks = chunk_repo(repo, max_tokens=256)
+
+    assert chunks[0].startswith("Repository: solver")
+    assert "gpu kernels" in chunks[-1]
+    assert all(chunk.startswith("Repository: solver") for chunk in chunks)
+
+def test_segment_top_mean_matches_loop():
+    """Vectorized segment reduction matches a per-repo loop"""
+    rng = np.random.default_rng(0)
+    scores = rng.random(50).astype(np.float32)
+    segments = rng.integers(0, 7, 50)
+
+    repos, reduced = segment_top_mean(scores, segments, top_chunks=3)
+
+    for repo, value in zip(repos, reduced):
+        best = np.sort(scores[segments == repo])[::-1][:3]
+        assert value == pytest.approx(best.mean(), rel=1e-6)
+
+def test_chunk_index_ranks_by_best_chunk():
+    """A repo wins on its best chunk even when its other chunks are unrelated"""
+    vectors = np.array([
+        [1.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.7, 0.7, 0.0],
+        [0.0, 0.0, 1.0],
+    ])
+    index = ChunkIndex([2, 1, 3, 1], vectors)
+
+    results = index.search(np.array([0.0, 0.0, 1.0]), k=2)
+
+    assert len(index) == 3
+    assert results[0] == (1, pytest.approx(1.0))
+    assert index.search(np.array([0.0, 0.0, 1.0]), k=3, top_chunks=2)[0][1] == pytest.approx(0.5)
+
+@pytest.mark.asyncio
+async def test_chunks_roundtrip_through_db():
+    """Chunk embeddings are stored with repo back-references and scored per repo"""
+    service = EmbeddingService(provider="local")
+    db = RuvScanDB(":memory:")
+    repos = [
+        {"name": "plots", "org": "o", "full_name": "o/plots", "readme": "charts and dashboards\n\n" + "filler " * 300},
+        {"name": "vectors", "org": "o", "full_name": "o/vectors", "readme": "filler " * 300 + "\n\nnearest neighbour search"},
+    ]
+
+    for repo in repos:
+        repo_id = db.add_repo(repo)
+        chunks, embeddings = await service.embed_repo_chunks(repo, max_tokens=64)
+        db.set_repo_chunks(repo_id, chunks, embeddings)
+
+    repo_ids, matrix = db.get_chunk_matrix()
+    index = ChunkIndex(repo_ids, matrix)
+    query = await service.embed_text("nearest neighbour search")
+
+    assert index.search(query, k=1)[0][0] == db.get_repo("o/vectors")["id"]
+    db.close()
+
+@pytest.mark.asyncio
+async def test_query_merges_chunk_scores(tmp_path, monkeypatch):
+    """With index.readme_chunks, a repo matched by a README chunk keeps its best cosine"""
+    from src.mcp.endpoints import query
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    header, deep = await db.add_repos_bulk([
+        {"name": "header", "org": "o", "full_name": "o/header", "embedding": [0.8, 0.6, 0.0]},
+        {"name": "deep", "org": "o", "full_name": "o/deep", "embedding": [0.0, 1.0, 0.0]},
+    ])
+    await db.set_repo_chunks(deep, ["intro", "the matching section"], [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]])
+    cache = query.CorpusIndexCache(query.chunk_cache.build, chunks=True)
+    monkeypatch.setattr(query, "repo_db", db)
+    monkeypatch.setattr(query, "README_CHUNKS", True)
+    monkeypatch.setattr(query, "chunk_cache", cache)
+
+    intent = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    assert await query.chunk_candidates(intent, 5) == []
+    await cache.refresh_task
+    chunk_hits = await query.chunk_candidates(intent, 5)
+    assert chunk_hits[0] == (deep, pytest.approx(1.0))
+
+    repo_ids, matrix = await db.get_embedding_matrix()
+    await query.rust_client.connect()
+    similarities = await query.vector_candidates(intent, matrix, 5)
+    merged = query.merge_chunk_hits(repo_ids, similarities, chunk_hits)
+
+    assert [int(repo_ids[row]) for row, _ in merged] == [deep, header]
+    assert merged[0][1] == pytest.approx(1.0)
+    await db.close()
+
+def test_chunk_owners_follow_matrix_writes():
+    """Chunk owners are kept with the chunk matrix and only new rows are looked up"""
+    db = RuvScanDB(":memory:")
+    first = db.add_repo({"name": "a", "org": "o", "full_name": "o/a", "embedding": [1.0, 0.0, 0.0]})
+    second = db.add_repo({"name": "b", "org": "o", "full_name": "o/b", "embedding": [0.0, 1.0, 0.0]})
+    db.set_repo_chunks(first, ["a1", "a2"], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+    repo_ids, _ = db.get_chunk_matrix()
+    assert repo_ids.tolist() == [first, first]
+
+    lookups = []
+    reader = db._reader
+    def counting_reader():
+        lookups.append(1)
+        return reader()
+    db._reader = counting_reader
+
+    assert db.get_chunk_matrix()[0].tolist() == [first, first]
+    assert lookups == []
+
+    db.set_repo_chunks(second, ["b1"], [[0.0, 0.0, 1.0]])
+    db.set_repo_chunks(first, ["a3"], [[1.0, 0.0, 0.0]])
+    repo_ids, matrix = db.get_chunk_matrix()
+
+    assert sorted(repo_ids.tolist()) == sorted([second, first])
+    assert len(matrix) == 2
+    assert len(lookups) == 1
+    db.close()
+
+@pytest.mark.asyncio
+async def test_ingest_stores_chunks_with_configured_sizes(monkeypatch):
+    """Ingest embeds repos and, with index.readme_chunks, their README chunks"""
+    from src.mcp.endpoints import query
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = AsyncRuvScanDB(RuvScanDB(":memory:"))
+    monkeypatch.setattr(query, "repo_db", db)
+    monkeypatch.setattr(query, "embedding_service", EmbeddingService(provider="local"))
+    monkeypatch.setattr(query, "README_CHUNKS", True)
+    monkeypatch.setattr(query, "CHUNK_TOKENS", 64)
+    monkeypatch.setattr(query, "CHUNK_OVERLAP", 8)
+
+    repo = {"name": "docs", "org": "o", "full_name": "o/docs", "readme": "word " * 300}
+    [repo_id] = await query.ingest_repos([repo])
+
+    stored = await db.get_repo("o/docs")
+    repo_ids, matrix = await db.get_chunk_matrix()
+    assert stored["id"] == repo_id
+    assert len(repo_ids) == len(chunk_repo(repo, max_tokens=64, overlap=8)) > 1
+    assert set(repo_ids.tolist()) == {repo_id}
+    await db.close()
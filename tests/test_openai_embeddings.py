@@ -0,0 +1,181 @@
+"""
+Tests for the async OpenAI embedding path against a local stub server
+"""
+
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from src.mcp.reasoning.embeddings import EmbeddingService
+
+class StubEmbeddingServer:
+    """Minimal HTTP/1.1 server speaking the /v1/embeddings protocol"""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0, failure_status: int = 429):
+        self.delay = delay
+        self.failures = failures
+        self.failure_status = failure_status
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+
+                status, payload = await self.respond(body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\ncontent-type: application/json\r\n"
+                    f"content-length: {len(data)}\r\nretry-after: 0\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, body):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures > 0:
+                self.failures -= 1
+                return self.failure_status, {"error": {"message": "slow down", "type": "rate_limit"}}
+
+            inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            return 200, {
+                "object": "list",
+                "model": body["model"],
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0, 0.0]}
+                    for i, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+            }
+        finally:
+            self.in_flight -= 1
+
+async def serve(stub):
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/v1"
+
+@pytest_asyncio.fixture
+async def slow_stub():
+    """Stub that takes 100 ms per request"""
+    stub = StubEmbeddingServer(delay=0.1)
+    server, url = await serve(stub)
+    yield stub, url
+    server.close()
+
+def make_service(url, **kwargs):
+    return EmbeddingService(provider="openai", api_key="test", base_url=url, **kwargs)
+
+@pytest.mark.asyncio
+async def test_embed_text_does_not_block_event_loop(slow_stub):
+    """Other coroutines keep running while a request is in flight"""
+    stub, url = slow_stub
+    service = make_service(url)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    embedding = await service.embed_text("hello")
+    task.cancel()
+
+    assert embedding.tolist() == [5.0, 1.0, 0.0]
+    assert ticks >= 5
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_batches_run_in_parallel_within_limit(slow_stub):
+    """100-item batches are submitted together, bounded by max_concurrency"""
+    stub, url = slow_stub
+    service = make_service(url, max_concurrency=2)
+    texts = [f"text {i}" for i in range(450)]
+
+    embeddings = await service.embed_batch(texts)
+
+    assert len(embeddings) == 450
+    assert embeddings[123][0] == len("text 123")
+    assert stub.requests == 5
+    assert stub.max_in_flight == 2
+    assert stub.connections <= 2
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried():
+    """429 responses are retried until the provider recovers"""
+    stub = StubEmbeddingServer(failures=2)
+    server, url = await serve(stub)
+    service = make_service(url, backoff_base=0.01)
+
+    embedding = await service.embed_text("retry me")
+
+    assert embedding[0] == len("retry me")
+    assert stub.requests == 3
+    await service.close()
+    server.close()
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    """4xx other than 408/409/429 fail without retrying"""
+    stub = StubEmbeddingServer(failures=1, failure_status=400)
+    server, url = await serve(stub)
+    service = make_service(url)
+
+    with pytest.raises(Exception):
+        await service.embed_batch(["bad request"])
+
+    assert stub.requests == 1
+    await service.close()
+    server.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_embed_text_is_coalesced(slow_stub):
+    """Simultaneous single-text calls share one provider request"""
+    stub, url = slow_stub
+    service = make_service(url, coalesce=True, coalesce_max_batch=8, coalesce_max_wait_ms=20)
+    texts = [f"intent {'x' * i}" for i in range(20)]
+
+    embeddings = await asyncio.gather(*[service.embed_text(text) for text in texts])
+
+    assert [embedding[0] for embedding in embeddings] == [len(text) for text in texts]
+    assert stub.requests == 3
+    metrics = service.coalescer.metrics()
+    assert metrics["batch_size"]["count"] == 3
+    assert metrics["batch_size"]["buckets"]["le_8"] == 3
+    assert metrics["wait_ms"]["count"] == 20
+    assert metrics["wait_ms"]["buckets"]["le_50"] == 20
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_coalesced_failure_reaches_every_caller():
+    """A failed batch resolves each waiting call with the error path"""
+    stub = StubEmbeddingServer(failures=1, failure_status=400)
+    server, url = await serve(stub)
+    service = make_service(url, coalesce=True)
+
+    embeddings = await asyncio.gather(*[service.embed_text(f"text {i}") for i in range(3)])
+
+    assert stub.requests == 1
+    assert all(not embedding.any() for embedding in embeddings)
+    await service.close()
+    server.close()
@@ -0,0 +1,85 @@
+"""
+Tests for the int8 quantized index
+"""
+
+import pytest
+import numpy as np
+from src.mcp.index.quantized import QuantizedIndex, quantize_int8
+from src.mcp.index.hnsw import recall_report
+
+@pytest.fixture
+def corpus():
+    """Random corpus with a fixed seed"""
+    rng = np.random.default_rng(3)
+    return rng.standard_normal((2000, 64)).astype(np.float32)
+
+def test_quantize_roundtrip(corpus):
+    """Dequantized rows stay close to the unit-normalized originals"""
+    codes, scales = quantize_int8(corpus)
+    unit = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - unit).max() < 0.01
+
+def test_approximate_scores_match_dequantized_codes(corpus):
+    """Blocked scan equals scoring the dequantized matrix, including a ragged last block"""
+    index = QuantizedIndex(range(len(corpus)), corpus, block_rows=7)
+    query = corpus[11] + 0.1
+
+    unit = query / np.linalg.norm(query)
+    expected = (index.codes.astype(np.float32) * index.scales[:, None]) @ unit
+    assert np.allclose(index.approximate_scores(query), expected, atol=1e-4)
+
+def test_search_reranks_to_exact_scores(corpus):
+    """Returned scores are full-precision cosines, best first"""
+    index = QuantizedIndex(range(100, 2100), corpus.astype(np.float16), block_rows=512)
+
+    results = index.search(corpus[42], k=5)
+
+    assert results[0][0] == 142
+    assert results[0][1] == pytest.approx(1.0, abs=1e-3)
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+def test_recall_against_exact(corpus):
+    """Int8 scan plus re-rank recovers the exact top-10"""
+    index = QuantizedIndex(range(len(corpus)), corpus)
+    queries = corpus[:20] + 0.5 * np.random.default_rng(4).standard_normal((20, 64))
+
+    report = recall_report(index, queries, k=10, ef_values=[40])
+
+    assert report[1]["recall"] >= 0.98
+    assert index.memory_report()["ratio"] > 3.5
+
+@pytest.mark.asyncio
+async def test_query_scans_int8_codes_when_configured(tmp_path, monkeypatch):
+    """With index.quantization int8, /query candidates come from the quantized index"""
+    from src.mcp.endpoints import query
+    from src.mcp.storage.db import RuvScanDB
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    rng = np.random.default_rng(9)
+    db = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    await db.add_repos_bulk([
+        {"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": rng.standard_normal(32)}
+        for i in range(200)
+    ])
+    cache = query.CorpusIndexCache(query.quantized_cache.build)
+    monkeypatch.setattr(query, "repo_db", db)
+    monkeypatch.setattr(query, "QUANTIZATION", "int8")
+    monkeypatch.setattr(query, "quantized_cache", cache)
+
+    _, matrix = await db.get_embedding_matrix()
+    assert await query.get_corpus_index(matrix) is None
+    await cache.refresh_task
+
+    index = await query.get_corpus_index(matrix)
+    assert isinstance(index, QuantizedIndex)
+
+    intent = matrix[17] + 0.01 * rng.standard_normal(32)
+    results = await query.vector_candidates(intent, matrix, 5)
+    expected = index.search(intent, 5)
+    assert [row for row, _ in results] == [row for row, _ in expected]
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=1e-5)
+    assert results[0][0] == 17
+    await db.close()
@@ -0,0 +1,62 @@
+"""
+Tests for the embedding dimension reduction stage
+"""
+
+import pytest
+import numpy as np
+from src.mcp.reasoning.reduction import DimensionReducer, reduction_report
+from src.mcp.reasoning.embeddings import EmbeddingService
+
+@pytest.fixture
+def corpus():
+    """Corpus with most variance in a 24-dim subspace"""
+    rng = np.random.default_rng(11)
+    latent = rng.standard_normal((800, 24))
+    basis = rng.standard_normal((24, 128))
+    return (latent @ basis + 0.05 * rng.standard_normal((800, 128))).astype(np.float32)
+
+def test_pca_is_deterministic_and_versioned(corpus, tmp_path):
+    """Refitting gives the same basis; save/load keeps the version"""
+    first = DimensionReducer(32).fit(corpus)
+    second = DimensionReducer(32).fit(corpus)
+
+    assert first.version == second.version
+    assert first.explained_variance_ratio > 0.99
+
+    path = str(tmp_path / "reducer.npz")
+    first.save(path)
+    loaded = DimensionReducer.load(path)
+    assert loaded.version == first.version
+    assert np.allclose(loaded.transform(corpus[:3]), first.transform(corpus[:3]))
+
+def test_truncate_keeps_prefix(corpus):
+    """Truncation keeps the leading dimensions, re-normalized"""
+    reducer = DimensionReducer(16, method="truncate").fit(corpus)
+    reduced = reducer.transform(corpus[0])
+
+    assert reduced.shape == (16,)
+    assert np.isclose(np.linalg.norm(reduced), 1.0)
+    assert np.allclose(reduced * np.linalg.norm(corpus[0, :16]), corpus[0, :16], atol=1e-5)
+
+def test_reduction_report(corpus):
+    """Report lists recall per dimension; retaining the signal subspace keeps recall high"""
+    report = reduction_report(corpus, corpus[:50] + 0.1, dimensions=[8, 32, 256], k=10)
+
+    assert [row["dimension"] for row in report] == [8, 32]
+    assert report[1]["recall"] > 0.9
+    assert report[0]["recall"] < report[1]["recall"]
+
+@pytest.mark.asyncio
+async def test_service_applies_reducer(corpus):
+    """Ingest and query vectors come back in the reduced space"""
+    service = EmbeddingService(provider="local")
+    full = np.stack(await service.embed_batch([f"repo number {i} tools" for i in range(40)]))
+    service.fit_reducer(full, 16)
+
+    query = await service.embed_text("repo number 3 tools")
+    batch = await service.embed_batch(["repo number 3 tools", ""])
+
+    assert service.get_dimension() == 16
+    assert query.shape == (16,)
+    assert np.allclose(batch[0], query)
+    assert "+pca-16-" in service.embedding_version
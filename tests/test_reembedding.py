@@ -0,0 +1,255 @@
+"""
+Tests for versioned embeddings and background re-embedding
+"""
+
+import os
+import sqlite3
+import threading
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB
+from src.mcp.storage.vector_store import EmbeddingMatrixStore
+from src.mcp.reasoning.embeddings import EmbeddingService
+from src.mcp.reasoning.reembedding import ReembeddingJob, needs_reembedding
+
+def make_repo(i: int) -> dict:
+    return {
+        "name": f"repo{i}",
+        "org": "org",
+        "full_name": f"org/repo{i}",
+        "description": f"tool number {i} for vector search",
+        "topics": ["search"],
+        "readme": f"repo {i} readme"
+    }
+
+@pytest.fixture
+def old_service():
+    """Service for the model currently in the database"""
+    return EmbeddingService(provider="local")
+
+@pytest.fixture
+def new_service():
+    """Same provider with a 64-dim truncation stage, so a new embedding version"""
+    service = EmbeddingService(provider="local")
+    service.fit_reducer(np.zeros((2, service.client.dimension), dtype=np.float32), 64, method="truncate")
+    return service
+
+@pytest.fixture
+def db(tmp_path, old_service):
+    """Database with five repos embedded by the old model"""
+    database = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    for i in range(5):
+        repo = make_repo(i)
+        repo["embedding"] = old_service.embed_repo_summary(repo)
+        database.add_repo(repo)
+    yield database
+    database.conn.close()
+
+def test_first_embedding_sets_active_version(db, old_service):
+    """Plain add_repo stores the default version and one vector per repo"""
+    assert db.get_active_embedding_version() == "default"
+    assert db.get_embedding_version_progress("default") == (5, 5)
+
+    with pytest.raises(ValueError):
+        db.add_repo({**make_repo(9), "embedding": np.ones(4), "embedding_version": "other"})
+
+@pytest.mark.asyncio
+async def test_old_version_serves_until_switch(db, old_service, new_service):
+    """Partial progress leaves queries on the old vectors; completion flips atomically"""
+    assert needs_reembedding(db, new_service)
+    job = ReembeddingJob(db, new_service, batch_size=2)
+    old_dimension = db.vectors.dimension
+
+    # Dual-write one batch by hand: nothing visible changes yet
+    repos = db.get_repos_missing_version(job.version, 2)
+    vectors = await new_service.embed_batch(["a", "b"])
+    db.put_version_embeddings(job.version, [(r["id"], v) for r, v in zip(repos, vectors)])
+
+    assert db.get_active_embedding_version() == "default"
+    assert db.vectors.dimension == old_dimension
+    assert (await job.progress())["done"] == 2
+    with pytest.raises(ValueError):
+        db.activate_embedding_version(job.version)
+
+    completed = []
+    job.on_complete = completed.append
+    embedded = await job.start()
+
+    assert embedded == 3
+    assert completed == [job.version]
+    assert db.get_active_embedding_version() == job.version
+    assert db.vectors.dimension == 64
+    assert len(db.vectors) == 5
+    assert (await job.progress())["percent"] == 100.0
+    assert not needs_reembedding(db, new_service)
+
+    # The swapped-in matrix survives reopening
+    reopened = RuvScanDB(db.db_path)
+    assert reopened.vectors.dimension == 64
+    assert reopened.get_active_embedding_version() == job.version
+    reopened.conn.close()
+
+@pytest.mark.asyncio
+async def test_failed_activation_keeps_old_version(db, new_service, monkeypatch):
+    """A rebuild that fails before the switch leaves the old version and matrix live"""
+    job = ReembeddingJob(db, new_service, batch_size=5)
+    monkeypatch.setattr(db, "activate_embedding_version", lambda version: None)
+    await job.run()
+    monkeypatch.undo()
+
+    old_ids, old_matrix = db.get_embedding_matrix(mmap=False)
+
+    def fail(self, items):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(EmbeddingMatrixStore, "rebuild", fail)
+    with pytest.raises(OSError):
+        db.activate_embedding_version(job.version)
+    monkeypatch.undo()
+
+    assert db.get_active_embedding_version() == "default"
+    reopened = RuvScanDB(db.db_path)
+    ids, matrix = reopened.get_embedding_matrix(mmap=False)
+    reopened.conn.close()
+    assert ids.tolist() == old_ids.tolist()
+    assert np.array_equal(matrix, old_matrix)
+
+    # Retrying switches to a new store generation and removes the old files
+    db.activate_embedding_version(job.version)
+    assert db.vectors.dimension == 64
+    assert db.vector_store_path != db.vector_store_base
+    assert not os.path.exists(db.vector_store_base + ".f32")
+
+@pytest.mark.asyncio
+async def test_repos_added_mid_run_are_covered(db, new_service):
+    """A repo ingested with the old model after the job started is re-embedded too"""
+    job = ReembeddingJob(db, new_service, batch_size=3)
+    original_put = db.put_version_embeddings
+    ingested = []
+
+    def put_then_ingest(version, items):
+        count = original_put(version, items)
+        if not ingested:
+            repo = {**make_repo(7), "embedding": np.ones(1536, dtype=np.float32)}
+            with pytest.raises(ValueError):
+                db.add_repo(repo)
+            ingested.append(db.add_repo({**repo, "embedding_version": "default"}))
+        return count
+
+    db.put_version_embeddings = put_then_ingest
+    await job.run()
+
+    assert db.get_embedding_version_progress(job.version) == (6, 6)
+    assert len(db.vectors) == 6
+
+@pytest.mark.asyncio
+async def test_database_calls_run_off_the_event_loop(db, new_service):
+    """Dual-writes and the switch run on the executor, not the loop thread"""
+    job = ReembeddingJob(db, new_service, batch_size=2)
+    threads = []
+
+    for name in ("put_version_embeddings", "activate_embedding_version"):
+        method = getattr(db, name)
+
+        def record(*args, method=method):
+            threads.append(threading.get_ident())
+            return method(*args)
+
+        setattr(db, name, record)
+
+    await job.run()
+
+    assert len(threads) == 4
+    assert threading.get_ident() not in threads
+
+@pytest.mark.asyncio
+async def test_chunks_follow_the_version_switch(db, old_service, new_service):
+    """Old-version chunk vectors are dropped at the switch, then re-embedded"""
+    repo_id = db.get_repo("org/repo0")["id"]
+    chunks = ["vector search intro", "install notes"]
+    db.set_repo_chunks(repo_id, chunks, await old_service.embed_batch(chunks))
+    assert db.get_chunk_matrix()[1].shape == (2, old_service.output_dimension)
+
+    with pytest.raises(ValueError):
+        db.set_repo_chunks(repo_id, chunks, await new_service.embed_batch(chunks), version=new_service.embedding_version)
+
+    job = ReembeddingJob(db, new_service, batch_size=10)
+    original_put = db.put_chunk_embeddings
+    served = []
+
+    def record(version, items):
+        served.append(len(db.get_chunk_matrix()[0]))
+        return original_put(version, items)
+
+    db.put_chunk_embeddings = record
+    await job.run()
+
+    # Between the switch and the chunk pass no stale vectors were served
+    assert served == [0]
+    repo_ids, matrix = db.get_chunk_matrix()
+    assert repo_ids.tolist() == [repo_id, repo_id]
+    assert matrix.shape == (2, 64)
+    assert job.chunks_embedded == 2
+    assert db.get_chunks_missing_embedding() == []
+
+def test_reingest_drops_stale_versions(db, new_service):
+    """Updating a repo clears its embeddings for every version"""
+    repo_id = db.get_repo("org/repo0")["id"]
+    db.put_version_embeddings("next", [(repo_id, np.ones(64))])
+
+    repo = {**make_repo(0), "embedding": np.ones(1536, dtype=np.float32), "embedding_version": "default"}
+    db.add_repo(repo)
+
+    assert db.get_embedding_version_progress("next") == (0, 5)
+    assert db.drop_embedding_version("next") == 0
+
+    # With the migration dropped, untagged embeddings are the active version again
+    del repo["embedding_version"]
+    db.add_repo(repo)
+    with pytest.raises(ValueError):
+        db.drop_embedding_version("default")
+
+def test_unversioned_database_becomes_legacy(tmp_path):
+    """Embeddings written before versioning are tagged 'legacy' on open"""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE repos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, org TEXT NOT NULL, full_name TEXT UNIQUE NOT NULL,
+            description TEXT, topics TEXT, readme TEXT, embedding BLOB,
+            sublinear_hash TEXT, stars INTEGER DEFAULT 0, language TEXT,
+            last_scan TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "INSERT INTO repos (name, org, full_name, embedding) VALUES ('a', 'o', 'o/a', ?)",
+        (np.ones(8, dtype=np.float32).tobytes(),)
+    )
+    conn.commit()
+    conn.close()
+
+    database = RuvScanDB(path)
+    assert database.get_active_embedding_version() == "legacy"
+    assert database.get_embedding_version_progress("legacy") == (1, 1)
+    database.conn.close()
+
+def test_active_version_writes_are_served(db):
+    """put_version_embeddings with the active version updates the matrix and the repo tag"""
+    repo_id = db.get_repo("org/repo1")["id"]
+    vector = np.zeros(1536, dtype=np.float32)
+    vector[7] = 1.0
+
+    assert db.put_version_embeddings("default", [(repo_id, vector), (999, vector)]) == 1
+
+    ids, matrix = db.get_embedding_matrix(mmap=False)
+    assert np.allclose(matrix[list(ids).index(repo_id)], vector)
+    assert db.get_repo("org/repo1")["embedding_version"] == "default"
+    assert db._get_setting('embedding_migration') is None
+
+def test_old_sqlite_is_rejected(tmp_path, monkeypatch):
+    """Opening with SQLite older than 3.35 fails up front"""
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 31, 1))
+    with pytest.raises(RuntimeError, match="3.35"):
+        RuvScanDB(str(tmp_path / "ruvscan.db"))
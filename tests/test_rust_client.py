@@ -0,0 +1,340 @@
+"""
+Tests for the Rust sublinear client local fallback
+"""
+
+import asyncio
+import grpc
+import pytest
+import pytest_asyncio
+import numpy as np
+from src.mcp.bindings.rust_client import RustSublinearClient
+from src.mcp.bindings.circuit_breaker import CircuitBreaker, OPEN
+from src.mcp.bindings.proto import sublinear_pb2, sublinear_pb2_grpc
+
+@pytest.fixture
+def rust_client():
+    """Create client without connecting"""
+    return RustSublinearClient()
+
+@pytest.fixture
+def corpus():
+    """Random corpus with a fixed seed"""
+    rng = np.random.default_rng(7)
+    return rng.standard_normal((200, 32)).astype(np.float32)
+
+def exact_ranking(query, corpus):
+    """Reference cosine ranking computed one vector at a time"""
+    scores = [
+        float(np.dot(query, vec) / (np.linalg.norm(query) * np.linalg.norm(vec)))
+        for vec in corpus
+    ]
+    return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True), scores
+
+@pytest.mark.asyncio
+async def test_compute_similarity_matches_reference(rust_client, corpus):
+    """Vectorized path returns the same full ranking as the per-vector loop"""
+    query = corpus[3] + 0.1
+    results = await rust_client.compute_similarity(query, list(corpus))
+
+    expected_order, expected_scores = exact_ranking(query, corpus)
+    assert [idx for idx, _ in results] == expected_order
+    assert np.allclose([score for _, score in results], sorted(expected_scores, reverse=True), atol=1e-5)
+
+@pytest.mark.asyncio
+async def test_compute_similarity_top_k(rust_client, corpus):
+    """max_results selects the best k in descending order"""
+    normalized = rust_client.normalize_rows(corpus)
+    results = await rust_client.compute_similarity(
+        corpus[10], normalized, max_results=5, normalized=True
+    )
+
+    assert len(results) == 5
+    assert results[0][0] == 10
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+@pytest.mark.asyncio
+async def test_compute_similarity_batch(rust_client, corpus):
+    """Several queries are answered with one matrix product"""
+    results = await rust_client.compute_similarity_batch(corpus[:4], corpus, max_results=3)
+
+    assert len(results) == 4
+    for i, matches in enumerate(results):
+        assert matches[0][0] == i
+        assert len(matches) == 3
+
+def test_top_k_empty_corpus(rust_client):
+    """Empty corpus yields no matches"""
+    assert rust_client.top_k_similarity(np.ones(4), []) == []
+
+def unpack(packed):
+    """Decode a PackedVectors message the way the engine does"""
+    dtype = '<f2' if packed.encoding == sublinear_pb2.PackedVectors.FLOAT16 else '<f4'
+    return np.frombuffer(packed.data, dtype=dtype).astype(np.float64).reshape(packed.count, packed.dimension)
+
+class FakeSublinearService(sublinear_pb2_grpc.SublinearServiceServicer):
+    """In-process stand-in for the Rust engine's corpus RPCs"""
+
+    def __init__(self):
+        self.corpora = {}
+        self.calls = 0
+        self.loads = 0
+        self.upserts = 0
+        self.queries = 0
+        self.requests = []
+
+    async def _receive(self, request_iterator):
+        name, rows = "", {}
+        async for chunk in request_iterator:
+            name = name or chunk.name
+            for item in chunk.vectors:
+                rows[item.id] = np.array(item.vector.values)
+            if chunk.HasField("packed"):
+                rows.update(zip(chunk.ids, unpack(chunk.packed)))
+        return name, rows
+
+    def _info(self, name):
+        rows = self.corpora[name]
+        dimension = len(next(iter(rows.values()))) if rows else 0
+        return sublinear_pb2.CorpusInfo(name=name, size=len(rows), dimension=dimension)
+
+    async def LoadCorpus(self, request_iterator, context):
+        self.loads += 1
+        name, rows = await self._receive(request_iterator)
+        self.corpora[name] = rows
+        return self._info(name)
+
+    async def UpsertCorpus(self, request_iterator, context):
+        self.upserts += 1
+        name, rows = await self._receive(request_iterator)
+        self.corpora.setdefault(name, {}).update(rows)
+        return self._info(name)
+
+    async def RemoveFromCorpus(self, request, context):
+        if request.corpus not in self.corpora:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Corpus '{request.corpus}' is not loaded")
+        for repo_id in request.ids:
+            self.corpora[request.corpus].pop(repo_id, None)
+        return self._info(request.corpus)
+
+    async def ComputeSimilarity(self, request, context):
+        self.calls += 1
+        self.requests.append(request)
+        if request.HasField("packed_query"):
+            query, corpus = unpack(request.packed_query)[0], unpack(request.packed_corpus)
+        else:
+            query = np.array(request.query.values)
+            corpus = np.array([vec.values for vec in request.corpus])
+        scores = corpus @ query / (np.linalg.norm(corpus, axis=1) * np.linalg.norm(query))
+        order = np.argsort(-scores)[:request.max_results]
+        return sublinear_pb2.SimilarityResponse(
+            matches=[sublinear_pb2.SimilarityMatch(index=int(i), score=float(scores[i])) for i in order]
+        )
+
+    async def CompareVectors(self, request, context):
+        self.calls += 1
+        return sublinear_pb2.CompareResponse(similarity=0.5, complexity="O(log 3)", method_used="sublinear_jl")
+
+    async def QueryCorpus(self, request, context):
+        self.queries += 1
+        if request.corpus not in self.corpora:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Corpus '{request.corpus}' is not loaded")
+        if request.HasField("packed_query"):
+            query = unpack(request.packed_query)[0]
+        else:
+            query = np.array(request.query.values)
+        scored = sorted(
+            ((repo_id, float(vec @ query / (np.linalg.norm(vec) * np.linalg.norm(query))))
+             for repo_id, vec in self.corpora[request.corpus].items()),
+            key=lambda item: item[1],
+            reverse=True
+        )[:request.max_results or None]
+        return sublinear_pb2.SimilarityResponse(
+            matches=[sublinear_pb2.SimilarityMatch(id=i, score=s) for i, s in scored]
+        )
+
+@pytest_asyncio.fixture
+async def engine():
+    """Fake engine served on a local port"""
+    server = grpc.aio.server()
+    service = FakeSublinearService()
+    sublinear_pb2_grpc.add_SublinearServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    yield service, port
+    await server.stop(None)
+
+@pytest.mark.asyncio
+async def test_resident_corpus_roundtrip(engine, corpus):
+    """Corpus is uploaded once and queried by name with ids preserved"""
+    service, port = engine
+    client = RustSublinearClient(port=port)
+    await client.connect()
+
+    info = await client.load_corpus("repos", corpus[:50], ids=range(100, 150), chunk_size=16)
+    assert info == {"name": "repos", "size": 50, "dimension": 32}
+
+    info = await client.upsert_corpus("repos", corpus[50:52], ids=[100, 999])
+    assert info["size"] == 51
+
+    matches = await client.query_corpus("repos", corpus[51], max_results=3)
+    assert matches[0][0] == 999
+    assert len(matches) == 3
+
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_keyed_corpus_is_uploaded_once(engine, corpus):
+    """A corpus key keeps the corpus resident; a new key is uploaded in the background"""
+    service, port = engine
+    client = RustSublinearClient(port=port)
+    await client.connect()
+
+    # Answered locally while the first upload runs
+    results = await client.compute_similarity(
+        corpus[0], corpus, max_results=2, corpus_key=("v1", 1), corpus_name="repos"
+    )
+    assert results[0][0] == 0
+    await client._syncs["repos"]
+
+    for i in range(3):
+        results = await client.compute_similarity(
+            corpus[i], corpus, max_results=2, corpus_key=("v1", 1), corpus_name="repos"
+        )
+        assert results[0][0] == i
+
+    assert service.loads == 1
+    assert service.calls == 0
+
+    await client.compute_similarity(corpus[0], corpus[:10], corpus_key=("v1", 2), corpus_name="repos")
+    await client._syncs["repos"]
+    assert service.loads == 2
+    assert len(service.corpora["repos"]) == 10
+
+    # A restarted engine lost the corpus: answer locally, upload again next call
+    service.corpora.clear()
+    for _ in range(2):
+        results = await client.compute_similarity(
+            corpus[5], corpus[:10], max_results=1, corpus_key=("v1", 2), corpus_name="repos"
+        )
+        assert results[0][0] == 5
+    await client._syncs["repos"]
+    assert service.loads == 3
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_keyed_corpus_applies_row_deltas(engine, corpus):
+    """Changed rows are upserted and removed while the old snapshot keeps answering"""
+    service, port = engine
+    client = RustSublinearClient(port=port)
+    await client.connect()
+
+    await client.compute_similarity(corpus[0], corpus[:10], corpus_key=1, corpus_name="repos")
+    await client._syncs["repos"]
+
+    changed = corpus[:11].copy()
+    changed[3] = corpus[100]
+    changed[10] = corpus[101]
+    seen = []
+
+    async def delta(resident_key):
+        seen.append(resident_key)
+        return [3, 10], [4]
+
+    # The resident snapshot answers this call while the delta is applied
+    await client.compute_similarity(
+        corpus[3], changed, max_results=1, corpus_key=2, corpus_name="repos", corpus_delta=delta
+    )
+    assert service.queries == 1
+    await client._syncs["repos"]
+
+    assert seen == [1]
+    assert service.loads == 1 and service.upserts == 1
+    assert sorted(service.corpora["repos"]) == [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]
+    results = await client.compute_similarity(
+        corpus[101], changed, max_results=1, corpus_key=2, corpus_name="repos", corpus_delta=delta
+    )
+    assert results[0][0] == 10
+    assert seen == [1]
+
+    # Without a usable delta the corpus is reloaded
+    async def no_delta(resident_key):
+        return None
+
+    await client.compute_similarity(corpus[0], corpus[:5], corpus_key=3, corpus_name="repos", corpus_delta=no_delta)
+    await client._syncs["repos"]
+    assert service.loads == 2 and len(service.corpora["repos"]) == 5
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_corpus_requires_connection(rust_client, corpus):
+    """Corpus RPCs fail fast before connect()"""
+    with pytest.raises(RuntimeError):
+        await rust_client.query_corpus("repos", corpus[0])
+
+@pytest.mark.asyncio
+async def test_similarity_uses_engine_over_pool(engine, corpus):
+    """Connected client sends numeric work to the engine across pooled channels"""
+    service, port = engine
+    client = RustSublinearClient(port=port, pool_size=3, timeout=5.0)
+    await client.connect()
+    assert len(client.channels) == 3
+
+    results = await asyncio.gather(*[
+        client.compute_similarity(corpus[i], corpus[:20], max_results=2)
+        for i in range(6)
+    ])
+    comparison = await client.compare_vectors(corpus[0], corpus[1])
+
+    assert service.calls == 7
+    assert [matches[0][0] for matches in results] == list(range(6))
+    assert comparison["similarity"] == 0.5
+    await client.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding,itemsize", [("float32", 4), ("float16", 2)])
+async def test_similarity_sends_packed_vectors(engine, corpus, encoding, itemsize):
+    """Vectors travel as one packed buffer instead of repeated doubles"""
+    service, port = engine
+    client = RustSublinearClient(port=port, vector_encoding=encoding)
+    await client.connect()
+
+    results = await client.compute_similarity(corpus[8], corpus, max_results=1)
+
+    request = service.requests[-1]
+    assert len(request.corpus) == 0
+    assert len(request.packed_corpus.data) == corpus.size * itemsize
+    assert results[0][0] == 8
+    await client.close()
+
+def test_unknown_vector_encoding():
+    """Unsupported encodings are rejected up front"""
+    with pytest.raises(ValueError):
+        RustSublinearClient(vector_encoding="int4")
+
+@pytest.mark.asyncio
+async def test_similarity_falls_back_when_engine_down(corpus):
+    """Unreachable engine fails fast and the local path answers"""
+    client = RustSublinearClient(port=1, timeout=2.0)
+    await client.connect()
+
+    results = await client.compute_similarity(corpus[4], corpus, max_results=1)
+
+    assert results[0][0] == 4
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_engine(corpus):
+    """Once the breaker opens, calls are answered locally without touching the network"""
+    breaker = CircuitBreaker("rust_engine", failure_threshold=2, reset_timeout=60.0)
+    client = RustSublinearClient(port=1, timeout=2.0, breaker=breaker)
+    await client.connect()
+
+    for i in range(4):
+        results = await client.compute_similarity(corpus[i], corpus, max_results=1)
+        assert results[0][0] == i
+
+    assert breaker.state == OPEN
+    assert breaker.metrics()["failures"] == 2
+    assert breaker.metrics()["rejected"] == 2
+    await client.close()
@@ -2,9 +2,18 @@
 Tests for RuvScan MCP server
 """
 
+import asyncio
+import time
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
+from src.mcp import server
+from src.mcp.endpoints import query
+from src.mcp.monitoring import metrics_collector
+from src.mcp.reasoning.embeddings import EmbeddingService
+from src.mcp.reasoning.embedding_cache import text_hash
 from src.mcp.server import app
+from src.mcp.storage.db import RuvScanDB, intent_hash
 
 client = TestClient(app)
 
@@ -87,3 +96,117 @@ def test_invalid_scan_type():
         "limit": 10
     })
     assert response.status_code == 422  # Validation error
+
+def test_startup_opens_database(tmp_path, monkeypatch):
+    """The lifespan hook opens the configured database for /query and /cards"""
+    monkeypatch.setattr(server, "config", {"database": {"sqlite": {"path": str(tmp_path / "ruvscan.db")}}})
+    intent = "stream processing for sensor telemetry"
+
+    with TestClient(app) as started:
+        assert server.repo_db is not None and query.repo_db is server.repo_db
+        assert query.embedding_service.cache is query.embedding_cache
+        assert query.embedding_cache.db is server.repo_db.db
+
+        vector = query.embedding_service.client.transform([intent])[0]
+        server.repo_db.db.add_repo({
+            "name": "stream", "org": "o", "full_name": "o/stream",
+            "description": "Sensor telemetry streams", "embedding": vector
+        })
+
+        cards = started.post("/query", json={"intent": intent, "min_score": 0.5}).json()
+        assert [card["repo"] for card in cards] == ["o/stream"]
+
+        # /query saves its cards for /cards to page through
+        response = started.get("/cards", params={"intent": intent})
+        assert response.status_code == 200
+        assert [card["repo"] for card in response.json()["cards"]] == ["o/stream"]
+
+        # The intent embedding was persisted in the SQLite cache
+        provider, model = query.embedding_service.provider.value, query.embedding_service.model_id
+        assert server.repo_db.db.get_cached_embeddings(provider, model, [text_hash(intent)])
+
+    assert server.repo_db is None and query.repo_db is None
+    assert query.embedding_cache.db is None
+
+def test_startup_compacts_cards(tmp_path, monkeypatch):
+    """Duplicate cards left by older versions are compacted in the background"""
+    path = str(tmp_path / "ruvscan.db")
+    db = RuvScanDB(path)
+    repo_id = db.add_repo({"name": "a", "org": "o", "full_name": "o/a"})
+    db.conn.execute("DROP INDEX idx_cards_key")
+    db.conn.executemany(
+        "INSERT INTO leverage_cards (repo_id, capabilities, summary, reasoning, relevance_score, query_intent, intent_hash) "
+        "VALUES (?, '[]', 's', 'r', ?, 'find a cache', ?)",
+        [(repo_id, score, intent_hash("find a cache")) for score in (0.2, 0.4, 0.6)]
+    )
+    db.conn.commit()
+    db.close()
+    monkeypatch.setattr(server, "config", {"database": {"sqlite": {"path": path}}})
+
+    with TestClient(app):
+        for _ in range(200):
+            cards = server.repo_db.db.get_leverage_cards(limit=10)
+            if len(cards) == 1:
+                break
+            time.sleep(0.01)
+
+    assert [card["relevance_score"] for card in cards] == [0.6]
+
+def test_startup_reembeds_changed_version(tmp_path, monkeypatch):
+    """A database on another embedding version is re-embedded and switched in the background"""
+    path = str(tmp_path / "ruvscan.db")
+    db = RuvScanDB(path)
+    for i in range(3):
+        db.add_repo({"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": [1.0, 0.0, 0.0]})
+    db.close()
+    monkeypatch.setattr(server, "config", {
+        "database": {"sqlite": {"path": path}},
+        "llm": {"reembedding": {"batch_size": 2, "pause_seconds": 0}}
+    })
+    target = query.embedding_service.embedding_version
+
+    with TestClient(app):
+        for _ in range(200):
+            if server.repo_db.db.get_active_embedding_version() == target:
+                break
+            time.sleep(0.01)
+        _, matrix = server.repo_db.db.get_embedding_matrix(mmap=False)
+
+    assert matrix.shape == (3, query.embedding_service.output_dimension)
+
+def test_startup_fits_local_embedder(tmp_path, monkeypatch):
+    """With llm.fit_local_embedder, an unfitted local model is fitted on the stored repos and saved"""
+    path = str(tmp_path / "ruvscan.db")
+    db = RuvScanDB(path)
+    for i, topic in enumerate(["graph search", "stream processing", "matrix solver"]):
+        db.add_repo({"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "description": topic})
+    db.close()
+    model_path = str(tmp_path / "local.joblib")
+    service = EmbeddingService(provider="local", local_model_path=model_path)
+    monkeypatch.setattr(server, "config", {
+        "database": {"sqlite": {"path": path}},
+        "llm": {"fit_local_embedder": True}
+    })
+    monkeypatch.setattr(query, "embedding_service", service)
+
+    with TestClient(app):
+        assert service.client.fitted
+
+    assert EmbeddingService(provider="local", local_model_path=model_path).model_id == service.model_id
+
+def test_query_coalescer_metrics_are_exported():
+    """The served embedder's coalescer histograms appear in the metrics summary"""
+    original = query.embedding_service
+    service = EmbeddingService(provider="local", coalesce=True)
+    service.client.transform = lambda texts: np.ones((len(texts), 8), dtype=np.float32)
+
+    try:
+        query.set_embedding_service(service)
+        asyncio.run(service.embed_text("sublinear solver"))
+        coalescers = metrics_collector.get_summary()["embedding_coalescers"]
+        assert coalescers["query_embeddings"]["batch_size"]["count"] == 1
+
+        query.set_embedding_service(EmbeddingService(provider="local"))
+        assert "query_embeddings" not in metrics_collector.get_summary()["embedding_coalescers"]
+    finally:
+        query.set_embedding_service(original)
@@ -0,0 +1,192 @@
+"""
+Tests for the embedding matrix store
+"""
+
+import pytest
+import numpy as np
+from src.mcp.storage.db import RuvScanDB
+from src.mcp.storage.vector_store import EmbeddingMatrixStore
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Base path for an on-disk store"""
+    return str(tmp_path / "ruvscan.vectors")
+
+def test_upsert_and_mmap_load(store_path):
+    """Vectors written to disk come back through a read-only memmap"""
+    store = EmbeddingMatrixStore(store_path)
+    store.upsert(10, np.array([1.0, 0.0, 0.0]))
+    store.upsert(20, np.array([0.0, 1.0, 0.0]))
+
+    ids, matrix = store.load(mmap=True)
+
+    assert isinstance(matrix, np.memmap)
+    assert matrix.dtype == np.float32
+    assert ids.tolist() == [10, 20]
+    assert np.allclose(matrix[1], [0.0, 1.0, 0.0])
+
+def test_upsert_overwrites_in_place(store_path):
+    """Re-upserting a repo replaces its row instead of appending"""
+    store = EmbeddingMatrixStore(store_path)
+    store.upsert(1, np.ones(4))
+    store.upsert(1, np.array([2.0, 0.0, 0.0, 0.0]))
+
+    ids, matrix = store.load()
+    assert ids.tolist() == [1]
+    assert np.allclose(matrix[0], [1.0, 0.0, 0.0, 0.0])
+
+def test_reopen_and_compact(store_path):
+    """Row map survives reopening and compaction drops retired rows"""
+    store = EmbeddingMatrixStore(store_path)
+    for repo_id in range(3):
+        store.upsert(repo_id, np.array([1.0, float(repo_id)]))
+    store.remove(1)
+
+    reopened = EmbeddingMatrixStore(store_path)
+    assert len(reopened) == 2
+    assert 1 not in reopened
+
+    reopened.compact()
+    ids, matrix = reopened.load(mmap=False)
+    assert ids.tolist() == [0, 2]
+    assert np.allclose(matrix[1], np.array([1.0, 2.0]) / np.sqrt(5.0))
+
+def test_rows_are_stored_unit_length(store_path):
+    """Rows are normalized on write; a store written without normalization is migrated on open"""
+    import json
+
+    store = EmbeddingMatrixStore(store_path)
+    store.upsert_many([(1, np.array([3.0, 4.0])), (2, np.zeros(2))])
+    assert np.allclose(store.load()[1], [[0.6, 0.8], [0.0, 0.0]])
+
+    with open(store_path + ".json", "w") as f:
+        json.dump({"dimension": 2, "dtype": "float32"}, f)
+    np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32).tofile(store_path + ".f32")
+
+    reopened = EmbeddingMatrixStore(store_path)
+    assert np.allclose(reopened.load()[1], [[0.6, 0.8], [0.0, 0.0]])
+    with open(store_path + ".json") as f:
+        assert json.load(f)["unit"] is True
+
+def test_dimension_mismatch(store_path):
+    """Vectors of a different dimension are rejected"""
+    store = EmbeddingMatrixStore(store_path)
+    store.upsert(1, np.ones(3))
+
+    with pytest.raises(ValueError):
+        store.upsert(2, np.ones(4))
+
+def test_db_keeps_matrix_in_sync(tmp_path):
+    """add_repo mirrors embeddings into the matrix and keeps the repo id on update"""
+    db = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    repo = {"name": "a", "org": "o", "full_name": "o/a", "embedding": np.ones(8)}
+
+    first_id = db.add_repo(repo)
+    second_id = db.add_repo({**repo, "embedding": np.eye(8)[2] * 3.0})
+
+    ids, matrix = db.get_embedding_matrix()
+    live = ids >= 0
+    assert ids[live].tolist() == [second_id]
+    assert np.allclose(matrix[live][0], np.eye(8)[2])
+    assert second_id == first_id
+    db.close()
+
+    # Deleting the matrix files forces a rebuild from the BLOB column
+    for suffix in (".f32", ".ids", ".json"):
+        (tmp_path / f"ruvscan.vectors{suffix}").unlink()
+    reopened = RuvScanDB(str(tmp_path / "ruvscan.db"))
+    assert len(reopened.vectors) == 1
+    reopened.close()
+
+def test_float16_store(store_path):
+    """float16 stores halve the row size and refuse to reopen as float32"""
+    store = EmbeddingMatrixStore(store_path, dtype="float16")
+    store.upsert(1, np.array([0.5, 0.0, 0.5, 0.0]))
+
+    ids, matrix = store.load()
+    assert matrix.dtype == np.float16
+    assert np.allclose(matrix[0], [0.7071, 0.0, 0.7071, 0.0], atol=1e-3)
+
+    with pytest.raises(ValueError):
+        EmbeddingMatrixStore(store_path, dtype="float32")
+
+def test_float16_matrix_file_is_named_by_dtype(store_path):
+    """float16 matrices use the .f16 extension; a legacy .f32 file is renamed on open"""
+    import os
+
+    store = EmbeddingMatrixStore(store_path, dtype="float16")
+    store.upsert(1, np.ones(4))
+    assert store.matrix_path == store_path + ".f16"
+    assert not os.path.exists(store_path + ".f32")
+
+    os.replace(store_path + ".f16", store_path + ".f32")
+    reopened = EmbeddingMatrixStore(store_path, dtype="float16")
+    assert os.path.exists(store_path + ".f16") and not os.path.exists(store_path + ".f32")
+    assert np.allclose(reopened.load()[1][0], 0.5, atol=1e-3)
+
+def test_db_embedding_dtype_is_pinned(tmp_path):
+    """BLOBs use the configured dtype and the database remembers it"""
+    db_path = str(tmp_path / "ruvscan.db")
+    db = RuvScanDB(db_path, embedding_dtype="float16")
+    db.add_repo({"name": "a", "org": "o", "full_name": "o/a", "embedding": np.ones(8)})
+
+    assert db.get_repo("o/a", include_embedding=True)["embedding"].nbytes == 16
+    assert db.get_embedding_matrix()[1].dtype == np.float16
+    db.close()
+
+    with pytest.raises(ValueError):
+        RuvScanDB(db_path)
+
+@pytest.mark.asyncio
+async def test_resident_corpus_delta_follows_the_change_log(tmp_path, monkeypatch):
+    """Written rows are upserted, retired rows removed, and a store swap forces a reload"""
+    from src.mcp.endpoints import query
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    monkeypatch.setattr(query, "repo_db", db)
+    repos = [{"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": np.full(8, i + 1.0)} for i in range(3)]
+    await db.add_repos_bulk(repos)
+    resident_key = await db.get_embedding_matrix_revision()
+
+    await db.add_repo({**repos[0], "embedding": np.full(8, 9.0)})
+    await db.delete_repos(["o/r1"])
+    await db.add_repo({"name": "r3", "org": "o", "full_name": "o/r3", "embedding": np.ones(8)})
+    corpus_key = await db.get_embedding_matrix_revision()
+    ids, _ = await db.get_embedding_matrix()
+
+    upserted, removed = await query.resident_corpus_delta(corpus_key, ids, resident_key)
+    assert upserted.tolist() == [0, 3]
+    assert removed.tolist() == [1]
+
+    swapped = (corpus_key[0], "elsewhere", corpus_key[2])
+    assert await query.resident_corpus_delta(swapped, ids, resident_key) is None
+    await db.close()
+
+@pytest.mark.asyncio
+async def test_query_scans_the_stored_unit_rows_as_normalized(tmp_path, monkeypatch):
+    """/query tells the scan the database matrix is already normalized"""
+    from src.mcp.endpoints import query
+    from src.mcp.bindings.rust_client import RustSublinearClient
+    from src.mcp.storage.async_db import AsyncRuvScanDB
+
+    db = AsyncRuvScanDB(RuvScanDB(str(tmp_path / "ruvscan.db")))
+    await db.add_repos_bulk([
+        {"name": f"r{i}", "org": "o", "full_name": f"o/r{i}", "embedding": np.eye(4)[i] * (i + 2)}
+        for i in range(4)
+    ])
+    monkeypatch.setattr(query, "repo_db", db)
+    calls = []
+
+    def top_k(queries, corpus_embeddings, max_results=None, normalized=False):
+        calls.append(normalized)
+        return []
+
+    client = RustSublinearClient()
+    monkeypatch.setattr(client, "top_k_similarity", top_k)
+    monkeypatch.setattr(query, "rust_client", client)
+    _, matrix = await db.get_embedding_matrix()
+    await query.vector_candidates(np.ones(4), matrix, 2)
+
+    assert calls == [True]
+    await db.close()